@@ -16,4 +16,595 @@ from app.config.settings import settings
 from app.config.logging import ml_logger, setup_logging
 from app.config.database import db_manager
 from app.config.redis import redis_manager
-from app.models.schemas import (\n    PredictionRequest, BatchPredictionRequest, PredictionResponse, BatchPredictionResponse,\n    AnomalyDetectionRequest, AnomalyDetectionResponse, \n    ModelPerformanceRequest, ModelPerformanceResponse,\n    RetrainingRequest, RetrainingResponse,\n    CorrelationAnalysisRequest, CorrelationAnalysisResponse,\n    HealthCheckResponse, ErrorResponseModel\n)\nfrom app.inference.predictor import prediction_service\nfrom app.training.trainer import ModelTrainer\n\n# Initialize logging\nsetup_logging()\n\n\n@asynccontextmanager\nasync def lifespan(app: FastAPI):\n    \"\"\"Application lifespan events.\"\"\"\n    # Startup\n    ml_logger.info(\"Starting ML service application\")\n    \n    try:\n        # Connect to Redis\n        await redis_manager.connect()\n        ml_logger.info(\"Redis connected successfully\")\n        \n        # Test database connection\n        db_healthy = await db_manager.health_check()\n        if db_healthy:\n            ml_logger.info(\"Database connection verified\")\n        else:\n            ml_logger.warning(\"Database connection failed\")\n        \n        ml_logger.info(\"ML service startup completed\")\n        \n    except Exception as e:\n        ml_logger.error(\"Failed to initialize ML service\", error=str(e))\n        raise e\n    \n    yield\n    \n    # Shutdown\n    ml_logger.info(\"Shutting down ML service\")\n    try:\n        await redis_manager.disconnect()\n        await db_manager.close()\n        ml_logger.info(\"ML service shutdown completed\")\n    except Exception as e:\n        ml_logger.error(\"Error during shutdown\", error=str(e))\n\n\n# Create FastAPI app\napp = FastAPI(\n    title=settings.app_name,\n    version=settings.app_version,\n    description=\"Machine Learning service untuk prediksi harga komoditas Indonesia\",\n    lifespan=lifespan,\n    docs_url=\"/docs\" if settings.debug else None,\n    redoc_url=\"/redoc\" if settings.debug else None\n)\n\n# Add middleware\napp.add_middleware(\n    CORSMiddleware,\n    allow_origins=settings.cors_origins,\n    allow_credentials=True,\n    allow_methods=[\"*\"],\n    allow_headers=[\"*\"],\n)\n\napp.add_middleware(\n    TrustedHostMiddleware,\n    allowed_hosts=[\"*\"] if settings.debug else [\"localhost\", \"127.0.0.1\"]\n)\n\n\n# Request/Response middleware\n@app.middleware(\"http\")\nasync def log_requests(request: Request, call_next):\n    \"\"\"Log all requests for monitoring.\"\"\"\n    start_time = time.time()\n    \n    # Process request\n    response = await call_next(request)\n    \n    # Calculate duration\n    duration_ms = (time.time() - start_time) * 1000\n    \n    # Log request\n    ml_logger.log_api_request(\n        endpoint=str(request.url.path),\n        method=request.method,\n        status_code=response.status_code,\n        duration_ms=duration_ms\n    )\n    \n    return response\n\n\n# Exception handlers\n@app.exception_handler(HTTPException)\nasync def http_exception_handler(request: Request, exc: HTTPException):\n    \"\"\"Handle HTTP exceptions.\"\"\"\n    return JSONResponse(\n        status_code=exc.status_code,\n        content={\n            \"success\": False,\n            \"message\": exc.detail,\n            \"error_code\": f\"HTTP_{exc.status_code}\",\n            \"timestamp\": datetime.now().isoformat()\n        }\n    )\n\n\n@app.exception_handler(Exception)\nasync def general_exception_handler(request: Request, exc: Exception):\n    \"\"\"Handle general exceptions.\"\"\"\n    ml_logger.error(\n        \"Unhandled exception\",\n        endpoint=str(request.url.path),\n        method=request.method,\n        error=str(exc)\n    )\n    \n    return JSONResponse(\n        status_code=500,\n        content={\n            \"success\": False,\n            \"message\": \"Internal server error\",\n            \"error_code\": \"INTERNAL_ERROR\",\n            \"timestamp\": datetime.now().isoformat()\n        }\n    )\n\n\n# Health check endpoint\n@app.get(\"/health\", response_model=HealthCheckResponse)\nasync def health_check():\n    \"\"\"Check service health.\"\"\"\n    try:\n        health_status = await prediction_service.health_check()\n        \n        status = \"healthy\" if health_status.get(\"status\") == \"healthy\" else \"unhealthy\"\n        \n        return HealthCheckResponse(\n            status=status,\n            services={\n                \"database\": health_status.get(\"database\", False),\n                \"redis\": health_status.get(\"redis\", False),\n                \"models\": health_status.get(\"models_available\", False)\n            },\n            version=settings.app_version,\n            uptime_seconds=0,  # TODO: Calculate actual uptime\n            models_loaded=health_status.get(\"prediction_stats\", {}).get(\"models_loaded\", 0),\n            cache_hit_rate=health_status.get(\"prediction_stats\", {}).get(\"cache_hit_rate\", 0),\n            average_prediction_latency_ms=health_status.get(\"prediction_stats\", {}).get(\"average_latency_ms\", 0)\n        )\n        \n    except Exception as e:\n        ml_logger.error(\"Health check failed\", error=str(e))\n        raise HTTPException(status_code=500, detail=\"Health check failed\")\n\n\n# Prediction endpoints\n@app.post(\"/api/v1/predict/price/{commodity_code}\", response_model=PredictionResponse)\nasync def predict_commodity_price(\n    commodity_code: str,\n    request: PredictionRequest\n):\n    \"\"\"Predict price for a single commodity.\"\"\"\n    try:\n        # Override commodity code from path\n        request.commodity_code = commodity_code.upper()\n        \n        # Make prediction\n        prediction_result = await prediction_service.predict_price(\n            commodity_code=request.commodity_code,\n            region_code=request.region_code,\n            horizon_days=request.horizon_days,\n            model_type=request.model_type,\n            include_uncertainty=request.include_uncertainty,\n            include_features=request.include_features\n        )\n        \n        return PredictionResponse(\n            success=True,\n            message=\"Prediction completed successfully\",\n            **prediction_result\n        )\n        \n    except ValueError as e:\n        raise HTTPException(status_code=400, detail=str(e))\n    except Exception as e:\n        ml_logger.error(\"Prediction failed\", commodity_code=commodity_code, error=str(e))\n        raise HTTPException(status_code=500, detail=\"Prediction failed\")\n\n\n@app.post(\"/api/v1/predict/batch\", response_model=BatchPredictionResponse)\nasync def batch_predict_prices(\n    request: BatchPredictionRequest\n):\n    \"\"\"Perform batch predictions for multiple commodities.\"\"\"\n    try:\n        # Convert requests to dict format\n        batch_requests = [req.dict() for req in request.requests]\n        \n        # Perform batch prediction\n        batch_result = await prediction_service.batch_predict(\n            requests=batch_requests,\n            max_workers=5\n        )\n        \n        return BatchPredictionResponse(\n            success=True,\n            message=\"Batch prediction completed\",\n            **batch_result\n        )\n        \n    except Exception as e:\n        ml_logger.error(\"Batch prediction failed\", error=str(e))\n        raise HTTPException(status_code=500, detail=\"Batch prediction failed\")\n\n\n# Anomaly detection endpoints\n@app.post(\"/api/v1/predict/anomaly\", response_model=AnomalyDetectionResponse)\nasync def detect_price_anomalies(\n    request: AnomalyDetectionRequest\n):\n    \"\"\"Detect price anomalies.\"\"\"\n    try:\n        anomaly_result = await prediction_service.detect_anomalies(\n            commodity_code=request.commodity_code,\n            region_code=request.region_code,\n            detection_type=request.detection_type,\n            sensitivity=request.sensitivity,\n            time_window_days=request.time_window_days\n        )\n        \n        return AnomalyDetectionResponse(\n            success=True,\n            message=\"Anomaly detection completed\",\n            **anomaly_result\n        )\n        \n    except Exception as e:\n        ml_logger.error(\"Anomaly detection failed\", error=str(e))\n        raise HTTPException(status_code=500, detail=\"Anomaly detection failed\")\n\n\n@app.get(\"/api/v1/predict/anomaly/{region_code}\", response_model=AnomalyDetectionResponse)\nasync def detect_regional_anomalies(\n    region_code: str,\n    commodity_code: Optional[str] = None,\n    detection_type: str = \"both\",\n    sensitivity: float = 0.1,\n    time_window_days: int = 30\n):\n    \"\"\"Detect anomalies for a specific region.\"\"\"\n    try:\n        anomaly_result = await prediction_service.detect_anomalies(\n            commodity_code=commodity_code,\n            region_code=region_code,\n            detection_type=detection_type,\n            sensitivity=sensitivity,\n            time_window_days=time_window_days\n        )\n        \n        return AnomalyDetectionResponse(\n            success=True,\n            message=f\"Regional anomaly detection completed for {region_code}\",\n            **anomaly_result\n        )\n        \n    except Exception as e:\n        ml_logger.error(\n            \"Regional anomaly detection failed\",\n            region_code=region_code,\n            error=str(e)\n        )\n        raise HTTPException(status_code=500, detail=\"Regional anomaly detection failed\")\n\n\n# Model management endpoints\n@app.get(\"/api/v1/models/accuracy\", response_model=ModelPerformanceResponse)\nasync def get_model_accuracy(\n    request: ModelPerformanceRequest = Depends()\n):\n    \"\"\"Get model performance metrics.\"\"\"\n    try:\n        # This is a placeholder - implement actual model performance tracking\n        performance_metrics = [\n            {\n                \"model_name\": \"prophet_beras_national\",\n                \"commodity_code\": \"BERAS\",\n                \"evaluation_period\": {\n                    \"start\": \"2024-01-01T00:00:00\",\n                    \"end\": \"2024-12-31T23:59:59\"\n                },\n                \"metrics\": {\n                    \"mae\": 1250.5,\n                    \"rmse\": 1875.3,\n                    \"mape\": 8.2,\n                    \"r2\": 0.85\n                },\n                \"predictions_count\": 365,\n                \"accuracy_trend\": []\n            }\n        ]\n        \n        return ModelPerformanceResponse(\n            success=True,\n            message=\"Model performance metrics retrieved\",\n            models_evaluated=len(performance_metrics),\n            performance_metrics=performance_metrics,\n            overall_statistics={\n                \"average_mape\": 8.2,\n                \"average_r2\": 0.85\n            }\n        )\n        \n    except Exception as e:\n        ml_logger.error(\"Failed to get model performance\", error=str(e))\n        raise HTTPException(status_code=500, detail=\"Failed to get model performance\")\n\n\n@app.post(\"/api/v1/models/retrain\", response_model=RetrainingResponse)\nasync def retrain_model(\n    request: RetrainingRequest,\n    background_tasks: BackgroundTasks\n):\n    \"\"\"Trigger model retraining.\"\"\"\n    try:\n        # Generate training ID\n        training_id = f\"train_{request.model_name}_{int(time.time())}\"\n        \n        # Start background training task\n        background_tasks.add_task(\n            _background_retrain,\n            training_id=training_id,\n            model_name=request.model_name,\n            commodity_codes=request.commodity_codes,\n            force_retrain=request.force_retrain,\n            hyperparameters=request.hyperparameters,\n            training_config=request.training_config\n        )\n        \n        return RetrainingResponse(\n            success=True,\n            message=\"Model retraining started\",\n            training_id=training_id,\n            model_name=request.model_name,\n            status=\"started\",\n            estimated_duration_minutes=30,\n            training_config=request.training_config or {}\n        )\n        \n    except Exception as e:\n        ml_logger.error(\"Failed to start model retraining\", error=str(e))\n        raise HTTPException(status_code=500, detail=\"Failed to start model retraining\")\n\n\nasync def _background_retrain(\n    training_id: str,\n    model_name: str,\n    commodity_codes: List[str] = None,\n    force_retrain: bool = False,\n    hyperparameters: Dict = None,\n    training_config: Dict = None\n):\n    \"\"\"Background task for model retraining.\"\"\"\n    try:\n        ml_logger.info(\"Starting background model retraining\", training_id=training_id)\n        \n        # Update training state\n        await redis_manager.set_training_state(\n            training_id,\n            {\n                \"status\": \"running\",\n                \"start_time\": datetime.now().isoformat(),\n                \"progress\": 0\n            }\n        )\n        \n        # Initialize trainer\n        trainer = ModelTrainer()\n        \n        # Train models for specified commodities\n        if commodity_codes:\n            for i, commodity_code in enumerate(commodity_codes):\n                try:\n                    training_results = trainer.train_commodity_models(\n                        commodity_code=commodity_code,\n                        model_types=[model_name] if model_name != \"all\" else [\"prophet\", \"lstm\"],\n                        retrain=force_retrain\n                    )\n                    \n                    # Update progress\n                    progress = int(((i + 1) / len(commodity_codes)) * 100)\n                    await redis_manager.set_training_state(\n                        training_id,\n                        {\n                            \"status\": \"running\",\n                            \"progress\": progress,\n                            \"current_commodity\": commodity_code,\n                            \"results\": training_results\n                        }\n                    )\n                    \n                except Exception as e:\n                    ml_logger.error(\n                        \"Failed to retrain commodity model\",\n                        training_id=training_id,\n                        commodity_code=commodity_code,\n                        error=str(e)\n                    )\n        \n        # Mark as completed\n        await redis_manager.set_training_state(\n            training_id,\n            {\n                \"status\": \"completed\",\n                \"progress\": 100,\n                \"end_time\": datetime.now().isoformat()\n            }\n        )\n        \n        ml_logger.info(\"Background model retraining completed\", training_id=training_id)\n        \n    except Exception as e:\n        ml_logger.error(\n            \"Background model retraining failed\",\n            training_id=training_id,\n            error=str(e)\n        )\n        \n        # Mark as failed\n        await redis_manager.set_training_state(\n            training_id,\n            {\n                \"status\": \"failed\",\n                \"error\": str(e),\n                \"end_time\": datetime.now().isoformat()\n            }\n        )\n\n\n# Analytics endpoints\n@app.post(\"/api/v1/analytics/correlation\", response_model=CorrelationAnalysisResponse)\nasync def analyze_weather_price_correlation(\n    request: CorrelationAnalysisRequest\n):\n    \"\"\"Analyze weather-price correlation.\"\"\"\n    try:\n        correlation_result = await prediction_service.analyze_price_correlation(\n            commodity_code=request.commodity_code,\n            region_codes=request.region_codes,\n            weather_types=request.weather_types,\n            time_window_days=request.time_window_days\n        )\n        \n        return CorrelationAnalysisResponse(\n            success=True,\n            message=\"Correlation analysis completed\",\n            **correlation_result\n        )\n        \n    except Exception as e:\n        ml_logger.error(\"Correlation analysis failed\", error=str(e))\n        raise HTTPException(status_code=500, detail=\"Correlation analysis failed\")\n\n\n# Utility endpoints\n@app.get(\"/api/v1/stats\")\nasync def get_service_stats():\n    \"\"\"Get service statistics.\"\"\"\n    try:\n        prediction_stats = prediction_service.get_prediction_stats()\n        cache_stats = await redis_manager.get_cache_stats()\n        \n        return {\n            \"success\": True,\n            \"message\": \"Service statistics retrieved\",\n            \"timestamp\": datetime.now().isoformat(),\n            \"prediction_stats\": prediction_stats,\n            \"cache_stats\": cache_stats,\n            \"service_info\": {\n                \"name\": settings.app_name,\n                \"version\": settings.app_version,\n                \"environment\": settings.environment\n            }\n        }\n        \n    except Exception as e:\n        ml_logger.error(\"Failed to get service stats\", error=str(e))\n        raise HTTPException(status_code=500, detail=\"Failed to get service stats\")\n\n\n@app.get(\"/api/v1/supported\")\nasync def get_supported_data():\n    \"\"\"Get supported commodities and regions.\"\"\"\n    try:\n        return {\n            \"success\": True,\n            \"message\": \"Supported data retrieved\",\n            \"data\": {\n                \"commodities\": settings.supported_commodities,\n                \"regions\": settings.supported_regions,\n                \"model_types\": [\"prophet\", \"lstm\", \"ensemble\"],\n                \"detection_types\": [\"temporal\", \"geographic\", \"both\"],\n                \"weather_types\": [\"TEMPERATURE\", \"RAINFALL\", \"HUMIDITY\", \"WIND_SPEED\", \"PRESSURE\"]\n            }\n        }\n        \n    except Exception as e:\n        ml_logger.error(\"Failed to get supported data\", error=str(e))\n        raise HTTPException(status_code=500, detail=\"Failed to get supported data\")\n\n\n# Training status endpoint\n@app.get(\"/api/v1/training/{training_id}\")\nasync def get_training_status(training_id: str):\n    \"\"\"Get training status by ID.\"\"\"\n    try:\n        training_state = await redis_manager.get_training_state(training_id)\n        \n        if not training_state:\n            raise HTTPException(status_code=404, detail=\"Training ID not found\")\n        \n        return {\n            \"success\": True,\n            \"message\": \"Training status retrieved\",\n            \"training_id\": training_id,\n            \"status\": training_state\n        }\n        \n    except HTTPException:\n        raise\n    except Exception as e:\n        ml_logger.error(\"Failed to get training status\", training_id=training_id, error=str(e))\n        raise HTTPException(status_code=500, detail=\"Failed to get training status\")\n\n\nif __name__ == \"__main__\":\n    # Run server\n    uvicorn.run(\n        \"app.api.main:app\",\n        host=settings.api_host,\n        port=settings.api_port,\n        reload=settings.debug,\n        log_level=settings.log_level.lower()\n    )\n
\ No newline at end of file
+from app.config.metadata import metadata_cache
+from app.models.schemas import (
+    PredictionRequest, BatchPredictionRequest, PredictionResponse, BatchPredictionResponse,
+    AnomalyDetectionRequest, AnomalyDetectionResponse, 
+    ModelPerformanceRequest, ModelPerformanceResponse,
+    RetrainingRequest, RetrainingResponse,
+    CorrelationAnalysisRequest, CorrelationAnalysisResponse,
+    HealthCheckResponse, ErrorResponseModel
+)
+from app.inference.predictor import prediction_service
+from app.inference.warmer import prediction_cache_warmer
+from app.training.trainer import ModelTrainer
+from app.models.registry import model_registry
+
+# Initialize logging
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan events."""
+    # Startup
+    ml_logger.info("Starting ML service application")
+    
+    try:
+        # Connect to Redis
+        await redis_manager.connect()
+        ml_logger.info("Redis connected successfully")
+        
+        # Test database connection
+        db_healthy = await db_manager.health_check()
+        if db_healthy:
+            ml_logger.info("Database connection verified")
+            
+            # Warm commodity and region lookups
+            await metadata_cache.load()
+            
+            # Keep hot predictions fresh ahead of cache expiry
+            if settings.cache_warmer_enabled:
+                prediction_cache_warmer.start()
+        else:
+            ml_logger.warning("Database connection failed")
+        
+        ml_logger.info("ML service startup completed")
+        
+    except Exception as e:
+        ml_logger.error("Failed to initialize ML service", error=str(e))
+        raise e
+    
+    yield
+    
+    # Shutdown
+    ml_logger.info("Shutting down ML service")
+    try:
+        await prediction_cache_warmer.stop()
+        prediction_service.shutdown()
+        await redis_manager.disconnect()
+        await db_manager.close()
+        ml_logger.info("ML service shutdown completed")
+    except Exception as e:
+        ml_logger.error("Error during shutdown", error=str(e))
+
+
+# Create FastAPI app
+app = FastAPI(
+    title=settings.app_name,
+    version=settings.app_version,
+    description="Machine Learning service untuk prediksi harga komoditas Indonesia",
+    lifespan=lifespan,
+    docs_url="/docs" if settings.debug else None,
+    redoc_url="/redoc" if settings.debug else None
+)
+
+# Add middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=settings.cors_origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+app.add_middleware(
+    TrustedHostMiddleware,
+    allowed_hosts=["*"] if settings.debug else ["localhost", "127.0.0.1"]
+)
+
+
+# Request/Response middleware
+@app.middleware("http")
+async def log_requests(request: Request, call_next):
+    """Log all requests for monitoring."""
+    start_time = time.time()
+    
+    # Process request
+    response = await call_next(request)
+    
+    # Calculate duration
+    duration_ms = (time.time() - start_time) * 1000
+    
+    # Log request
+    ml_logger.log_api_request(
+        endpoint=str(request.url.path),
+        method=request.method,
+        status_code=response.status_code,
+        duration_ms=duration_ms
+    )
+    
+    return response
+
+
+# Exception handlers
+@app.exception_handler(HTTPException)
+async def http_exception_handler(request: Request, exc: HTTPException):
+    """Handle HTTP exceptions."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "success": False,
+            "message": exc.detail,
+            "error_code": f"HTTP_{exc.status_code}",
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+
+@app.exception_handler(Exception)
+async def general_exception_handler(request: Request, exc: Exception):
+    """Handle general exceptions."""
+    ml_logger.error(
+        "Unhandled exception",
+        endpoint=str(request.url.path),
+        method=request.method,
+        error=str(exc)
+    )
+    
+    return JSONResponse(
+        status_code=500,
+        content={
+            "success": False,
+            "message": "Internal server error",
+            "error_code": "INTERNAL_ERROR",
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+
+# Health check endpoint
+@app.get("/health", response_model=HealthCheckResponse)
+async def health_check():
+    """Check service health."""
+    try:
+        health_status = await prediction_service.health_check()
+        
+        status = "healthy" if health_status.get("status") == "healthy" else "unhealthy"
+        
+        return HealthCheckResponse(
+            status=status,
+            services={
+                "database": health_status.get("database", False),
+                "redis": health_status.get("redis", False),
+                "models": health_status.get("models_available", False)
+            },
+            version=settings.app_version,
+            uptime_seconds=0,  # TODO: Calculate actual uptime
+            models_loaded=health_status.get("prediction_stats", {}).get("models_loaded", 0),
+            cache_hit_rate=health_status.get("prediction_stats", {}).get("cache_hit_rate", 0),
+            average_prediction_latency_ms=health_status.get("prediction_stats", {}).get("average_latency_ms", 0)
+        )
+        
+    except Exception as e:
+        ml_logger.error("Health check failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Health check failed")
+
+
+# Prediction endpoints
+@app.post("/api/v1/predict/price/{commodity_code}", response_model=PredictionResponse)
+async def predict_commodity_price(
+    commodity_code: str,
+    request: PredictionRequest
+):
+    """Predict price for a single commodity."""
+    try:
+        # Override commodity code from path
+        request.commodity_code = commodity_code.upper()
+        
+        # Make prediction
+        prediction_result = await prediction_service.predict_price(
+            commodity_code=request.commodity_code,
+            region_code=request.region_code,
+            horizon_days=request.horizon_days,
+            model_type=request.model_type,
+            include_uncertainty=request.include_uncertainty,
+            include_features=request.include_features,
+            lookback_days=request.lookback_days
+        )
+        
+        return PredictionResponse(
+            success=True,
+            message="Prediction completed successfully",
+            **prediction_result
+        )
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        ml_logger.error("Prediction failed", commodity_code=commodity_code, error=str(e))
+        raise HTTPException(status_code=500, detail="Prediction failed")
+
+
+@app.post("/api/v1/predict/batch", response_model=BatchPredictionResponse)
+async def batch_predict_prices(
+    request: BatchPredictionRequest
+):
+    """Perform batch predictions for multiple commodities."""
+    try:
+        # Convert requests to dict format
+        batch_requests = [req.dict() for req in request.requests]
+        
+        # Perform batch prediction
+        batch_result = await prediction_service.batch_predict(
+            requests=batch_requests,
+            max_workers=settings.batch_max_concurrency
+        )
+        
+        return BatchPredictionResponse(
+            success=True,
+            message="Batch prediction completed",
+            **batch_result
+        )
+        
+    except Exception as e:
+        ml_logger.error("Batch prediction failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Batch prediction failed")
+
+
+# Anomaly detection endpoints
+@app.post("/api/v1/predict/anomaly", response_model=AnomalyDetectionResponse)
+async def detect_price_anomalies(
+    request: AnomalyDetectionRequest
+):
+    """Detect price anomalies."""
+    try:
+        anomaly_result = await prediction_service.detect_anomalies(
+            commodity_code=request.commodity_code,
+            region_code=request.region_code,
+            detection_type=request.detection_type,
+            sensitivity=request.sensitivity,
+            time_window_days=request.time_window_days
+        )
+        
+        return AnomalyDetectionResponse(
+            success=True,
+            message="Anomaly detection completed",
+            **anomaly_result
+        )
+        
+    except Exception as e:
+        ml_logger.error("Anomaly detection failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Anomaly detection failed")
+
+
+@app.get("/api/v1/predict/anomaly/{region_code}", response_model=AnomalyDetectionResponse)
+async def detect_regional_anomalies(
+    region_code: str,
+    commodity_code: Optional[str] = None,
+    detection_type: str = "both",
+    sensitivity: float = 0.1,
+    time_window_days: int = 30
+):
+    """Detect anomalies for a specific region."""
+    try:
+        anomaly_result = await prediction_service.detect_anomalies(
+            commodity_code=commodity_code,
+            region_code=region_code,
+            detection_type=detection_type,
+            sensitivity=sensitivity,
+            time_window_days=time_window_days
+        )
+        
+        return AnomalyDetectionResponse(
+            success=True,
+            message=f"Regional anomaly detection completed for {region_code}",
+            **anomaly_result
+        )
+        
+    except Exception as e:
+        ml_logger.error(
+            "Regional anomaly detection failed",
+            region_code=region_code,
+            error=str(e)
+        )
+        raise HTTPException(status_code=500, detail="Regional anomaly detection failed")
+
+
+# Model management endpoints
+@app.get("/api/v1/models/accuracy", response_model=ModelPerformanceResponse)
+async def get_model_accuracy(
+    request: ModelPerformanceRequest = Depends()
+):
+    """Get model performance metrics."""
+    try:
+        # This is a placeholder - implement actual model performance tracking
+        performance_metrics = [
+            {
+                "model_name": "prophet_beras_national",
+                "commodity_code": "BERAS",
+                "evaluation_period": {
+                    "start": "2024-01-01T00:00:00",
+                    "end": "2024-12-31T23:59:59"
+                },
+                "metrics": {
+                    "mae": 1250.5,
+                    "rmse": 1875.3,
+                    "mape": 8.2,
+                    "r2": 0.85
+                },
+                "predictions_count": 365,
+                "accuracy_trend": []
+            }
+        ]
+        
+        return ModelPerformanceResponse(
+            success=True,
+            message="Model performance metrics retrieved",
+            models_evaluated=len(performance_metrics),
+            performance_metrics=performance_metrics,
+            overall_statistics={
+                "average_mape": 8.2,
+                "average_r2": 0.85
+            }
+        )
+        
+    except Exception as e:
+        ml_logger.error("Failed to get model performance", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to get model performance")
+
+
+@app.post("/api/v1/models/retrain", response_model=RetrainingResponse)
+async def retrain_model(
+    request: RetrainingRequest,
+    background_tasks: BackgroundTasks
+):
+    """Trigger model retraining."""
+    try:
+        # Generate training ID
+        training_id = f"train_{request.model_name}_{int(time.time())}"
+        
+        # Start background training task
+        background_tasks.add_task(
+            _background_retrain,
+            training_id=training_id,
+            model_name=request.model_name,
+            commodity_codes=request.commodity_codes,
+            force_retrain=request.force_retrain,
+            hyperparameters=request.hyperparameters,
+            training_config=request.training_config
+        )
+        
+        return RetrainingResponse(
+            success=True,
+            message="Model retraining started",
+            training_id=training_id,
+            model_name=request.model_name,
+            status="started",
+            estimated_duration_minutes=30,
+            training_config=request.training_config or {}
+        )
+        
+    except Exception as e:
+        ml_logger.error("Failed to start model retraining", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to start model retraining")
+
+
+async def _background_retrain(
+    training_id: str,
+    model_name: str,
+    commodity_codes: List[str] = None,
+    force_retrain: bool = False,
+    hyperparameters: Dict = None,
+    training_config: Dict = None
+):
+    """Background task for model retraining."""
+    try:
+        ml_logger.info("Starting background model retraining", training_id=training_id)
+        
+        # Update training state
+        await redis_manager.set_training_state(
+            training_id,
+            {
+                "status": "running",
+                "start_time": datetime.now().isoformat(),
+                "progress": 0
+            }
+        )
+        
+        # Initialize trainer
+        trainer = ModelTrainer()
+        
+        # Train models for specified commodities
+        if commodity_codes:
+            for i, commodity_code in enumerate(commodity_codes):
+                try:
+                    training_results = await trainer.train_commodity_models(
+                        commodity_code=commodity_code,
+                        model_types=[model_name] if model_name != "all" else ["prophet", "lstm"],
+                        retrain=force_retrain
+                    )
+                    
+                    # Redis entries are invalidated by the trainer; drop the in-process copies
+                    prediction_service.prediction_cache.invalidate(f"pred:{commodity_code}:")
+                    
+                    # Recompute the commodity's predictions with the new models
+                    await prediction_cache_warmer.warm([commodity_code], force=True)
+                    
+                    # Update progress
+                    progress = int(((i + 1) / len(commodity_codes)) * 100)
+                    await redis_manager.set_training_state(
+                        training_id,
+                        {
+                            "status": "running",
+                            "progress": progress,
+                            "current_commodity": commodity_code,
+                            "results": training_results
+                        }
+                    )
+                    
+                except Exception as e:
+                    ml_logger.error(
+                        "Failed to retrain commodity model",
+                        training_id=training_id,
+                        commodity_code=commodity_code,
+                        error=str(e)
+                    )
+        
+        # Mark as completed
+        await redis_manager.set_training_state(
+            training_id,
+            {
+                "status": "completed",
+                "progress": 100,
+                "end_time": datetime.now().isoformat()
+            }
+        )
+        
+        ml_logger.info("Background model retraining completed", training_id=training_id)
+        
+    except Exception as e:
+        ml_logger.error(
+            "Background model retraining failed",
+            training_id=training_id,
+            error=str(e)
+        )
+        
+        # Mark as failed
+        await redis_manager.set_training_state(
+            training_id,
+            {
+                "status": "failed",
+                "error": str(e),
+                "end_time": datetime.now().isoformat()
+            }
+        )
+
+
+# Analytics endpoints
+@app.post("/api/v1/analytics/correlation", response_model=CorrelationAnalysisResponse)
+async def analyze_weather_price_correlation(
+    request: CorrelationAnalysisRequest
+):
+    """Analyze weather-price correlation."""
+    try:
+        correlation_result = await prediction_service.analyze_price_correlation(
+            commodity_code=request.commodity_code,
+            region_codes=request.region_codes,
+            weather_types=request.weather_types,
+            time_window_days=request.time_window_days
+        )
+        
+        return CorrelationAnalysisResponse(
+            success=True,
+            message="Correlation analysis completed",
+            **correlation_result
+        )
+        
+    except Exception as e:
+        ml_logger.error("Correlation analysis failed", error=str(e))
+        raise HTTPException(status_code=500, detail="Correlation analysis failed")
+
+
+# Utility endpoints
+@app.get("/api/v1/stats")
+async def get_service_stats():
+    """Get service statistics."""
+    try:
+        prediction_stats = prediction_service.get_prediction_stats()
+        cache_stats = await redis_manager.get_cache_stats()
+        
+        return {
+            "success": True,
+            "message": "Service statistics retrieved",
+            "timestamp": datetime.now().isoformat(),
+            "prediction_stats": prediction_stats,
+            "cache_stats": cache_stats,
+            "model_registry_stats": model_registry.get_stats(),
+            "metadata_cache_stats": metadata_cache.get_stats(),
+            "cache_warmer_stats": prediction_cache_warmer.get_stats(),
+            "service_info": {
+                "name": settings.app_name,
+                "version": settings.app_version,
+                "environment": settings.environment
+            }
+        }
+        
+    except Exception as e:
+        ml_logger.error("Failed to get service stats", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to get service stats")
+
+
+@app.post("/api/v1/metadata/refresh")
+async def refresh_metadata():
+    """Invalidate and reload commodity and region metadata."""
+    try:
+        metadata_cache.invalidate()
+        await metadata_cache.load()
+        
+        return {
+            "success": True,
+            "message": "Metadata cache refreshed",
+            "timestamp": datetime.now().isoformat(),
+            "metadata_cache_stats": metadata_cache.get_stats()
+        }
+    
+    except Exception as e:
+        ml_logger.error("Failed to refresh metadata", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to refresh metadata")
+
+
+@app.get("/api/v1/supported")
+async def get_supported_data():
+    """Get supported commodities and regions."""
+    try:
+        return {
+            "success": True,
+            "message": "Supported data retrieved",
+            "data": {
+                "commodities": settings.supported_commodities,
+                "regions": settings.supported_regions,
+                "model_types": ["prophet", "lstm", "ensemble"],
+                "detection_types": ["temporal", "geographic", "both"],
+                "weather_types": ["TEMPERATURE", "RAINFALL", "HUMIDITY", "WIND_SPEED", "PRESSURE"]
+            }
+        }
+        
+    except Exception as e:
+        ml_logger.error("Failed to get supported data", error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to get supported data")
+
+
+# Training status endpoint
+@app.get("/api/v1/training/{training_id}")
+async def get_training_status(training_id: str):
+    """Get training status by ID."""
+    try:
+        training_state = await redis_manager.get_training_state(training_id)
+        
+        if not training_state:
+            raise HTTPException(status_code=404, detail="Training ID not found")
+        
+        return {
+            "success": True,
+            "message": "Training status retrieved",
+            "training_id": training_id,
+            "status": training_state
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        ml_logger.error("Failed to get training status", training_id=training_id, error=str(e))
+        raise HTTPException(status_code=500, detail="Failed to get training status")
+
+
+if __name__ == "__main__":
+    # Run server
+    uvicorn.run(
+        "app.api.main:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        reload=settings.debug,
+        log_level=settings.log_level.lower()
+    )
@@ -0,0 +1,106 @@
+"""In-memory metrics untuk Redis cache operations."""
+
+import bisect
+import random
+import threading
+from typing import Dict
+
+from app.config.settings import settings
+
+
+class CacheMetrics:
+    """Per key prefix operation counters and sampled latency histograms.
+    
+    Counters are kept for every operation; latencies only for a
+    ``sample_rate`` fraction so the hot path usually skips the timer.
+    """
+    
+    # Upper bounds (ms) of the latency buckets; the last bucket is open
+    LATENCY_BUCKETS_MS = (0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0)
+    
+    def __init__(self, sample_rate: float = None):
+        self.sample_rate = sample_rate if sample_rate is not None else settings.cache_metrics_sample_rate
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def should_sample(self) -> bool:
+        """Whether the next operation's latency should be measured."""
+        return self.sample_rate >= 1.0 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+    
+    def record(self, operation: str, key: str, hit: bool = None, duration_ms: float = None) -> None:
+        """Count one operation on ``key``, with its latency when sampled."""
+        
+        with self._lock:
+            stats = self._operation_stats(operation, key)
+            stats['count'] += 1
+            if hit is not None:
+                stats['hits' if hit else 'misses'] += 1
+            if duration_ms is not None:
+                self._add_latency(stats, duration_ms)
+    
+    def record_latency(self, operation: str, key: str, duration_ms: float) -> None:
+        """Add a latency sample without counting an operation."""
+        with self._lock:
+            self._add_latency(self._operation_stats(operation, key), duration_ms)
+    
+    def record_error(self, operation: str, key: str) -> None:
+        """Count a failed operation."""
+        with self._lock:
+            self._operation_stats(operation, key)['errors'] += 1
+    
+    def _operation_stats(self, operation: str, key: str) -> Dict:
+        """Stats entry of an operation under the key's prefix (before the first ':')."""
+        
+        prefix = key.split(':', 1)[0] if key else 'unknown'
+        operations = self._stats.setdefault(prefix, {})
+        stats = operations.get(operation)
+        if stats is None:
+            stats = operations[operation] = {
+                'count': 0, 'hits': 0, 'misses': 0, 'errors': 0,
+                'latency_samples': 0, 'latency_total_ms': 0.0, 'latency_max_ms': 0.0,
+                'latency_buckets': [0] * (len(self.LATENCY_BUCKETS_MS) + 1)
+            }
+        return stats
+    
+    def _add_latency(self, stats: Dict, duration_ms: float) -> None:
+        """Add one sample to an operation's histogram."""
+        stats['latency_samples'] += 1
+        stats['latency_total_ms'] += duration_ms
+        stats['latency_max_ms'] = max(stats['latency_max_ms'], duration_ms)
+        stats['latency_buckets'][bisect.bisect_left(self.LATENCY_BUCKETS_MS, duration_ms)] += 1
+    
+    def reset(self) -> None:
+        """Drop all collected metrics."""
+        with self._lock:
+            self._stats.clear()
+    
+    def get_stats(self) -> Dict:
+        """Get counters and latency histograms per key prefix and operation."""
+        
+        bucket_labels = [f"le_{bound:g}ms" for bound in self.LATENCY_BUCKETS_MS] + ['inf']
+        with self._lock:
+            return {
+                prefix: {
+                    operation: {
+                        'count': stats['count'],
+                        'hits': stats['hits'],
+                        'misses': stats['misses'],
+                        'errors': stats['errors'],
+                        'hit_rate': (
+                            stats['hits'] / (stats['hits'] + stats['misses']) * 100
+                            if stats['hits'] + stats['misses'] else 0.0
+                        ),
+                        'latency': {
+                            'samples': stats['latency_samples'],
+                            'avg_ms': (
+                                stats['latency_total_ms'] / stats['latency_samples']
+                                if stats['latency_samples'] else 0.0
+                            ),
+                            'max_ms': stats['latency_max_ms'],
+                            'histogram': dict(zip(bucket_labels, stats['latency_buckets']))
+                        }
+                    }
+                    for operation, stats in operations.items()
+                }
+                for prefix, operations in self._stats.items()
+            }
@@ -0,0 +1,209 @@
+"""Binary serialization codec untuk Redis cache payloads."""
+
+import json
+import pickle
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from app.config.settings import settings
+
+
+class CacheCodec:
+    """Versioned codec with a one-byte header in front of every payload.
+    
+    Header layout: ``110`` version bits, one zstd flag bit and a four-bit
+    format id. Legacy payloads (plain JSON text or pickle, whose first byte
+    is below 0x80 or exactly 0x80) never carry the v1 marker and are still
+    decoded the old way.
+    """
+    
+    VERSION_MASK = 0xE0
+    VERSION_1 = 0xC0
+    FLAG_ZSTD = 0x10
+    FORMAT_MASK = 0x0F
+    
+    FORMAT_JSON = 0x01
+    FORMAT_ORJSON = 0x02
+    FORMAT_MSGPACK = 0x03
+    FORMAT_ARROW = 0x04
+    FORMAT_PICKLE = 0x05
+    
+    FORMAT_NAMES = {
+        FORMAT_JSON: 'json',
+        FORMAT_ORJSON: 'orjson',
+        FORMAT_MSGPACK: 'msgpack',
+        FORMAT_ARROW: 'arrow',
+        FORMAT_PICKLE: 'pickle',
+        None: 'legacy'
+    }
+    
+    def __init__(self, compression_threshold: int = None, compression_level: int = None):
+        self.compression_threshold = (
+            compression_threshold if compression_threshold is not None
+            else settings.cache_compression_threshold_bytes
+        )
+        self.compression_level = compression_level or settings.cache_compression_level
+        self._compressor = zstandard.ZstdCompressor(level=self.compression_level) if zstandard else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard else None
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def encode(self, value: Any, key: str = None, use_pickle: bool = False) -> bytes:
+        """Serialize ``value`` and prepend the format header."""
+        
+        start_time = time.perf_counter()
+        
+        if use_pickle:
+            format_id, payload = self.FORMAT_PICKLE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        elif isinstance(value, pd.DataFrame) and pa is not None:
+            format_id, payload = self.FORMAT_ARROW, self._encode_arrow(value)
+        elif isinstance(value, pd.DataFrame):
+            format_id, payload = self.FORMAT_PICKLE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            format_id, payload = self._encode_document(value)
+        
+        header = self.VERSION_1 | format_id
+        if self._compressor is not None and len(payload) > self.compression_threshold:
+            payload = self._compressor.compress(payload)
+            header |= self.FLAG_ZSTD
+        
+        data = bytes([header]) + payload
+        self._record(key, 'encode', format_id, time.perf_counter() - start_time, len(data))
+        return data
+    
+    def decode(self, data: bytes, key: str = None) -> Any:
+        """Deserialize a payload written by ``encode`` or a legacy writer."""
+        
+        start_time = time.perf_counter()
+        header = data[0] if data else 0
+        
+        if header & self.VERSION_MASK != self.VERSION_1:
+            format_id, value = None, self._decode_legacy(data)
+        else:
+            format_id = header & self.FORMAT_MASK
+            payload = memoryview(data)[1:]
+            
+            if header & self.FLAG_ZSTD:
+                if self._decompressor is None:
+                    raise ValueError("Payload is zstd compressed but zstandard is not installed")
+                payload = self._decompressor.decompress(payload)
+            
+            value = self._decode_payload(format_id, payload)
+        
+        self._record(key, 'decode', format_id, time.perf_counter() - start_time, len(data))
+        return value
+    
+    def _encode_document(self, value: Any) -> Tuple[int, bytes]:
+        """Encode dict/list payloads with the fastest available serializer."""
+        
+        if orjson is not None:
+            return self.FORMAT_ORJSON, orjson.dumps(
+                value,
+                default=str,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            )
+        
+        if msgpack is not None:
+            return self.FORMAT_MSGPACK, msgpack.packb(value, default=str, use_bin_type=True)
+        
+        return self.FORMAT_JSON, json.dumps(value, default=str).encode('utf-8')
+    
+    def _decode_payload(self, format_id: int, payload) -> Any:
+        """Decode a header-less payload of a known format."""
+        
+        if format_id == self.FORMAT_ORJSON:
+            if orjson is not None:
+                return orjson.loads(payload)
+            return json.loads(bytes(payload).decode('utf-8'))
+        
+        if format_id == self.FORMAT_JSON:
+            return json.loads(bytes(payload).decode('utf-8'))
+        
+        if format_id == self.FORMAT_MSGPACK:
+            if msgpack is None:
+                raise ValueError("Payload is msgpack but msgpack is not installed")
+            return msgpack.unpackb(payload, raw=False)
+        
+        if format_id == self.FORMAT_ARROW:
+            if pa is None:
+                raise ValueError("Payload is Arrow IPC but pyarrow is not installed")
+            return pa.ipc.open_stream(pa.py_buffer(payload)).read_all().to_pandas()
+        
+        if format_id == self.FORMAT_PICKLE:
+            return pickle.loads(payload)
+        
+        raise ValueError(f"Unknown cache payload format: {format_id}")
+    
+    def _encode_arrow(self, df: pd.DataFrame) -> bytes:
+        """Serialize a DataFrame as an Arrow IPC stream."""
+        table = pa.Table.from_pandas(df)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    
+    @staticmethod
+    def _decode_legacy(data: bytes) -> Any:
+        """Decode payloads written before the codec (JSON, else pickle)."""
+        try:
+            return json.loads(data.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return pickle.loads(data)
+    
+    def _record(self, key: str, operation: str, format_id: int, duration_s: float, size_bytes: int) -> None:
+        """Accumulate timings per key namespace (the part before the first ':')."""
+        
+        namespace = key.split(':', 1)[0] if key else 'unknown'
+        with self._lock:
+            stats = self._stats.setdefault(namespace, {
+                'encode_count': 0, 'encode_ms': 0.0, 'encode_bytes': 0,
+                'decode_count': 0, 'decode_ms': 0.0, 'decode_bytes': 0,
+                'formats': {}
+            })
+            stats[f'{operation}_count'] += 1
+            stats[f'{operation}_ms'] += duration_s * 1000
+            stats[f'{operation}_bytes'] += size_bytes
+            
+            format_name = self.FORMAT_NAMES.get(format_id, 'unknown')
+            stats['formats'][format_name] = stats['formats'].get(format_name, 0) + 1
+    
+    def get_stats(self) -> Dict:
+        """Get per-namespace encode/decode statistics."""
+        
+        with self._lock:
+            return {
+                namespace: {
+                    **stats,
+                    'formats': dict(stats['formats']),
+                    'avg_encode_ms': stats['encode_ms'] / stats['encode_count'] if stats['encode_count'] else 0.0,
+                    'avg_decode_ms': stats['decode_ms'] / stats['decode_count'] if stats['decode_count'] else 0.0
+                }
+                for namespace, stats in self._stats.items()
+            }
+
+
+# Global cache codec instance
+cache_codec = CacheCodec()
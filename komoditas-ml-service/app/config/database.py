@@ -1,19 +1,77 @@
 """Database configuration untuk ML service."""
 
 import asyncio
-from typing import AsyncGenerator, Generator
+import json
+import time
+from datetime import datetime
+from itertools import islice
+from typing import AsyncGenerator, Generator, Iterable, Iterator
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.config.logging import ml_logger
 from app.config.settings import settings
 
 
+def _chunked(records: Iterable, size: int) -> Iterator[list]:
+    """Yield lists of at most ``size`` records."""
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 class DatabaseManager:
     """Database manager untuk ML service."""
     
+    COMMODITIES_QUERY = """
+        SELECT 
+            id,
+            name,
+            code,
+            type,
+            unit,
+            category,
+            is_strategic,
+            description
+        FROM commodities
+        ORDER BY code
+        """
+    
+    PREDICTION_COLUMNS = [
+        "commodity_id", "region_id", "predicted_price", "current_price",
+        "price_change", "confidence", "prediction_date", "model_version",
+        "algorithm", "features", "created_at"
+    ]
+    
+    PREDICTION_CONFLICT_COLUMNS = ["commodity_id", "region_id", "prediction_date", "algorithm"]
+    
+    # Migration creating the NULLS NOT DISTINCT index upserts conflict on
+    PREDICTION_UPSERT_MIGRATION = "docker/postgres/migrations/001_predictions_upsert_key.sql"
+    
+    # SQLSTATE when ON CONFLICT has no matching unique index
+    NO_UNIQUE_INDEX_SQLSTATE = "42P10"
+    
+    PRICE_CATEGORICAL_COLUMNS = [
+        "currency", "price_type", "source", "commodity_code", "commodity_name",
+        "commodity_type", "region_code", "region_name"
+    ]
+    
+    REGIONS_QUERY = """
+        SELECT 
+            id,
+            name,
+            code,
+            type,
+            latitude,
+            longitude
+        FROM regions
+        ORDER BY code
+        """
+    
     def __init__(self):
         # Sync engine untuk training dan batch processing
         self.sync_engine = create_engine(
@@ -63,18 +121,28 @@ class DatabaseManager:
         async with self.async_session_maker() as session:
             yield session
     
-    def get_price_data(
+    def _build_price_query(
         self,
         commodity_codes: list[str] = None,
         region_codes: list[str] = None,
         start_date: str = None,
         end_date: str = None,
-        price_type: str = "KONSUMEN"
-    ) -> pd.DataFrame:
-        """Get price data untuk ML training dan inference."""
+        price_type: str = "KONSUMEN",
+        changed_since: datetime = None
+    ) -> tuple[str, dict]:
+        """Build price data query and parameters.
         
-        query = """
-        SELECT 
+        With ``changed_since`` the query selects every row inserted or
+        updated after that time, validated or not, with ``updated_at`` and
+        ``is_validated`` so a copy can track later changes.
+        """
+        
+        sync_columns = """
+            p.updated_at,
+            p.is_validated,""" if changed_since is not None else ""
+        
+        query = f"""
+        SELECT {sync_columns}
             p.id,
             p.date,
             p.price,
@@ -91,11 +159,17 @@ class DatabaseManager:
         FROM prices p
         JOIN commodities c ON p.commodity_id = c.id
         JOIN regions r ON p.region_id = r.id
-        WHERE p.is_validated = true
+        WHERE 1=1
         """
         
         params = {}
         
+        if changed_since is not None:
+            query += " AND p.updated_at > :changed_since"
+            params["changed_since"] = changed_since
+        else:
+            query += " AND p.is_validated = true"
+        
         if commodity_codes:
             query += " AND c.code = ANY(:commodity_codes)"
             params["commodity_codes"] = commodity_codes
@@ -118,6 +192,22 @@ class DatabaseManager:
         
         query += " ORDER BY p.date ASC, c.code, r.code"
         
+        return query, params
+    
+    def get_price_data(
+        self,
+        commodity_codes: list[str] = None,
+        region_codes: list[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        price_type: str = "KONSUMEN"
+    ) -> pd.DataFrame:
+        """Get price data untuk ML training dan inference."""
+        
+        query, params = self._build_price_query(
+            commodity_codes, region_codes, start_date, end_date, price_type
+        )
+        
         with self.sync_engine.connect() as conn:
             return pd.read_sql_query(
                 text(query),
@@ -126,14 +216,63 @@ class DatabaseManager:
                 parse_dates=["date"]
             )
     
-    def get_weather_data(
+    def stream_price_data(
+        self,
+        commodity_codes: list[str] = None,
+        region_codes: list[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        price_type: str = "KONSUMEN",
+        chunk_size: int = None,
+        changed_since: datetime = None
+    ) -> Iterator[pd.DataFrame]:
+        """Stream price data in typed chunks through a server-side cursor."""
+        
+        chunk_size = chunk_size or settings.price_stream_chunk_size
+        query, params = self._build_price_query(
+            commodity_codes, region_codes, start_date, end_date, price_type, changed_since
+        )
+        
+        with self.sync_engine.connect() as conn:
+            # Server-side cursor; only one chunk of rows is buffered client side
+            result = conn.execution_options(
+                stream_results=True,
+                yield_per=chunk_size
+            ).execute(text(query), params)
+            keys = list(result.keys())
+            
+            for rows in result.partitions():
+                yield self._price_chunk(keys, rows)
+    
+    async def get_price_data_async(
+        self,
+        commodity_codes: list[str] = None,
+        region_codes: list[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        price_type: str = "KONSUMEN"
+    ) -> dict[str, np.ndarray]:
+        """Get price data as NumPy columns via the async engine."""
+        
+        query, params = self._build_price_query(
+            commodity_codes, region_codes, start_date, end_date, price_type
+        )
+        
+        return await self._fetch_columns(
+            query,
+            params,
+            date_columns=["date"],
+            float_columns=["price", "latitude", "longitude"]
+        )
+    
+    def _build_weather_query(
         self,
         region_codes: list[str] = None,
         start_date: str = None,
         end_date: str = None,
         weather_types: list[str] = None
-    ) -> pd.DataFrame:
-        """Get weather data untuk correlation analysis."""
+    ) -> tuple[str, dict]:
+        """Build weather data query and parameters."""
         
         query = """
         SELECT 
@@ -172,6 +311,21 @@ class DatabaseManager:
         
         query += " ORDER BY w.date ASC, r.code, w.weather_type"
         
+        return query, params
+    
+    def get_weather_data(
+        self,
+        region_codes: list[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        weather_types: list[str] = None
+    ) -> pd.DataFrame:
+        """Get weather data untuk correlation analysis."""
+        
+        query, params = self._build_weather_query(
+            region_codes, start_date, end_date, weather_types
+        )
+        
         with self.sync_engine.connect() as conn:
             return pd.read_sql_query(
                 text(query),
@@ -180,95 +334,242 @@ class DatabaseManager:
                 parse_dates=["date"]
             )
     
+    async def get_weather_data_async(
+        self,
+        region_codes: list[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        weather_types: list[str] = None
+    ) -> dict[str, np.ndarray]:
+        """Get weather data as NumPy columns via the async engine."""
+        
+        query, params = self._build_weather_query(
+            region_codes, start_date, end_date, weather_types
+        )
+        
+        return await self._fetch_columns(
+            query,
+            params,
+            date_columns=["date"],
+            float_columns=["value", "latitude", "longitude"]
+        )
+    
     def get_commodities_info(self) -> pd.DataFrame:
         """Get commodities information."""
         
-        query = """
-        SELECT 
-            id,
-            name,
-            code,
-            type,
-            unit,
-            category,
-            is_strategic,
-            description
-        FROM commodities
-        ORDER BY code
-        """
-        
         with self.sync_engine.connect() as conn:
-            return pd.read_sql_query(text(query), conn)
+            return pd.read_sql_query(text(self.COMMODITIES_QUERY), conn)
     
     def get_regions_info(self) -> pd.DataFrame:
         """Get regions information."""
         
-        query = """
-        SELECT 
-            id,
-            name,
-            code,
-            type,
-            latitude,
-            longitude
-        FROM regions
-        ORDER BY code
-        """
-        
         with self.sync_engine.connect() as conn:
-            return pd.read_sql_query(text(query), conn)
+            return pd.read_sql_query(text(self.REGIONS_QUERY), conn)
+    
+    async def get_commodities_info_async(self) -> dict[str, np.ndarray]:
+        """Get commodities information as NumPy columns."""
+        return await self._fetch_columns(self.COMMODITIES_QUERY)
+    
+    async def get_regions_info_async(self) -> dict[str, np.ndarray]:
+        """Get regions information as NumPy columns."""
+        return await self._fetch_columns(
+            self.REGIONS_QUERY,
+            float_columns=["latitude", "longitude"]
+        )
+    
+    async def _fetch_columns(
+        self,
+        query: str,
+        params: dict = None,
+        date_columns: list[str] = None,
+        float_columns: list[str] = None
+    ) -> dict[str, np.ndarray]:
+        """Run a query on the async engine and return one array per column."""
+        
+        params = dict(params or {})
+        
+        # asyncpg needs datetime objects rather than ISO strings
+        for key in ("start_date", "end_date"):
+            if isinstance(params.get(key), str):
+                params[key] = pd.Timestamp(params[key]).to_pydatetime()
+        
+        async with self.async_engine.connect() as conn:
+            result = await conn.execute(text(query), params)
+            keys = list(result.keys())
+            rows = result.all()
+        
+        return self._rows_to_columns(keys, rows, date_columns, float_columns)
+    
+    @classmethod
+    def _price_chunk(cls, keys: list[str], rows: list) -> pd.DataFrame:
+        """Build a typed price frame with categorical code/name columns."""
+        
+        columns = cls._rows_to_columns(
+            keys,
+            rows,
+            date_columns=["date", "updated_at"],
+            float_columns=["price", "latitude", "longitude"]
+        )
+        
+        chunk = pd.DataFrame(columns)
+        for column in cls.PRICE_CATEGORICAL_COLUMNS:
+            if column in chunk.columns:
+                chunk[column] = chunk[column].astype("category")
+        
+        return chunk
+    
+    @staticmethod
+    def _rows_to_columns(
+        keys: list[str],
+        rows: list,
+        date_columns: list[str] = None,
+        float_columns: list[str] = None
+    ) -> dict[str, np.ndarray]:
+        """Transpose result rows into typed NumPy arrays."""
+        
+        date_columns = set(date_columns or [])
+        float_columns = set(float_columns or [])
+        values_by_column = list(zip(*rows)) if rows else [()] * len(keys)
+        
+        columns = {}
+        for key, values in zip(keys, values_by_column):
+            if key in date_columns:
+                columns[key] = np.array(values, dtype="datetime64[ns]")
+            elif key in float_columns:
+                # NUMERIC arrives as Decimal, NULL as None -> NaN
+                columns[key] = np.array(
+                    [np.nan if value is None else float(value) for value in values],
+                    dtype=np.float64
+                )
+            elif not values or any(value is None for value in values):
+                columns[key] = np.array(values, dtype=object)
+            else:
+                columns[key] = np.array(values)
+                if columns[key].dtype.kind == "U":
+                    columns[key] = columns[key].astype(object)
+        
+        return columns
     
     async def save_predictions(
         self,
         predictions: list[dict],
         model_version: str,
-        algorithm: str
-    ) -> None:
-        """Save predictions ke database."""
+        algorithm: str,
+        upsert: bool = False,
+        conflict_columns: list[str] = None,
+        chunk_size: int = None
+    ) -> dict:
+        """Bulk save predictions ke database via COPY.
         
-        async with self.async_session_maker() as session:
-            try:
-                # Insert predictions using raw SQL for better performance
-                query = """
-                INSERT INTO predictions 
-                (commodity_id, region_id, predicted_price, current_price, 
-                 price_change, confidence, prediction_date, model_version, 
-                 algorithm, features, created_at)
-                VALUES 
-                """
-                
-                values = []
-                params = {}
-                
-                for i, pred in enumerate(predictions):
-                    values.append(f"""
-                    (:commodity_id_{i}, :region_id_{i}, :predicted_price_{i}, 
-                     :current_price_{i}, :price_change_{i}, :confidence_{i}, 
-                     :prediction_date_{i}, :model_version_{i}, :algorithm_{i}, 
-                     :features_{i}, NOW())
-                    """)
-                    
-                    params.update({
-                        f"commodity_id_{i}": pred["commodity_id"],
-                        f"region_id_{i}": pred.get("region_id"),
-                        f"predicted_price_{i}": pred["predicted_price"],
-                        f"current_price_{i}": pred["current_price"],
-                        f"price_change_{i}": pred["price_change"],
-                        f"confidence_{i}": pred["confidence"],
-                        f"prediction_date_{i}": pred["prediction_date"],
-                        f"model_version_{i}": model_version,
-                        f"algorithm_{i}": algorithm,
-                        f"features_{i}": pred.get("features", {}),
-                    })
-                
-                full_query = query + ",".join(values)
+        With ``upsert`` rows are copied into a staging table and merged with
+        ON CONFLICT DO UPDATE. The unique index over ``conflict_columns``
+        (NULLS NOT DISTINCT, so national predictions share one key) comes
+        from PREDICTION_UPSERT_MIGRATION; without it the upsert fails.
+        """
+        
+        chunk_size = chunk_size or settings.prediction_copy_chunk_size
+        conflict_columns = conflict_columns or self.PREDICTION_CONFLICT_COLUMNS
+        start_time = time.perf_counter()
+        created_at = datetime.now()
+        rows_written = 0
+        
+        records = (
+            self._prediction_record(pred, model_version, algorithm, created_at)
+            for pred in predictions
+        )
+        
+        async with self.async_engine.connect() as conn:
+            raw_connection = await conn.get_raw_connection()
+            copy_connection = raw_connection.driver_connection
+            
+            async with copy_connection.transaction():
+                target_table = "predictions"
+                if upsert:
+                    target_table = "predictions_staging"
+                    await copy_connection.execute(
+                        "CREATE TEMP TABLE predictions_staging "
+                        "(LIKE predictions INCLUDING DEFAULTS) ON COMMIT DROP"
+                    )
                 
-                await session.execute(text(full_query), params)
-                await session.commit()
+                # Stream rows through COPY in bounded chunks
+                for chunk in _chunked(records, chunk_size):
+                    await copy_connection.copy_records_to_table(
+                        target_table,
+                        records=chunk,
+                        columns=self.PREDICTION_COLUMNS
+                    )
+                    rows_written += len(chunk)
                 
-            except Exception as e:
-                await session.rollback()
-                raise e
+                if upsert:
+                    try:
+                        await copy_connection.execute(
+                            self._build_upsert_query(conflict_columns)
+                        )
+                    except Exception as e:
+                        if getattr(e, "sqlstate", None) != self.NO_UNIQUE_INDEX_SQLSTATE:
+                            raise
+                        raise RuntimeError(
+                            f"No unique index on predictions ({', '.join(conflict_columns)}); "
+                            f"apply {self.PREDICTION_UPSERT_MIGRATION} before upserting"
+                        ) from e
+        
+        duration_s = time.perf_counter() - start_time
+        stats = {
+            'rows': rows_written,
+            'duration_ms': duration_s * 1000,
+            'rows_per_second': rows_written / duration_s if duration_s > 0 else 0.0,
+            'upsert': upsert
+        }
+        
+        ml_logger.info("Predictions saved", **stats)
+        
+        return stats
+    
+    @staticmethod
+    def _prediction_record(
+        pred: dict,
+        model_version: str,
+        algorithm: str,
+        created_at: datetime
+    ) -> tuple:
+        """Build one COPY record in PREDICTION_COLUMNS order."""
+        
+        prediction_date = pred["prediction_date"]
+        if isinstance(prediction_date, str):
+            prediction_date = datetime.fromisoformat(prediction_date)
+        
+        return (
+            pred["commodity_id"],
+            pred.get("region_id"),
+            pred["predicted_price"],
+            pred["current_price"],
+            pred["price_change"],
+            pred["confidence"],
+            prediction_date,
+            model_version,
+            algorithm,
+            json.dumps(pred.get("features", {}), default=str),
+            created_at
+        )
+    
+    def _build_upsert_query(self, conflict_columns: list[str]) -> str:
+        """Merge staged rows into predictions, keeping the last row per key."""
+        
+        columns = ", ".join(self.PREDICTION_COLUMNS)
+        conflict = ", ".join(conflict_columns)
+        updates = ", ".join(
+            f"{column} = EXCLUDED.{column}"
+            for column in self.PREDICTION_COLUMNS
+            if column not in conflict_columns
+        )
+        
+        return f"""
+        INSERT INTO predictions ({columns})
+        SELECT DISTINCT ON ({conflict}) {columns}
+        FROM predictions_staging
+        ORDER BY {conflict}, ctid DESC
+        ON CONFLICT ({conflict}) DO UPDATE SET {updates}
+        """
     
     async def health_check(self) -> bool:
         """Check database connection health."""
@@ -73,7 +73,8 @@ def log_model_performance(
     if dataset_info:
         log_data["dataset_info"] = dataset_info
     
-    logger.info("Model performance logged", **log_data)
+    # "event" is structlog's own key, so the readable text goes under "message"
+    logger.info(message="Model performance logged", **log_data)
 
 
 def log_prediction_request(
@@ -101,7 +102,7 @@ def log_prediction_request(
     if latency_ms:
         log_data["latency_ms"] = latency_ms
     
-    logger.info("Prediction request processed", **log_data)
+    logger.info(message="Prediction request processed", **log_data)
 
 
 def log_anomaly_detection(
@@ -127,7 +128,7 @@ def log_anomaly_detection(
     if details:
         log_data["details"] = details
     
-    logger.warning("Anomaly detected", **log_data)
+    logger.warning(message="Anomaly detected", **log_data)
 
 
 def log_model_training(
@@ -151,7 +152,7 @@ def log_model_training(
     if hyperparameters:
         log_data["hyperparameters"] = hyperparameters
     
-    logger.info("Model training completed", **log_data)
+    logger.info(message="Model training completed", **log_data)
 
 
 def log_data_quality_check(
@@ -176,9 +177,9 @@ def log_data_quality_check(
         log_data["issues"] = issues
     
     if quality_score < 0.8:
-        logger.warning("Low data quality detected", **log_data)
+        logger.warning(message="Low data quality detected", **log_data)
     else:
-        logger.info("Data quality check passed", **log_data)
+        logger.info(message="Data quality check passed", **log_data)
 
 
 class MLServiceLogger:
@@ -203,6 +204,11 @@ class MLServiceLogger:
         """Log debug message."""
         self.logger.debug(message, **kwargs)
     
+    @property
+    def debug_enabled(self) -> bool:
+        """Whether debug events would actually be emitted."""
+        return logging.getLogger("ml-service").isEnabledFor(logging.DEBUG)
+    
     def log_api_request(
         self,
         endpoint: str,
@@ -225,9 +231,27 @@ class MLServiceLogger:
             log_data["user_id"] = user_id
         
         if status_code >= 400:
-            self.logger.error("API request failed", **log_data)
+            self.logger.error(message="API request failed", **log_data)
         else:
-            self.logger.info("API request completed", **log_data)
+            self.logger.info(message="API request completed", **log_data)
+    
+    def log_prediction_request(
+        self,
+        request_id: str,
+        commodity_code: str,
+        region_code: str = None,
+        prediction_horizon: int = None,
+        latency_ms: float = None
+    ) -> None:
+        """Log prediction request details."""
+        log_prediction_request(
+            self.logger,
+            request_id=request_id,
+            commodity_code=commodity_code,
+            region_code=region_code,
+            prediction_horizon=prediction_horizon,
+            latency_ms=latency_ms
+        )
     
     def log_cache_operation(
         self,
@@ -238,6 +262,10 @@ class MLServiceLogger:
     ) -> None:
         """Log cache operation."""
         
+        # Skip building the event when debug output is off
+        if not self.debug_enabled:
+            return
+        
         log_data = {
             "event": "cache_operation",
             "operation": operation,
@@ -250,7 +278,7 @@ class MLServiceLogger:
         if duration_ms is not None:
             log_data["duration_ms"] = duration_ms
         
-        self.logger.debug("Cache operation", **log_data)
+        self.logger.debug(message="Cache operation", **log_data)
 
 
 # Global logger instance
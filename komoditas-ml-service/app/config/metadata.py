@@ -0,0 +1,136 @@
+"""In-memory metadata cache untuk commodities dan regions."""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.config.database import db_manager
+from app.config.logging import ml_logger
+from app.config.settings import settings
+
+
+class MetadataCache:
+    """Refreshable lookup tables for commodity and region dimensions."""
+    
+    def __init__(self, ttl_seconds: int = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.metadata_cache_ttl_seconds
+        self.commodities = {}
+        self.regions = {}
+        self.loaded_at = None
+        self._load_task = None
+        self._refresh_task = None
+    
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the lookup tables have been loaded."""
+        return self.loaded_at is not None
+    
+    @property
+    def is_stale(self) -> bool:
+        """Whether the lookup tables are older than the TTL."""
+        return not self.is_loaded or time.monotonic() - self.loaded_at > self.ttl_seconds
+    
+    async def load(self) -> None:
+        """Load commodities and regions; concurrent callers share one load."""
+        
+        # Only share a load started on this event loop
+        load_task = self._load_task
+        if load_task is None or load_task.done() or load_task.get_loop() is not asyncio.get_running_loop():
+            self._load_task = load_task = asyncio.ensure_future(self._load())
+        
+        await asyncio.shield(load_task)
+    
+    async def _load(self) -> None:
+        """Query both dimension tables and rebuild the lookups."""
+        
+        start_time = time.time()
+        
+        try:
+            commodity_columns, region_columns = await asyncio.gather(
+                db_manager.get_commodities_info_async(),
+                db_manager.get_regions_info_async()
+            )
+            
+            self.commodities = self._index_by_code(commodity_columns)
+            self.regions = self._index_by_code(region_columns)
+            self.loaded_at = time.monotonic()
+            
+            ml_logger.info(
+                "Metadata cache loaded",
+                commodities=len(self.commodities),
+                regions=len(self.regions),
+                duration_ms=(time.time() - start_time) * 1000
+            )
+        
+        except Exception as e:
+            ml_logger.error("Failed to load metadata cache", error=str(e))
+            raise e
+    
+    async def ensure_fresh(self) -> None:
+        """Load on first use and refresh stale tables in the background."""
+        
+        if not self.is_loaded:
+            await self.load()
+        elif self.is_stale and (self._refresh_task is None or self._refresh_task.done()):
+            # Serve current entries while the refresh runs
+            self._refresh_task = asyncio.ensure_future(self._refresh())
+    
+    async def _refresh(self) -> None:
+        """Background refresh that keeps old entries on failure."""
+        try:
+            await self.load()
+        except Exception:
+            pass
+    
+    def invalidate(self) -> None:
+        """Drop cached entries so the next access reloads them."""
+        self.commodities = {}
+        self.regions = {}
+        self.loaded_at = None
+        
+        ml_logger.info("Metadata cache invalidated")
+    
+    def get_commodity(self, commodity_code: str) -> Optional[Dict]:
+        """Get commodity record by code."""
+        return self.commodities.get(commodity_code)
+    
+    def get_region(self, region_code: str) -> Optional[Dict]:
+        """Get region record by code."""
+        return self.regions.get(region_code)
+    
+    def commodity_name(self, commodity_code: str) -> str:
+        """Commodity display name, falling back to the code."""
+        commodity = self.commodities.get(commodity_code)
+        return commodity['name'] if commodity else commodity_code
+    
+    def region_name(self, region_code: str) -> str:
+        """Region display name, falling back to the code."""
+        region = self.regions.get(region_code)
+        return region['name'] if region else region_code
+    
+    def get_stats(self) -> Dict:
+        """Get metadata cache statistics."""
+        return {
+            'commodities': len(self.commodities),
+            'regions': len(self.regions),
+            'age_seconds': time.monotonic() - self.loaded_at if self.is_loaded else None,
+            'ttl_seconds': self.ttl_seconds,
+            'stale': self.is_stale
+        }
+    
+    @staticmethod
+    def _index_by_code(columns: Dict[str, np.ndarray]) -> Dict[str, Dict]:
+        """Build a code -> record mapping from columnar results."""
+        if 'code' not in columns:
+            return {}
+        
+        names = list(columns)
+        code_position = names.index('code')
+        records = zip(*(columns[name].tolist() for name in names))
+        return {record[code_position]: dict(zip(names, record)) for record in records}
+
+
+# Global metadata cache instance
+metadata_cache = MetadataCache()
@@ -1,12 +1,15 @@
 """Redis configuration untuk ML service caching dan feature store."""
 
-import json
-import pickle
-from typing import Any, Optional, Union
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 
 import redis.asyncio as redis
 from redis.asyncio import Redis
+from redis.exceptions import ResponseError
 
+from app.config.cache_metrics import CacheMetrics
+from app.config.codec import cache_codec
 from app.config.logging import ml_logger
 from app.config.settings import settings
 
@@ -14,9 +17,14 @@ from app.config.settings import settings
 class RedisManager:
     """Redis manager untuk ML service operations."""
     
+    # UNLINK batches queued per pipeline round trip
+    UNLINK_PIPELINE_DEPTH = 10
+    
     def __init__(self):
         self.redis_client: Optional[Redis] = None
         self._connected = False
+        self.codec = cache_codec
+        self.metrics = CacheMetrics()
     
     async def connect(self) -> None:
         """Connect to Redis."""
@@ -64,25 +72,20 @@ class RedisManager:
             return None
         
         try:
-            start_time = ml_logger.logger.bind(cache_key=key)
-            
+            start_time = self._start_timer()
             data = await self.redis_client.get(key)
             
             if data is None:
-                ml_logger.log_cache_operation("get", key, hit=False)
+                self._observe("get", key, start_time, hit=False)
                 return None
             
-            # Try to decode as JSON first, then pickle
-            try:
-                result = json.loads(data.decode('utf-8'))
-                ml_logger.log_cache_operation("get", key, hit=True)
-                return result
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                result = pickle.loads(data)
-                ml_logger.log_cache_operation("get", key, hit=True)
-                return result
+            # Format comes from the payload header, no trial decoding
+            result = self.codec.decode(data, key=key)
+            self._observe("get", key, start_time, hit=True)
+            return result
                 
         except Exception as e:
+            self.metrics.record_error("get", key)
             ml_logger.error("Cache get operation failed", key=key, error=str(e))
             return None
     
@@ -91,40 +94,140 @@ class RedisManager:
         key: str,
         value: Any,
         expire: int = 3600,
-        use_pickle: bool = False
+        use_pickle: bool = False,
+        tags: Optional[List[str]] = None
     ) -> bool:
-        """Set cached data."""
+        """Set cached data, registering the key under ``tags``."""
         if not self._connected or not self.redis_client:
             return False
         
         try:
-            if use_pickle:
-                data = pickle.dumps(value)
-            else:
-                data = json.dumps(value, default=str).encode('utf-8')
+            start_time = self._start_timer()
+            data = self.codec.encode(value, key=key, use_pickle=use_pickle)
             
-            await self.redis_client.setex(key, expire, data)
-            ml_logger.log_cache_operation("set", key)
+            if tags:
+                # Value and tag memberships in one round trip
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.setex(key, expire, data)
+                for tag in tags:
+                    tag_key = self._tag_key(tag)
+                    pipe.sadd(tag_key, key)
+                    pipe.expire(tag_key, settings.cache_tag_ttl_seconds)
+                await pipe.execute()
+            else:
+                await self.redis_client.setex(key, expire, data)
+            self._observe("set", key, start_time)
             return True
             
         except Exception as e:
+            self.metrics.record_error("set", key)
             ml_logger.error("Cache set operation failed", key=key, error=str(e))
             return False
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several cached entries with one MGET; misses are left out."""
+        if not self._connected or not self.redis_client or not keys:
+            return {}
+        
+        try:
+            start_time = self._start_timer()
+            values = await self.redis_client.mget(keys)
+            
+            results = {}
+            for key, data in zip(keys, values):
+                if data is not None:
+                    try:
+                        results[key] = self.codec.decode(data, key=key)
+                    except Exception as e:
+                        # An undecodable entry is a miss, not a failed batch
+                        ml_logger.error("Cache decode failed", key=key, error=str(e))
+                self.metrics.record("mget", key, hit=key in results)
+            
+            # One latency sample per round trip, under the first key's prefix
+            if start_time is not None:
+                self._observe_latency("mget", keys[0], start_time, hit=bool(results))
+            return results
+        
+        except Exception as e:
+            self.metrics.record_error("mget", keys[0])
+            ml_logger.error("Cache mget operation failed", keys=len(keys), error=str(e))
+            return {}
+    
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        expire: int = 3600,
+        tags: Optional[Dict[str, List[str]]] = None
+    ) -> bool:
+        """Set several entries and their tag memberships in one pipeline."""
+        if not self._connected or not self.redis_client or not items:
+            return False
+        
+        try:
+            start_time = self._start_timer()
+            tags = tags or {}
+            tag_keys = set()
+            
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.setex(key, expire, self.codec.encode(value, key=key))
+                for tag in tags.get(key, []):
+                    tag_key = self._tag_key(tag)
+                    pipe.sadd(tag_key, key)
+                    tag_keys.add(tag_key)
+            for tag_key in tag_keys:
+                pipe.expire(tag_key, settings.cache_tag_ttl_seconds)
+            await pipe.execute()
+            
+            for key in items:
+                self.metrics.record("mset", key)
+            if start_time is not None:
+                self._observe_latency("mset", next(iter(items)), start_time)
+            return True
+        
+        except Exception as e:
+            self.metrics.record_error("mset", next(iter(items)))
+            ml_logger.error("Cache mset operation failed", keys=len(items), error=str(e))
+            return False
+    
     async def delete_cache(self, key: str) -> bool:
         """Delete cached data."""
         if not self._connected or not self.redis_client:
             return False
         
         try:
+            start_time = self._start_timer()
             result = await self.redis_client.delete(key)
-            ml_logger.log_cache_operation("delete", key)
+            self._observe("delete", key, start_time)
             return result > 0
             
         except Exception as e:
+            self.metrics.record_error("delete", key)
             ml_logger.error("Cache delete operation failed", key=key, error=str(e))
             return False
     
+    def _start_timer(self) -> Optional[float]:
+        """Start time for sampled or debug-logged operations, else None."""
+        if self.metrics.should_sample() or ml_logger.debug_enabled:
+            return time.perf_counter()
+        return None
+    
+    def _observe(self, operation: str, key: str, start_time: Optional[float], hit: bool = None) -> None:
+        """Count a completed operation; latency and log event only when timed."""
+        if start_time is None:
+            self.metrics.record(operation, key, hit=hit)
+            return
+        
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        self.metrics.record(operation, key, hit=hit, duration_ms=duration_ms)
+        ml_logger.log_cache_operation(operation, key, hit=hit, duration_ms=duration_ms)
+    
+    def _observe_latency(self, operation: str, key: str, start_time: float, hit: bool = None) -> None:
+        """Record a multi-key round trip's latency and log event."""
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        self.metrics.record_latency(operation, key, duration_ms)
+        ml_logger.log_cache_operation(operation, key, hit=hit, duration_ms=duration_ms)
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache."""
         if not self._connected or not self.redis_client:
@@ -145,7 +248,7 @@ class RedisManager:
     ) -> bool:
         """Store engineered features."""
         cache_key = f"features:{feature_key}"
-        return await self.set_cache(cache_key, features, expire, use_pickle=True)
+        return await self.set_cache(cache_key, features, expire)
     
     async def get_features(self, feature_key: str) -> Optional[dict]:
         """Get stored features."""
@@ -157,27 +260,51 @@ class RedisManager:
         self,
         model_key: str,
         predictions: dict,
-        expire: int = 1800  # 30 minutes
+        expire: int = 1800,  # 30 minutes
+        tags: Optional[List[str]] = None
     ) -> bool:
         """Cache model predictions."""
         cache_key = f"predictions:{model_key}"
-        return await self.set_cache(cache_key, predictions, expire)
+        return await self.set_cache(cache_key, predictions, expire, tags=tags)
     
     async def get_cached_predictions(self, model_key: str) -> Optional[dict]:
         """Get cached predictions."""
         cache_key = f"predictions:{model_key}"
         return await self.get_cache(cache_key)
     
+    async def cache_many_model_predictions(
+        self,
+        predictions: Dict[str, dict],
+        expire: int = 1800,
+        tags: Optional[Dict[str, List[str]]] = None
+    ) -> bool:
+        """Cache several model predictions in one round trip."""
+        return await self.set_many(
+            {f"predictions:{model_key}": value for model_key, value in predictions.items()},
+            expire,
+            tags={f"predictions:{model_key}": key_tags for model_key, key_tags in (tags or {}).items()}
+        )
+    
+    async def get_many_cached_predictions(self, model_keys: List[str]) -> Dict[str, dict]:
+        """Get several cached predictions in one round trip, keyed by model key."""
+        cached = await self.get_many([f"predictions:{model_key}" for model_key in model_keys])
+        return {
+            model_key: cached[f"predictions:{model_key}"]
+            for model_key in model_keys
+            if f"predictions:{model_key}" in cached
+        }
+    
     # Anomaly Detection Cache
     async def cache_anomaly_scores(
         self,
         anomaly_key: str,
         scores: dict,
-        expire: int = 3600  # 1 hour
+        expire: int = 3600,  # 1 hour
+        tags: Optional[List[str]] = None
     ) -> bool:
         """Cache anomaly detection scores."""
         cache_key = f"anomaly:{anomaly_key}"
-        return await self.set_cache(cache_key, scores, expire)
+        return await self.set_cache(cache_key, scores, expire, tags=tags)
     
     async def get_cached_anomaly_scores(self, anomaly_key: str) -> Optional[dict]:
         """Get cached anomaly scores."""
@@ -237,20 +364,90 @@ class RedisManager:
         """Generate cache key from arguments."""
         return ":".join(str(arg) for arg in args)
     
-    async def clear_pattern(self, pattern: str) -> int:
-        """Clear cache keys matching pattern."""
+    async def clear_pattern(self, pattern: str, batch_size: int = None) -> int:
+        """Clear cache keys matching pattern using incremental SCAN."""
         if not self._connected or not self.redis_client:
             return 0
         
         try:
-            keys = await self.redis_client.keys(pattern)
-            if keys:
-                return await self.redis_client.delete(*keys)
-            return 0
+            batch_size = batch_size or settings.cache_unlink_batch_size
+            keys = self.redis_client.scan_iter(match=pattern, count=batch_size)
+            return await self._unlink_in_batches(keys, batch_size)
         except Exception as e:
             ml_logger.error("Failed to clear cache pattern", pattern=pattern, error=str(e))
             return 0
     
+    async def invalidate_tags(self, tags: List[str], batch_size: int = None) -> int:
+        """Delete every cache entry registered under any of ``tags``."""
+        if not self._connected or not self.redis_client:
+            return 0
+        
+        try:
+            batch_size = batch_size or settings.cache_unlink_batch_size
+            deleted = 0
+            
+            for tag in tags:
+                # Detach the set first so entries tagged meanwhile land in a fresh one
+                detached_key = f"{self._tag_key(tag)}:invalidating:{uuid.uuid4().hex}"
+                try:
+                    await self.redis_client.rename(self._tag_key(tag), detached_key)
+                except ResponseError:
+                    continue  # No entries for this tag
+                
+                keys = self.redis_client.sscan_iter(detached_key, count=batch_size)
+                deleted += await self._unlink_in_batches(keys, batch_size)
+                await self.redis_client.unlink(detached_key)
+            
+            ml_logger.info("Cache tags invalidated", tags=tags, deleted=deleted)
+            return deleted
+        
+        except Exception as e:
+            ml_logger.error("Failed to invalidate cache tags", tags=tags, error=str(e))
+            return 0
+    
+    async def invalidate_commodity(self, commodity_code: str) -> int:
+        """Invalidate prediction and anomaly entries of one commodity."""
+        # Anomaly scans across all commodities include it as well
+        return await self.invalidate_tags([
+            self.commodity_tag(commodity_code),
+            self.commodity_tag(None)
+        ])
+    
+    def commodity_tag(self, commodity_code: Optional[str]) -> str:
+        """Tag for entries derived from one commodity's models."""
+        return f"commodity:{commodity_code or 'all'}"
+    
+    def model_version_tag(self, model_type: str, commodity_code: str, model_version: str) -> str:
+        """Tag for entries produced by one trained model version."""
+        return f"model_version:{model_type}:{commodity_code}:{model_version}"
+    
+    def _tag_key(self, tag: str) -> str:
+        """Redis key of the set holding a tag's cache keys."""
+        return f"tags:{tag}"
+    
+    async def _unlink_in_batches(self, keys: AsyncIterator[bytes], batch_size: int) -> int:
+        """UNLINK keys in batches, several batches per pipeline round trip."""
+        
+        deleted = 0
+        batch = []
+        pipe = self.redis_client.pipeline(transaction=False)
+        
+        async for key in keys:
+            batch.append(key)
+            if len(batch) == batch_size:
+                pipe.unlink(*batch)
+                batch = []
+                
+                if len(pipe) >= self.UNLINK_PIPELINE_DEPTH:
+                    deleted += sum(await pipe.execute())
+        
+        if batch:
+            pipe.unlink(*batch)
+        if len(pipe):
+            deleted += sum(await pipe.execute())
+        
+        return deleted
+    
     async def get_cache_stats(self) -> dict:
         """Get cache statistics."""
         if not self._connected or not self.redis_client:
@@ -266,7 +463,9 @@ class RedisManager:
                 "hit_rate": (
                     info.get("keyspace_hits", 0) / 
                     max(info.get("keyspace_hits", 0) + info.get("keyspace_misses", 0), 1)
-                ) * 100
+                ) * 100,
+                "codec": self.codec.get_stats(),
+                "operations": self.metrics.get_stats()
             }
         except Exception as e:
             ml_logger.error("Failed to get cache stats", error=str(e))
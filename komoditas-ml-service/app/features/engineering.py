@@ -1,15 +1,23 @@
 """Feature engineering untuk ML models."""
 
+import fnmatch
+import threading
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from sklearn.preprocessing import StandardScaler, MinMaxScaler
 from scipy import stats
 import warnings
 
 from app.config.logging import ml_logger
 from app.config.settings import settings
+from app.features.incremental import IncrementalFeatureState
+from app.features.matrix import FeatureMatrix
+from app.features.registry import feature_registry
+from app.features.rolling import SeriesWindows
 
 warnings.filterwarnings('ignore')
 
@@ -17,20 +25,51 @@ warnings.filterwarnings('ignore')
 class FeatureEngineer:
     """Feature engineering class untuk commodity price prediction."""
     
+    # Columns identifying one price series in a multi-series frame
+    SERIES_KEYS = ['commodity_code', 'region_code']
+    
     def __init__(self):
         self.scalers = {}
         self.feature_metadata = {}
+        self.incremental_states = OrderedDict()  # (commodity, region) -> state, by recency
+        self._incremental_locks = {}  # (commodity, region) -> lock, one per series seen
+        self._incremental_lock = threading.Lock()  # guards the two dicts above
+        self.registry = feature_registry
         
     def engineer_features(
         self,
         price_data: pd.DataFrame,
         weather_data: pd.DataFrame = None,
         commodity_code: str = None,
-        region_code: str = None
-    ) -> pd.DataFrame:
-        """Engineer features dari price dan weather data."""
+        region_code: str = None,
+        incremental: bool = False,
+        columns: List[str] = None,
+        as_matrix: bool = False
+    ) -> Union[pd.DataFrame, FeatureMatrix]:
+        """Engineer features dari price dan weather data.
+        
+        Frames holding several commodity-region series are featurized per
+        series in one grouped pass. With ``incremental=True`` rolling state
+        is kept per commodity-region and only rows newer than the previous
+        call are computed. ``columns`` (names or patterns such as
+        ``'weather_*'``) limits the output to those features; only their
+        dependency closure is computed. ``as_matrix=True`` returns the
+        numeric columns as a float32 FeatureMatrix.
+        """
+        
+        if incremental:
+            # Predictions featurize from worker threads; each series is
+            # updated by one thread at a time, different series in parallel
+            with self._series_lock((commodity_code, region_code or 'national')):
+                features_df = self._engineer_features_incremental(
+                    price_data, weather_data, commodity_code, region_code
+                )
+            features_df = self._select_features(features_df, columns, price_data.columns)
+            return FeatureMatrix.from_frame(features_df) if as_matrix else features_df
         
         try:
+            names = self.registry.resolve(columns) if columns is not None else None
+            
             # Copy data untuk avoid modifikasi original
             df = price_data.copy()
             
@@ -39,50 +78,64 @@ class FeatureEngineer:
                 df = df.set_index('date')
             df.index = pd.to_datetime(df.index)
             
-            # Sort by date
-            df = df.sort_index()
+            # Sort by series then date
+            series_keys = self._series_keys(df)
+            if series_keys:
+                df.index.name = df.index.name or 'date'
+                df = df.sort_values(series_keys + [df.index.name], kind='mergesort')
+            else:
+                df = df.sort_index()
             
             # Basic preprocessing
-            df = self._preprocess_data(df)
+            df = self._preprocess_data(df, series_keys)
+            
+            # Window operations stay inside each series
+            windows = self._series_windows(df, series_keys)
+            
+            raw_columns = list(df.columns)
             
             # Technical indicators
-            df = self._add_technical_indicators(df)
+            df = self._add_technical_indicators(df, windows, names)
             
             # Seasonal features
-            df = self._add_seasonal_features(df)
+            df = self._add_seasonal_features(df, names)
             
             # Lag features
-            df = self._add_lag_features(df)
+            df = self._add_lag_features(df, windows, names)
             
             # Price statistics
-            df = self._add_price_statistics(df)
+            df = self._add_price_statistics(df, windows, names)
             
             # Volatility features
-            df = self._add_volatility_features(df)
+            df = self._add_volatility_features(df, windows, names)
             
             # Weather features if available
-            if weather_data is not None and not weather_data.empty:
-                df = self._add_weather_features(df, weather_data)
+            if weather_data is not None and not weather_data.empty and self._requests_weather(columns):
+                df = self._add_weather_features(df, weather_data, windows)
             
             # Regional features if multiple regions
             if region_code and 'region_code' in df.columns:
-                df = self._add_regional_features(df, region_code)
+                df = self._add_regional_features(df, region_code, names)
             
             # External factor features
-            df = self._add_external_features(df)
+            df = self._add_external_features(df, names)
+            
+            # Drop dependencies nobody asked for
+            df = self._select_features(df, columns, raw_columns)
             
             # Clean final dataset
-            df = self._clean_features(df)
+            df = self._clean_features(df, windows.groups if windows else None)
             
             ml_logger.info(
                 "Feature engineering completed",
                 commodity_code=commodity_code,
                 region_code=region_code,
+                series_count=len(np.unique(windows.groups)) if windows and windows.grouped else 1,
                 features_count=len(df.columns),
                 samples_count=len(df)
             )
             
-            return df
+            return FeatureMatrix.from_frame(df) if as_matrix else df
             
         except Exception as e:
             ml_logger.error(
@@ -92,20 +145,207 @@ class FeatureEngineer:
             )
             raise e
     
-    def _preprocess_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _series_lock(self, state_key: Tuple[str, str]) -> threading.Lock:
+        """Lock serializing incremental updates of one series."""
+        with self._incremental_lock:
+            return self._incremental_locks.setdefault(state_key, threading.Lock())
+    
+    def _engineer_features_incremental(
+        self,
+        price_data: pd.DataFrame,
+        weather_data: pd.DataFrame = None,
+        commodity_code: str = None,
+        region_code: str = None
+    ) -> pd.DataFrame:
+        """Engineer features for newly appended rows using cached rolling state."""
+        
+        state_key = (commodity_code, region_code or 'national')
+        with self._incremental_lock:
+            state = self.incremental_states.get(state_key)
+            if state is not None:
+                self.incremental_states.move_to_end(state_key)
+        
+        df = price_data.copy()
+        if 'date' in df.columns:
+            df = df.set_index('date')
+        df.index = pd.to_datetime(df.index)
+        df = df.sort_index()
+        df = df[~df.index.duplicated(keep='last')]
+        
+        # Incremental state only covers a single warm series
+        single_series = 'region_code' not in df.columns or df['region_code'].nunique() <= 1
+        
+        if state is None or not single_series or not state.matches_history(df):
+            features_df = self.engineer_features(
+                price_data=price_data,
+                weather_data=weather_data,
+                commodity_code=commodity_code,
+                region_code=region_code
+            )
+            
+            with self._incremental_lock:
+                if single_series and len(features_df) >= IncrementalFeatureState.min_history():
+                    self.incremental_states[state_key] = IncrementalFeatureState(features_df)
+                    self.incremental_states.move_to_end(state_key)
+                    while len(self.incremental_states) > settings.incremental_feature_max_series:
+                        self.incremental_states.popitem(last=False)
+                else:
+                    self.incremental_states.pop(state_key, None)
+            
+            return features_df
+        
+        new_rows = df[df.index > state.last_date]
+        
+        if not new_rows.empty:
+            state.append(self._engineer_new_rows(state, new_rows, weather_data))
+        
+        # Return the requested lookback; keep the longest one requested in memory
+        features_df = state.features[state.features.index >= df.index.min()]
+        state.retain(len(features_df))
+        
+        ml_logger.debug(
+            "Incremental feature engineering completed",
+            commodity_code=commodity_code,
+            region_code=region_code,
+            new_rows=len(new_rows),
+            samples_count=len(features_df)
+        )
+        
+        return features_df.copy()
+    
+    def _engineer_new_rows(
+        self,
+        state: IncrementalFeatureState,
+        new_rows: pd.DataFrame,
+        weather_data: pd.DataFrame = None
+    ) -> pd.DataFrame:
+        """Registry features of ``new_rows`` computed over the state's cached tail."""
+        
+        new_rows = new_rows.copy()
+        new_rows['price'] = pd.concat([state.features['price'].iloc[-1:], new_rows['price']]).ffill().iloc[1:]
+        
+        tail = state.tail(new_rows)
+        windows = state.windows(tail, len(new_rows))
+        
+        # Weather values: cached for history rows, observed for new rows
+        if state.weather_types:
+            weather_by_date = self._weather_values_by_date(weather_data, new_rows.index)
+            for weather_type in state.weather_types:
+                tail.loc[new_rows.index, f'weather_{weather_type}'] = [
+                    weather_by_date.get(date, {}).get(weather_type, np.nan) for date in new_rows.index
+                ]
+        
+        tail = self.registry.materialize(tail, None, windows, state.feature_names)
+        
+        if state.weather_types:
+            tail_weather = (
+                tail[[f'weather_{weather_type}' for weather_type in state.weather_types]]
+                .set_axis(state.weather_types, axis=1)
+                .rename_axis('date')
+                .reset_index()
+                .melt(id_vars='date', var_name='weather_type', value_name='value')
+            )
+            tail = self._add_weather_features(tail, tail_weather, windows)
+        
+        windows.commit()
+        return tail.iloc[-len(new_rows):]
+    
+    def _weather_values_by_date(
+        self,
+        weather_data: pd.DataFrame,
+        dates: pd.DatetimeIndex
+    ) -> Dict:
+        """Average weather value per date and weather type for given dates."""
+        
+        if weather_data is None or weather_data.empty or 'weather_type' not in weather_data.columns:
+            return {}
+        
+        weather_df = weather_data.copy()
+        if 'date' in weather_df.columns:
+            weather_df = weather_df.set_index('date')
+        weather_df.index = pd.to_datetime(weather_df.index)
+        weather_df = weather_df[weather_df.index.isin(dates)]
+        
+        if weather_df.empty:
+            return {}
+        
+        weather_pivot = weather_df.pivot_table(
+            index=weather_df.index,
+            columns='weather_type',
+            values='value',
+            aggfunc='mean'
+        )
+        weather_pivot.columns = [str(col).lower() for col in weather_pivot.columns]
+        
+        return weather_pivot.to_dict('index')
+    
+    @staticmethod
+    def _requests_weather(columns: Optional[List[str]]) -> bool:
+        """Whether any requested column can match a weather feature."""
+        if columns is None:
+            return True
+        return any(
+            column.startswith(prefix) or fnmatch.fnmatch(prefix, column)
+            for column in columns
+            for prefix in ('weather_', 'price_weather_')
+        )
+    
+    @staticmethod
+    def _select_features(df: pd.DataFrame, columns: Optional[List[str]], raw_columns) -> pd.DataFrame:
+        """Raw input columns plus the engineered columns matching ``columns``."""
+        if columns is None:
+            return df
+        
+        raw_columns = set(raw_columns)
+        unrequested = [
+            col for col in df.columns
+            if col not in raw_columns and not any(fnmatch.fnmatch(col, pattern) for pattern in columns)
+        ]
+        return df.drop(columns=unrequested)
+    
+    def _series_keys(self, df: pd.DataFrame) -> List[str]:
+        """Key columns when ``df`` holds more than one series, else empty."""
+        
+        keys = [col for col in self.SERIES_KEYS if col in df.columns]
+        if not keys or len(df[keys].drop_duplicates()) <= 1:
+            return []
+        return keys
+    
+    @staticmethod
+    def _series_groups(df: pd.DataFrame, series_keys: List[str]) -> Optional[np.ndarray]:
+        """Series label per row, None for a single series."""
+        if not series_keys:
+            return None
+        return df.groupby(series_keys, sort=False, dropna=False).ngroup().to_numpy()
+    
+    def _series_windows(self, df: pd.DataFrame, series_keys: List[str] = None) -> Optional[SeriesWindows]:
+        """Window operations over ``df['price']`` per series."""
+        if 'price' not in df.columns:
+            return None
+        return SeriesWindows(df['price'], self._series_groups(df, series_keys))
+    
+    def _preprocess_data(self, df: pd.DataFrame, series_keys: List[str] = None) -> pd.DataFrame:
         """Basic data preprocessing."""
         
         # Remove duplicates
-        df = df[~df.index.duplicated(keep='last')]
+        if series_keys:
+            df = df[~df[series_keys].assign(_date=df.index).duplicated(keep='last').to_numpy()]
+        else:
+            df = df[~df.index.duplicated(keep='last')]
         
         # Fill missing prices with forward fill then backward fill
         if 'price' in df.columns:
-            df['price'] = df['price'].fillna(method='ffill').fillna(method='bfill')
+            df['price'] = self._series_windows(df, series_keys).fill()
         
         # Remove unrealistic prices (negative or extreme outliers)
         if 'price' in df.columns:
-            Q1 = df['price'].quantile(0.25)
-            Q3 = df['price'].quantile(0.75)
+            if series_keys:
+                prices = df.groupby(series_keys, sort=False, dropna=False)['price']
+                Q1 = prices.transform('quantile', 0.25)
+                Q3 = prices.transform('quantile', 0.75)
+            else:
+                Q1 = df['price'].quantile(0.25)
+                Q3 = df['price'].quantile(0.75)
             IQR = Q3 - Q1
             lower_bound = Q1 - 3 * IQR
             upper_bound = Q3 + 3 * IQR
@@ -114,176 +354,70 @@ class FeatureEngineer:
         
         return df
     
-    def _add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Add technical indicators."""
-        
-        if 'price' not in df.columns:
-            return df
-        
-        price = df['price']
-        
-        # Moving averages
-        for window in settings.moving_average_windows:
-            df[f'ma_{window}'] = price.rolling(window=window, min_periods=1).mean()
-            df[f'price_ma_{window}_ratio'] = price / df[f'ma_{window}']
-        
-        # Exponential moving averages
-        df['ema_12'] = price.ewm(span=12).mean()
-        df['ema_26'] = price.ewm(span=26).mean()
-        df['macd'] = df['ema_12'] - df['ema_26']
-        df['macd_signal'] = df['macd'].ewm(span=9).mean()
-        df['macd_histogram'] = df['macd'] - df['macd_signal']
-        
-        # RSI (Relative Strength Index)
-        delta = price.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # Bollinger Bands
-        df['bb_middle'] = price.rolling(window=20).mean()
-        bb_std = price.rolling(window=20).std()
-        df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
-        df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
-        df['bb_width'] = df['bb_upper'] - df['bb_lower']
-        df['bb_position'] = (price - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
-        
-        # Price momentum
-        for period in [1, 3, 7, 14, 30]:
-            df[f'momentum_{period}'] = price.pct_change(periods=period)
-            df[f'price_change_{period}'] = price.diff(periods=period)
+    def _add_features(
+        self,
+        df: pd.DataFrame,
+        group: str,
+        windows: SeriesWindows = None,
+        names: List[str] = None
+    ) -> pd.DataFrame:
+        """Materialize a registry feature group (only ``names`` when given)."""
         
-        return df
+        if windows is None and 'price' in df.columns:
+            windows = SeriesWindows(df['price'])
+        return self.registry.materialize(df, group, windows, names)
+    
+    def _add_technical_indicators(
+        self,
+        df: pd.DataFrame,
+        windows: SeriesWindows = None,
+        names: List[str] = None
+    ) -> pd.DataFrame:
+        """Add technical indicators."""
+        return self._add_features(df, 'technical', windows, names)
     
-    def _add_seasonal_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _add_seasonal_features(self, df: pd.DataFrame, names: List[str] = None) -> pd.DataFrame:
         """Add seasonal and temporal features."""
-        
-        # Time-based features
-        df['year'] = df.index.year
-        df['month'] = df.index.month
-        df['day'] = df.index.day
-        df['day_of_week'] = df.index.dayofweek
-        df['day_of_year'] = df.index.dayofyear
-        df['week_of_year'] = df.index.isocalendar().week
-        df['quarter'] = df.index.quarter
-        
-        # Cyclical encoding for temporal features
-        df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12)
-        df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12)
-        df['day_of_week_sin'] = np.sin(2 * np.pi * df['day_of_week'] / 7)
-        df['day_of_week_cos'] = np.cos(2 * np.pi * df['day_of_week'] / 7)
-        df['day_of_year_sin'] = np.sin(2 * np.pi * df['day_of_year'] / 365)
-        df['day_of_year_cos'] = np.cos(2 * np.pi * df['day_of_year'] / 365)
-        
-        # Indonesian seasonal patterns
-        # Dry season (May-October), Wet season (November-April)
-        df['is_dry_season'] = df['month'].isin([5, 6, 7, 8, 9, 10]).astype(int)
-        df['is_wet_season'] = df['month'].isin([11, 12, 1, 2, 3, 4]).astype(int)
-        
-        # Harvest seasons (varies by commodity)
-        df['is_rice_harvest'] = df['month'].isin([3, 4, 8, 9]).astype(int)
-        df['is_corn_harvest'] = df['month'].isin([4, 5, 9, 10]).astype(int)
-        
-        # Islamic calendar effects (approximate)
-        # Ramadan typically causes price changes
-        df['is_ramadan_period'] = 0  # This would need actual Islamic calendar
-        
-        # Indonesian holidays effect
-        df['is_holiday_month'] = df['month'].isin([8, 12]).astype(int)  # Independence, Christmas
-        
-        return df
+        return self._add_features(df, 'seasonal', names=names)
     
-    def _add_lag_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _add_lag_features(
+        self,
+        df: pd.DataFrame,
+        windows: SeriesWindows = None,
+        names: List[str] = None
+    ) -> pd.DataFrame:
         """Add lagged features."""
-        
-        if 'price' not in df.columns:
-            return df
-        
-        price = df['price']
-        
-        # Lagged prices
-        for lag in [1, 2, 3, 7, 14, 30]:
-            df[f'price_lag_{lag}'] = price.shift(lag)
-        
-        # Lagged price changes
-        for lag in [1, 7]:
-            df[f'price_change_lag_{lag}'] = price.pct_change().shift(lag)
-        
-        # Lagged moving averages
-        for window in [7, 30]:
-            ma = price.rolling(window=window).mean()
-            df[f'ma_{window}_lag_1'] = ma.shift(1)
-        
-        return df
+        return self._add_features(df, 'lag', windows, names)
     
-    def _add_price_statistics(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _add_price_statistics(
+        self,
+        df: pd.DataFrame,
+        windows: SeriesWindows = None,
+        names: List[str] = None
+    ) -> pd.DataFrame:
         """Add price statistical features."""
-        
-        if 'price' not in df.columns:
-            return df
-        
-        price = df['price']
-        
-        # Rolling statistics
-        for window in [7, 14, 30]:
-            df[f'price_mean_{window}'] = price.rolling(window=window).mean()
-            df[f'price_std_{window}'] = price.rolling(window=window).std()
-            df[f'price_min_{window}'] = price.rolling(window=window).min()
-            df[f'price_max_{window}'] = price.rolling(window=window).max()
-            df[f'price_median_{window}'] = price.rolling(window=window).median()
-            df[f'price_range_{window}'] = df[f'price_max_{window}'] - df[f'price_min_{window}']
-            
-            # Relative position in range
-            df[f'price_position_{window}'] = (
-                (price - df[f'price_min_{window}']) / 
-                (df[f'price_max_{window}'] - df[f'price_min_{window}'])
-            )
-        
-        # Z-score (standardized price)
-        for window in [30, 90]:
-            mean = price.rolling(window=window).mean()
-            std = price.rolling(window=window).std()
-            df[f'price_zscore_{window}'] = (price - mean) / std
-        
-        return df
+        return self._add_features(df, 'statistics', windows, names)
     
-    def _add_volatility_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _add_volatility_features(
+        self,
+        df: pd.DataFrame,
+        windows: SeriesWindows = None,
+        names: List[str] = None
+    ) -> pd.DataFrame:
         """Add volatility features."""
-        
-        if 'price' not in df.columns:
-            return df
-        
-        price = df['price']
-        returns = price.pct_change()
-        
-        # Rolling volatility
-        for window in settings.volatility_windows:
-            df[f'volatility_{window}'] = returns.rolling(window=window).std()
-            df[f'volatility_{window}_annualized'] = df[f'volatility_{window}'] * np.sqrt(252)
-        
-        # GARCH-like volatility
-        df['returns'] = returns
-        df['returns_squared'] = returns ** 2
-        for window in [7, 30]:
-            df[f'garch_vol_{window}'] = df['returns_squared'].rolling(window=window).mean()
-        
-        # High-low volatility (if high/low data available)
-        if 'high' in df.columns and 'low' in df.columns:
-            df['hl_volatility'] = np.log(df['high'] / df['low'])
-        else:
-            # Approximate with price ranges
-            for window in [7, 30]:
-                high = price.rolling(window=window).max()
-                low = price.rolling(window=window).min()
-                df[f'hl_volatility_{window}'] = np.log(high / low)
-        
-        return df
+        return self._add_features(df, 'volatility', windows, names)
     
-    def _add_weather_features(self, df: pd.DataFrame, weather_data: pd.DataFrame) -> pd.DataFrame:
+    def _add_weather_features(
+        self,
+        df: pd.DataFrame,
+        weather_data: pd.DataFrame,
+        windows: SeriesWindows = None
+    ) -> pd.DataFrame:
         """Add weather-related features."""
         
         try:
+            windows = windows or SeriesWindows(pd.Series(index=df.index, dtype=float))
+            
             # Ensure weather data has proper datetime index
             weather_df = weather_data.copy()
             if 'date' in weather_df.columns:
@@ -305,18 +439,19 @@ class FeatureEngineer:
                     
                     # Align dates and fill missing values
                     weather_series = weather_pivot[weather_type].reindex(df.index)
-                    weather_series = weather_series.fillna(method='ffill').fillna(method='bfill')
+                    weather_series = windows.with_series(weather_series).fill()
+                    weather_windows = windows.with_series(weather_series)
                     
                     df[col_name] = weather_series
                     
                     # Rolling weather statistics
                     for window in [7, 30]:
-                        df[f'{col_name}_mean_{window}'] = weather_series.rolling(window=window).mean()
-                        df[f'{col_name}_std_{window}'] = weather_series.rolling(window=window).std()
+                        df[f'{col_name}_mean_{window}'] = weather_windows.rolling(window, 'mean')
+                        df[f'{col_name}_std_{window}'] = weather_windows.rolling(window, 'std')
                     
                     # Weather anomalies
-                    weather_mean = weather_series.rolling(window=30).mean()
-                    weather_std = weather_series.rolling(window=30).std()
+                    weather_mean = weather_windows.rolling(30, 'mean')
+                    weather_std = weather_windows.rolling(30, 'std')
                     df[f'{col_name}_anomaly'] = (weather_series - weather_mean) / weather_std
             
             # Weather-price interaction features
@@ -330,66 +465,68 @@ class FeatureEngineer:
         
         return df
     
-    def _add_regional_features(self, df: pd.DataFrame, target_region: str) -> pd.DataFrame:
+    def _add_regional_features(
+        self,
+        df: pd.DataFrame,
+        target_region: str,
+        names: List[str] = None
+    ) -> pd.DataFrame:
         """Add regional comparison features."""
         
-        if 'region_code' not in df.columns or 'price' not in df.columns:
-            return df
-        
         try:
-            # Calculate national average price
-            national_avg = df.groupby(df.index)['price'].mean()
-            df['national_avg_price'] = national_avg.reindex(df.index)
-            
-            # Price relative to national average
-            df['price_vs_national'] = df['price'] / df['national_avg_price']
-            
-            # Regional price rank
-            df['regional_price_rank'] = df.groupby(df.index)['price'].rank(ascending=False)
-            
-            # Price convergence/divergence
-            df['price_divergence'] = df['price'] - df['national_avg_price']
-            
+            df = self._add_features(df, 'regional', names=names)
         except Exception as e:
             ml_logger.warning("Failed to add regional features", error=str(e))
         
         return df
     
-    def _add_external_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _add_external_features(self, df: pd.DataFrame, names: List[str] = None) -> pd.DataFrame:
         """Add external factor features."""
-        
-        # Economic indicators (if available)
-        # These would typically come from external data sources
-        
-        # Fuel price proxy (affects transportation costs)
-        # Oil price correlation (simplified)
-        df['fuel_price_proxy'] = df.index.year * 1000 + df.index.dayofyear
-        
-        # Exchange rate proxy (affects import costs)
-        df['exchange_rate_proxy'] = np.sin(2 * np.pi * df.index.dayofyear / 365) * 100 + 14000
-        
-        # Global commodity price trends (simplified)
-        df['global_trend'] = np.sin(2 * np.pi * df.index.dayofyear / 365) * 0.1
-        
-        return df
+        return self._add_features(df, 'external', names=names)
     
-    def _clean_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Clean and finalize features."""
+    def _clean_features(self, df: pd.DataFrame, groups: np.ndarray = None) -> pd.DataFrame:
+        """Clean and finalize features (per series when ``groups`` is given)."""
         
         # Remove infinite values
         df = df.replace([np.inf, -np.inf], np.nan)
-        
-        # Fill remaining NaN values
-        # For numerical columns, use forward fill then median
         numeric_cols = df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            df[col] = df[col].fillna(method='ffill').fillna(df[col].median())
-        
-        # Drop columns with too many NaN values (>50%)
-        threshold = len(df) * 0.5
-        df = df.dropna(axis=1, thresh=threshold)
-        
-        return df
+        numeric = df[numeric_cols].reset_index(drop=True)
+        
+        # Drop columns with too many NaN values (>50%) before filling them.
+        # A numeric column ends up filled in every series holding any value
+        present = numeric.notna()
+        counts = df.notna().sum()
+        if groups is not None:
+            series_sizes = pd.Series(groups).value_counts(sort=False)
+            series_has_values = present.groupby(groups, sort=False).any()
+            counts[numeric_cols] = series_has_values.mul(series_sizes, axis=0).sum()
+        else:
+            counts[numeric_cols] = present.any() * len(df)
+        keep = counts >= len(df) * 0.5
+        df = df.loc[:, keep.to_numpy()]
+        numeric = numeric.loc[:, keep[numeric_cols].to_numpy()]
+        
+        # Fill remaining NaN values: forward fill, then the column median
+        if groups is not None:
+            by_series = numeric.groupby(groups, sort=False)
+            pieces = [by_series.ffill().fillna(by_series.transform('median'))]
+        else:
+            filled = numeric.ffill()
+            # Only leading NaNs survive a forward fill
+            has_leading = filled.iloc[:1].isna().any().to_numpy()
+            leading = filled.columns[has_leading]
+            block = filled[leading].to_numpy()
+            medians = np.nanmedian(numeric[leading].to_numpy(), axis=0) if len(leading) else []
+            pieces = [
+                filled.loc[:, ~has_leading],
+                pd.DataFrame(np.where(np.isnan(block), medians, block), columns=leading)
+            ]
+        for piece in pieces:
+            piece.index = df.index
+        
+        # Reassemble once, in the original column order
+        other_cols = df.columns.difference(numeric.columns, sort=False)
+        return pd.concat(pieces + [df[other_cols]], axis=1)[df.columns]
     
     def get_feature_importance_names(self, df: pd.DataFrame) -> List[str]:
         """Get feature names for importance analysis."""
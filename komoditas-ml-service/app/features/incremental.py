@@ -0,0 +1,191 @@
+"""Incremental feature computation untuk append-only price updates."""
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.features.registry import feature_registry
+from app.features.rolling import SeriesWindows
+
+
+class EMAState:
+    """Exponential moving average state with pandas ``adjust=True`` semantics."""
+    
+    def __init__(self, span: int):
+        self.decay = 1 - 2 / (span + 1)
+        
+        # Sum of weights so far and the weighted sum of observations
+        self.weight = 0.0
+        self.weighted_sum = 0.0
+    
+    @classmethod
+    def from_series(cls, span: int, values) -> "EMAState":
+        """State after every value of ``values`` has been observed."""
+        state = cls(span)
+        for value in np.asarray(values, dtype=float):
+            state.update(value)
+        return state
+    
+    def copy(self) -> "EMAState":
+        """Independent copy of the state."""
+        state = EMAState.__new__(EMAState)
+        state.__dict__.update(self.__dict__)
+        return state
+    
+    def update(self, value: float) -> float:
+        """Add one observation and return the new EMA value.
+        
+        A missing value decays the weights without adding one, like
+        ``ewm(ignore_na=False)``.
+        """
+        if not np.isnan(value):
+            self.weighted_sum = value + self.decay * self.weighted_sum
+            self.weight = 1 + self.decay * self.weight
+        else:
+            self.weighted_sum *= self.decay
+            self.weight *= self.decay
+        return self.weighted_sum / self.weight if self.weight > 0 else np.nan
+
+
+class TailWindows(SeriesWindows):
+    """Window operations over cached history plus newly appended rows.
+    
+    Rolling, shift and slope operations only look back ``min_history()``
+    rows, so registry features computed over that tail are exact for the
+    new rows. An exponentially weighted mean reaches back to the start of
+    the series; it continues the state's EMA over the new rows instead,
+    and is NaN on the history rows.
+    """
+    
+    def __init__(
+        self,
+        series: pd.Series,
+        state: "IncrementalFeatureState",
+        new_rows: int,
+        _emas: Dict = None,
+        _indexers: Dict = None
+    ):
+        super().__init__(series, None, _indexers)
+        self.state = state
+        self.new_rows = new_rows
+        self._emas = _emas if _emas is not None else {}
+    
+    def with_series(self, series: pd.Series) -> "TailWindows":
+        """Same tail applied to another aligned series."""
+        return TailWindows(series, self.state, self.new_rows, self._emas, self._indexers)
+    
+    def ewm_mean(self, span: int) -> pd.Series:
+        """EMA of the new rows, continued from the cached series."""
+        
+        key = (self.series.name, span)
+        if key not in self._emas:
+            ema = self.state.ema_state(*key).copy()
+            values = [ema.update(value) for value in self.series.iloc[-self.new_rows:].to_numpy(dtype=float)]
+            self._emas[key] = (ema, values)
+        
+        result = np.full(len(self.series), np.nan)
+        result[len(result) - self.new_rows:] = self._emas[key][1]
+        return pd.Series(result, index=self.series.index, name=self.series.name)
+    
+    def commit(self) -> None:
+        """Store the advanced EMA states once every feature was computed."""
+        for key, (ema, _) in self._emas.items():
+            self.state.ema_states[key] = ema
+
+
+class IncrementalFeatureState:
+    """Cached feature frame for a single commodity-region price series.
+    
+    The state is seeded from a batch ``engineer_features`` result. New rows
+    are featurized by the registry definitions over the last
+    ``min_history()`` cached rows plus the new ones (see ``TailWindows``),
+    so the incremental path computes exactly what the batch path does.
+    """
+    
+    WEATHER_WINDOWS = [7, 30]
+    
+    def __init__(self, features_df: pd.DataFrame):
+        self.features = features_df
+        self.columns = list(features_df.columns)
+        self.last_date = features_df.index.max()
+        self.max_rows = len(features_df)
+        
+        # EMA state per (input column, span), seeded on first use
+        self.ema_states: Dict[Tuple[str, int], EMAState] = {}
+        
+        self.feature_names = [name for name in feature_registry.names() if name in self.columns]
+        self.weather_types = [
+            col[len('weather_'):] for col in self.columns
+            if col.startswith('weather_') and f'{col}_anomaly' in self.columns
+        ]
+    
+    @classmethod
+    def min_history(cls) -> int:
+        """Minimum rows needed before the incremental path is used.
+        
+        Every registered feature and weather statistic must be defined on
+        the seed rows, and the same rows make up the tail new rows are
+        computed over.
+        """
+        return max(feature_registry.history_window(feature_registry.names()), max(cls.WEATHER_WINDOWS)) + 1
+    
+    def matches_history(self, df: pd.DataFrame) -> bool:
+        """Check that ``df`` extends the cached series without revisions."""
+        if df.empty or df.index.min() > self.last_date:
+            return False
+        
+        # Rows older than the cached frame were trimmed or never computed
+        if df.index.min() < self.features.index.min():
+            return False
+        
+        overlap = df.index[df.index <= self.last_date].intersection(self.features.index)
+        if len(overlap) == 0:
+            return False
+        
+        return np.allclose(
+            df.loc[overlap, 'price'].to_numpy(dtype=float),
+            self.features.loc[overlap, 'price'].to_numpy(dtype=float),
+            equal_nan=True
+        )
+    
+    def retain(self, rows: int) -> None:
+        """Trim cached features to the longest lookback requested so far."""
+        self.max_rows = max(self.max_rows, rows, self.min_history())
+        self.features = self.features.iloc[-self.max_rows:]
+    
+    def ema_state(self, column: str, span: int) -> EMAState:
+        """Committed EMA state of ``column``, seeded from the cached series."""
+        
+        key = (column, span)
+        if key not in self.ema_states:
+            if column not in self.features.columns:
+                raise ValueError(f"EMA input '{column}' is not a cached feature column")
+            # Seeding happens on the first append, before any rows are trimmed
+            self.ema_states[key] = EMAState.from_series(span, self.features[column])
+        return self.ema_states[key]
+    
+    def tail(self, new_rows: pd.DataFrame) -> pd.DataFrame:
+        """Last ``min_history()`` cached rows followed by the raw new rows."""
+        history = self.features.iloc[-self.min_history():]
+        return pd.concat([history, new_rows.reindex(columns=new_rows.columns.intersection(self.columns))])
+    
+    def windows(self, tail: pd.DataFrame, new_rows: int) -> TailWindows:
+        """Window operations over ``tail['price']``."""
+        return TailWindows(tail['price'], self, new_rows)
+    
+    def append(self, new_df: pd.DataFrame) -> None:
+        """Add featurized rows, cleaned like ``FeatureEngineer._clean_features``."""
+        
+        new_df = new_df.reindex(columns=self.columns)
+        new_df = new_df.replace([np.inf, -np.inf], np.nan)
+        new_df = pd.concat([self.features.iloc[[-1]], new_df]).ffill().iloc[1:]
+        
+        for col in self.columns:
+            try:
+                new_df[col] = new_df[col].astype(self.features[col].dtype)
+            except (TypeError, ValueError):
+                pass
+        
+        self.features = pd.concat([self.features, new_df])
+        self.last_date = self.features.index.max()
@@ -0,0 +1,164 @@
+"""Compact float32 feature matrix untuk model input dan inter-process sharing."""
+
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class FeatureMatrix:
+    """Engineered features as one C-contiguous float32 block.
+    
+    Numeric columns live in ``values`` (rows x columns) and are addressed
+    through ``columns``/``column_index``; non-numeric columns (commodity
+    and region codes, names) are kept apart as categoricals in
+    ``metadata``. The block is what TensorFlow and scikit-learn consume,
+    at half the size of the float64 frame.
+    """
+    
+    DTYPE = np.float32
+    
+    def __init__(
+        self,
+        values: np.ndarray,
+        columns: List[str],
+        index: pd.Index = None,
+        metadata: pd.DataFrame = None
+    ):
+        self.values = values
+        self.columns = list(columns)
+        self.column_index = {col: position for position, col in enumerate(self.columns)}
+        self.index = index if index is not None else pd.RangeIndex(len(values))
+        self.metadata = metadata if metadata is not None else pd.DataFrame(index=self.index)
+        self._shm = None
+        self._owns_shm = False
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: List[str] = None) -> "FeatureMatrix":
+        """Pack ``columns`` (every numeric column by default) of a feature frame.
+        
+        Non-numeric columns become categorical metadata; numeric columns
+        left out of ``columns`` are dropped.
+        """
+        
+        if columns is None:
+            columns = list(df.select_dtypes(include=[np.number]).columns)
+        
+        # Each column is cast straight into the block, without a float64 copy
+        values = np.empty((len(df), len(columns)), dtype=cls.DTYPE)
+        for position, col in enumerate(columns):
+            series = df[col]
+            if isinstance(series.dtype, np.dtype):
+                values[:, position] = series.to_numpy()
+            else:
+                values[:, position] = series.to_numpy(dtype=cls.DTYPE, na_value=np.nan)
+        
+        packed = set(columns)
+        metadata = pd.DataFrame(
+            {
+                col: pd.Categorical(df[col].to_numpy())
+                for col in df.columns
+                if col not in packed and not pd.api.types.is_numeric_dtype(df[col])
+            },
+            index=df.index
+        )
+        
+        return cls(values, columns, df.index, metadata)
+    
+    @property
+    def shape(self) -> tuple:
+        """Rows and feature columns of the block."""
+        return self.values.shape
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the block and the metadata."""
+        return self.values.nbytes + int(self.metadata.memory_usage(index=False, deep=True).sum())
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def column(self, name: str) -> np.ndarray:
+        """View of one feature column."""
+        return self.values[:, self.column_index[name]]
+    
+    def select(self, columns: List[str]) -> np.ndarray:
+        """Block of ``columns``; the block itself when they are all columns in order."""
+        if list(columns) == self.columns:
+            return self.values
+        return np.ascontiguousarray(self.values[:, [self.column_index[col] for col in columns]])
+    
+    def fillna_median(self) -> "FeatureMatrix":
+        """Replace missing values with their column median, in place."""
+        
+        missing_rows, missing_cols = np.nonzero(np.isnan(self.values))
+        if len(missing_rows):
+            medians = np.nanmedian(self.values, axis=0)
+            self.values[missing_rows, missing_cols] = medians[missing_cols]
+        
+        return self
+    
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame over the block (no copy) plus the metadata columns."""
+        
+        frame = pd.DataFrame(self.values, index=self.index, columns=self.columns, copy=False)
+        for col in self.metadata.columns:
+            frame[col] = self.metadata[col].array
+        
+        return frame
+    
+    def share(self) -> "FeatureMatrix":
+        """Copy of the matrix backed by shared memory, owned by this process."""
+        
+        shm = shared_memory.SharedMemory(create=True, size=max(self.values.nbytes, 1))
+        values = np.ndarray(self.values.shape, dtype=self.DTYPE, buffer=shm.buf)
+        values[:] = self.values
+        
+        shared = FeatureMatrix(values, self.columns, self.index, self.metadata)
+        shared._shm = shm
+        shared._owns_shm = True
+        return shared
+    
+    @property
+    def handle(self) -> Optional[Dict]:
+        """Picklable reference another process passes to ``attach``."""
+        if self._shm is None:
+            return None
+        return {
+            'name': self._shm.name,
+            'shape': self.values.shape,
+            'columns': self.columns,
+            'index': self.index,
+            'metadata': self.metadata
+        }
+    
+    @classmethod
+    def attach(cls, handle: Dict) -> "FeatureMatrix":
+        """Matrix over a block shared by another process, without copying it."""
+        
+        shm = shared_memory.SharedMemory(name=handle['name'])
+        values = np.ndarray(handle['shape'], dtype=cls.DTYPE, buffer=shm.buf)
+        
+        attached = cls(values, handle['columns'], handle['index'], handle['metadata'])
+        attached._shm = shm
+        return attached
+    
+    def close(self) -> None:
+        """Release shared memory; the creating process also unlinks it."""
+        
+        if self._shm is None:
+            return
+        
+        # The mapping can only close once no array views it
+        self.values = None
+        self._shm.close()
+        if self._owns_shm:
+            self._shm.unlink()
+        self._shm = None
+    
+    def __enter__(self) -> "FeatureMatrix":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,407 @@
+"""Declarative feature registry untuk FeatureEngineer."""
+
+import fnmatch
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config.settings import settings
+from app.features.rolling import SeriesWindows
+
+
+class FeatureDefinition:
+    """One engineered column: how to compute it and what it needs.
+    
+    ``compute(df, windows)`` returns the column values; ``depends_on`` are
+    engineered columns that must exist first, ``inputs`` raw columns the
+    feature reads and ``window`` the rows of history it looks back over.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        group: str,
+        compute: Callable[[pd.DataFrame, SeriesWindows], pd.Series],
+        depends_on: Tuple[str, ...] = (),
+        inputs: Tuple[str, ...] = ('price',),
+        window: int = 0,
+        condition: Callable[[pd.DataFrame], bool] = None
+    ):
+        self.name = name
+        self.group = group
+        self.compute = compute
+        self.depends_on = tuple(depends_on)
+        self.inputs = tuple(inputs)
+        self.window = window
+        self.condition = condition
+    
+    def is_available(self, df: pd.DataFrame) -> bool:
+        """Whether ``df`` holds everything the feature reads."""
+        if any(col not in df.columns for col in self.inputs + self.depends_on):
+            return False
+        return self.condition is None or self.condition(df)
+
+
+class FeatureRegistry:
+    """Ordered feature definitions with dependency resolution.
+    
+    Features are registered after their dependencies, so registration
+    order is a valid computation order and matches the column order of
+    the full feature frame.
+    """
+    
+    def __init__(self):
+        self._definitions: Dict[str, FeatureDefinition] = {}
+    
+    def register(self, name: str, group: str, compute: Callable, **kwargs) -> FeatureDefinition:
+        """Register a feature; its dependencies must already be registered."""
+        
+        definition = FeatureDefinition(name, group, compute, **kwargs)
+        unknown = [dep for dep in definition.depends_on if dep not in self._definitions]
+        if unknown:
+            raise ValueError(f"Feature '{name}' depends on unregistered features: {unknown}")
+        
+        self._definitions[name] = definition
+        return definition
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._definitions
+    
+    def get(self, name: str) -> Optional[FeatureDefinition]:
+        """Definition of ``name`` if registered."""
+        return self._definitions.get(name)
+    
+    def names(self, group: str = None) -> List[str]:
+        """Registered feature names, optionally of one group."""
+        return [
+            name for name, definition in self._definitions.items()
+            if group is None or definition.group == group
+        ]
+    
+    def resolve(self, columns: Iterable[str]) -> List[str]:
+        """Dependency closure of ``columns`` (names or fnmatch patterns) in computation order."""
+        
+        pending = [
+            name for pattern in columns
+            for name in fnmatch.filter(self._definitions, pattern)
+        ]
+        closure = set()
+        while pending:
+            name = pending.pop()
+            if name not in closure:
+                closure.add(name)
+                pending.extend(self._definitions[name].depends_on)
+        
+        return [name for name in self._definitions if name in closure]
+    
+    def history_window(self, columns: Iterable[str]) -> int:
+        """Rows of history needed before every requested feature is defined."""
+        return max((self._definitions[name].window for name in self.resolve(columns)), default=0)
+    
+    def materialize(
+        self,
+        df: pd.DataFrame,
+        group: Optional[str],
+        windows: SeriesWindows = None,
+        names: Iterable[str] = None
+    ) -> pd.DataFrame:
+        """Add the group's features (every group for None; only ``names`` when given) to ``df``."""
+        
+        selected = set(names) if names is not None else None
+        for name, definition in self._definitions.items():
+            if (group is not None and definition.group != group) or (selected is not None and name not in selected):
+                continue
+            if definition.is_available(df):
+                df[name] = definition.compute(df, windows)
+        
+        return df
+
+
+def _rsi(df: pd.DataFrame, windows: SeriesWindows) -> pd.Series:
+    """Relative Strength Index over 14 rows."""
+    delta = windows.diff()
+    gain = windows.with_series(delta.where(delta > 0, 0)).rolling(14, 'mean')
+    loss = windows.with_series(-delta.where(delta < 0, 0)).rolling(14, 'mean')
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def _same_day_groups(df: pd.DataFrame) -> List:
+    """Rows of the same commodity on the same date."""
+    return [df.index] + ([df['commodity_code']] if 'commodity_code' in df.columns else [])
+
+
+def _has_high_low(df: pd.DataFrame) -> bool:
+    """Whether daily high and low prices are available."""
+    return 'high' in df.columns and 'low' in df.columns
+
+
+def _register_technical(registry: FeatureRegistry) -> None:
+    """Moving averages, MACD, RSI, Bollinger bands, momentum and trends."""
+    
+    for window in settings.moving_average_windows:
+        registry.register(
+            f'ma_{window}', 'technical',
+            lambda df, w, window=window: w.rolling(window, 'mean', min_periods=1),
+            window=window
+        )
+        registry.register(
+            f'price_ma_{window}_ratio', 'technical',
+            lambda df, w, window=window: df['price'] / df[f'ma_{window}'],
+            depends_on=(f'ma_{window}',), window=window
+        )
+    
+    registry.register('ema_12', 'technical', lambda df, w: w.ewm_mean(span=12), window=12)
+    registry.register('ema_26', 'technical', lambda df, w: w.ewm_mean(span=26), window=26)
+    registry.register(
+        'macd', 'technical', lambda df, w: df['ema_12'] - df['ema_26'],
+        depends_on=('ema_12', 'ema_26'), window=26
+    )
+    registry.register(
+        'macd_signal', 'technical', lambda df, w: w.with_series(df['macd']).ewm_mean(span=9),
+        depends_on=('macd',), window=35
+    )
+    registry.register(
+        'macd_histogram', 'technical', lambda df, w: df['macd'] - df['macd_signal'],
+        depends_on=('macd', 'macd_signal'), window=35
+    )
+    registry.register('rsi', 'technical', _rsi, window=15)
+    
+    registry.register('bb_middle', 'technical', lambda df, w: w.rolling(20, 'mean'), window=20)
+    registry.register(
+        'bb_upper', 'technical', lambda df, w: df['bb_middle'] + (w.rolling(20, 'std') * 2),
+        depends_on=('bb_middle',), window=20
+    )
+    registry.register(
+        'bb_lower', 'technical', lambda df, w: df['bb_middle'] - (w.rolling(20, 'std') * 2),
+        depends_on=('bb_middle',), window=20
+    )
+    registry.register(
+        'bb_width', 'technical', lambda df, w: df['bb_upper'] - df['bb_lower'],
+        depends_on=('bb_upper', 'bb_lower'), window=20
+    )
+    registry.register(
+        'bb_position', 'technical',
+        lambda df, w: (df['price'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower']),
+        depends_on=('bb_upper', 'bb_lower'), window=20
+    )
+    
+    for period in [1, 3, 7, 14, 30]:
+        registry.register(
+            f'momentum_{period}', 'technical',
+            lambda df, w, period=period: w.pct_change(periods=period), window=period + 1
+        )
+        registry.register(
+            f'price_change_{period}', 'technical',
+            lambda df, w, period=period: w.diff(periods=period), window=period + 1
+        )
+    
+    # Trend slopes (closed-form rolling regression), named like the
+    # anomaly detector's own trend columns
+    for window in [7, 30]:
+        registry.register(
+            f'price_trend_{window}d', 'technical',
+            lambda df, w, window=window: w.slope(window), window=window
+        )
+
+
+def _register_seasonal(registry: FeatureRegistry) -> None:
+    """Calendar features, cyclical encodings and Indonesian seasons."""
+    
+    calendar = {
+        'year': lambda df, w: df.index.year,
+        'month': lambda df, w: df.index.month,
+        'day': lambda df, w: df.index.day,
+        'day_of_week': lambda df, w: df.index.dayofweek,
+        'day_of_year': lambda df, w: df.index.dayofyear,
+        'week_of_year': lambda df, w: df.index.isocalendar().week,
+        'quarter': lambda df, w: df.index.quarter,
+    }
+    for name, compute in calendar.items():
+        registry.register(name, 'seasonal', compute, inputs=())
+    
+    # Cyclical encoding for temporal features
+    for name, period in [('month', 12), ('day_of_week', 7), ('day_of_year', 365)]:
+        registry.register(
+            f'{name}_sin', 'seasonal', lambda df, w, name=name, period=period: np.sin(2 * np.pi * df[name] / period),
+            depends_on=(name,), inputs=()
+        )
+        registry.register(
+            f'{name}_cos', 'seasonal', lambda df, w, name=name, period=period: np.cos(2 * np.pi * df[name] / period),
+            depends_on=(name,), inputs=()
+        )
+    
+    # Dry season (May-October), wet season (November-April), harvests,
+    # Independence Day and Christmas months
+    month_flags = {
+        'is_dry_season': [5, 6, 7, 8, 9, 10],
+        'is_wet_season': [11, 12, 1, 2, 3, 4],
+        'is_rice_harvest': [3, 4, 8, 9],
+        'is_corn_harvest': [4, 5, 9, 10],
+    }
+    for name, months in month_flags.items():
+        registry.register(
+            name, 'seasonal', lambda df, w, months=months: df['month'].isin(months).astype(int),
+            depends_on=('month',), inputs=()
+        )
+    
+    # Ramadan typically causes price changes; needs an Islamic calendar
+    registry.register('is_ramadan_period', 'seasonal', lambda df, w: 0, inputs=())
+    registry.register(
+        'is_holiday_month', 'seasonal', lambda df, w: df['month'].isin([8, 12]).astype(int),
+        depends_on=('month',), inputs=()
+    )
+
+
+def _register_lag(registry: FeatureRegistry) -> None:
+    """Lagged prices, price changes and moving averages."""
+    
+    for lag in [1, 2, 3, 7, 14, 30]:
+        registry.register(
+            f'price_lag_{lag}', 'lag', lambda df, w, lag=lag: w.shift(lag), window=lag + 1
+        )
+    
+    for lag in [1, 7]:
+        registry.register(
+            f'price_change_lag_{lag}', 'lag',
+            lambda df, w, lag=lag: w.with_series(w.pct_change()).shift(lag), window=lag + 2
+        )
+    
+    for window in [7, 30]:
+        registry.register(
+            f'ma_{window}_lag_1', 'lag',
+            lambda df, w, window=window: w.with_series(w.rolling(window, 'mean')).shift(1),
+            window=window + 1
+        )
+
+
+def _register_statistics(registry: FeatureRegistry) -> None:
+    """Rolling price statistics, range position and z-scores."""
+    
+    for window in [7, 14, 30]:
+        for stat in SeriesWindows.ROLLING_STATS:
+            registry.register(
+                f'price_{stat}_{window}', 'statistics',
+                lambda df, w, window=window, stat=stat: w.rolling(window, stat), window=window
+            )
+        
+        registry.register(
+            f'price_range_{window}', 'statistics',
+            lambda df, w, window=window: df[f'price_max_{window}'] - df[f'price_min_{window}'],
+            depends_on=(f'price_max_{window}', f'price_min_{window}'), window=window
+        )
+        
+        # Relative position in range
+        registry.register(
+            f'price_position_{window}', 'statistics',
+            lambda df, w, window=window: (
+                (df['price'] - df[f'price_min_{window}']) /
+                (df[f'price_max_{window}'] - df[f'price_min_{window}'])
+            ),
+            depends_on=(f'price_max_{window}', f'price_min_{window}'), window=window
+        )
+    
+    # Z-score (standardized price)
+    for window in [30, 90]:
+        registry.register(
+            f'price_zscore_{window}', 'statistics',
+            lambda df, w, window=window: (df['price'] - w.rolling(window, 'mean')) / w.rolling(window, 'std'),
+            window=window
+        )
+
+
+def _register_volatility(registry: FeatureRegistry) -> None:
+    """Return volatility, GARCH-like and high-low volatility."""
+    
+    for window in settings.volatility_windows:
+        registry.register(
+            f'volatility_{window}', 'volatility',
+            lambda df, w, window=window: w.with_series(w.pct_change()).rolling(window, 'std'),
+            window=window + 1
+        )
+        registry.register(
+            f'volatility_{window}_annualized', 'volatility',
+            lambda df, w, window=window: df[f'volatility_{window}'] * np.sqrt(252),
+            depends_on=(f'volatility_{window}',), window=window + 1
+        )
+    
+    registry.register('returns', 'volatility', lambda df, w: w.pct_change(), window=2)
+    registry.register(
+        'returns_squared', 'volatility', lambda df, w: df['returns'] ** 2,
+        depends_on=('returns',), window=2
+    )
+    for window in [7, 30]:
+        registry.register(
+            f'garch_vol_{window}', 'volatility',
+            lambda df, w, window=window: w.with_series(df['returns_squared']).rolling(window, 'mean'),
+            depends_on=('returns_squared',), window=window + 1
+        )
+    
+    # High-low volatility, approximated with price ranges without high/low data
+    registry.register(
+        'hl_volatility', 'volatility', lambda df, w: np.log(df['high'] / df['low']),
+        inputs=('high', 'low')
+    )
+    for window in [7, 30]:
+        registry.register(
+            f'hl_volatility_{window}', 'volatility',
+            lambda df, w, window=window: np.log(w.rolling(window, 'max') / w.rolling(window, 'min')),
+            window=window, condition=lambda df: not _has_high_low(df)
+        )
+
+
+def _register_regional(registry: FeatureRegistry) -> None:
+    """Price compared with other regions of the same commodity and date."""
+    
+    registry.register(
+        'national_avg_price', 'regional',
+        lambda df, w: df.groupby(_same_day_groups(df))['price'].transform('mean'),
+        inputs=('price', 'region_code')
+    )
+    registry.register(
+        'price_vs_national', 'regional', lambda df, w: df['price'] / df['national_avg_price'],
+        depends_on=('national_avg_price',)
+    )
+    registry.register(
+        'regional_price_rank', 'regional',
+        lambda df, w: df.groupby(_same_day_groups(df))['price'].rank(ascending=False),
+        inputs=('price', 'region_code')
+    )
+    registry.register(
+        'price_divergence', 'regional', lambda df, w: df['price'] - df['national_avg_price'],
+        depends_on=('national_avg_price',)
+    )
+
+
+def _register_external(registry: FeatureRegistry) -> None:
+    """Simplified proxies for fuel price, exchange rate and global trends."""
+    
+    registry.register(
+        'fuel_price_proxy', 'external', lambda df, w: df.index.year * 1000 + df.index.dayofyear, inputs=()
+    )
+    registry.register(
+        'exchange_rate_proxy', 'external',
+        lambda df, w: np.sin(2 * np.pi * df.index.dayofyear / 365) * 100 + 14000, inputs=()
+    )
+    registry.register(
+        'global_trend', 'external', lambda df, w: np.sin(2 * np.pi * df.index.dayofyear / 365) * 0.1, inputs=()
+    )
+
+
+def build_feature_registry() -> FeatureRegistry:
+    """Registry of every feature FeatureEngineer computes, in pipeline order."""
+    
+    registry = FeatureRegistry()
+    _register_technical(registry)
+    _register_seasonal(registry)
+    _register_lag(registry)
+    _register_statistics(registry)
+    _register_volatility(registry)
+    _register_regional(registry)
+    _register_external(registry)
+    return registry
+
+
+# Global feature registry instance
+feature_registry = build_feature_registry()
@@ -0,0 +1,185 @@
+"""Vectorized rolling window kernels untuk feature engineering."""
+
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+
+def rolling_slope(values, window: int, groups: Optional[np.ndarray] = None) -> np.ndarray:
+    """Least-squares slope of each trailing ``window`` values, in O(n).
+    
+    Equals ``np.polyfit(range(window), y, 1)[0]`` over every full window,
+    built from cumulative sums of y and k*y instead of one fit per window.
+    Windows that are incomplete, hold a NaN, or (with ``groups``, labels
+    of contiguous series) cross a series boundary are NaN.
+    """
+    
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    slopes = np.full(n, np.nan)
+    if window < 2 or n < window:
+        return slopes
+    
+    # Slope is shift invariant; centering keeps the cumulative sums small
+    missing = np.isnan(y)
+    y = np.where(missing, 0.0, y - (np.nanmean(y) if not missing.all() else 0.0))
+    k = np.arange(n, dtype=float)
+    
+    def window_sums(series: np.ndarray) -> np.ndarray:
+        cumulative = np.concatenate(([0.0], np.cumsum(series)))
+        return cumulative[window:] - cumulative[:-window]
+    
+    sum_y = window_sums(y)
+    # sum of x*y with x = 0..window-1 inside each window starting at ``start``
+    start = k[:n - window + 1]
+    sum_xy = window_sums(k * y) - start * sum_y
+    
+    sum_x = window * (window - 1) / 2
+    sum_xx = (window - 1) * window * (2 * window - 1) / 6
+    slopes[window - 1:] = (window * sum_xy - sum_x * sum_y) / (window * sum_xx - sum_x ** 2)
+    
+    # Any NaN inside the window invalidates it, like rolling().apply
+    has_missing = window_sums(missing.astype(float)) > 0
+    slopes[window - 1:][has_missing] = np.nan
+    
+    if groups is not None:
+        groups = np.asarray(groups)
+        slopes[window - 1:][groups[window - 1:] != groups[:n - window + 1]] = np.nan
+    
+    return slopes
+
+
+class SeriesWindowIndexer(BaseIndexer):
+    """Trailing ``window_size`` windows clipped at the start of each series.
+    
+    ``series_start`` holds the first row position of the series each row
+    belongs to, so pandas computes every series in one pass over the
+    array instead of one groupby call per series.
+    """
+    
+    def get_window_bounds(
+        self,
+        num_values: int = 0,
+        min_periods: Optional[int] = None,
+        center: Optional[bool] = None,
+        closed: Optional[str] = None,
+        step: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        end = np.arange(1, num_values + 1, dtype=np.int64)
+        start = np.maximum(end - self.window_size, self.series_start).astype(np.int64)
+        return start, end
+
+
+class SeriesWindows:
+    """Window operations on one series, kept inside each group when grouped.
+    
+    ``groups`` labels contiguous series (rows sorted by series, then date)
+    and is aligned with ``series``; results always come back aligned with
+    ``series.index``, so one code path serves one series or thousands.
+    Results are memoized per instance, and instances made by
+    ``with_series`` share the window bounds, so a feature pipeline asking
+    for the same rolling statistic twice computes it once.
+    """
+    
+    ROLLING_STATS = ('mean', 'std', 'min', 'max', 'median')
+    
+    def __init__(self, series: pd.Series, groups: Optional[np.ndarray] = None, _indexers: Dict = None):
+        self.series = series
+        self.groups = groups
+        self._results = {}
+        self._indexers = _indexers if _indexers is not None else {}
+        
+        if groups is not None:
+            self._groupby = series.reset_index(drop=True).groupby(groups, sort=False)
+    
+    @property
+    def grouped(self) -> bool:
+        """Whether operations run per group."""
+        return self.groups is not None
+    
+    def with_series(self, series: pd.Series) -> "SeriesWindows":
+        """Same grouping applied to another aligned series."""
+        return SeriesWindows(series, self.groups, self._indexers)
+    
+    def rolling(self, window: int, stat: str, min_periods: int = None) -> pd.Series:
+        """Rolling ``stat`` (mean, std, min, max, median) over ``window`` rows."""
+        if stat not in self.ROLLING_STATS:
+            raise ValueError(f"stat must be one of {self.ROLLING_STATS}")
+        
+        return self._memoized(
+            ('rolling', window, stat, min_periods),
+            lambda: getattr(self.series.rolling(self._window(window), min_periods=min_periods), stat)()
+        )
+    
+    def ewm_mean(self, span: int) -> pd.Series:
+        """Exponentially weighted mean (``adjust=True``)."""
+        return self._memoized(('ewm_mean', span), lambda: (
+            self._align(self._groupby.ewm(span=span).mean()) if self.grouped
+            else self.series.ewm(span=span).mean()
+        ))
+    
+    def shift(self, periods: int) -> pd.Series:
+        """Values ``periods`` rows earlier."""
+        return self._memoized(('shift', periods), lambda: (
+            self._wrap(self._groupby.shift(periods)) if self.grouped
+            else self.series.shift(periods)
+        ))
+    
+    def diff(self, periods: int = 1) -> pd.Series:
+        """Difference to ``periods`` rows earlier."""
+        return self._memoized(('diff', periods), lambda: (
+            self._wrap(self._groupby.diff(periods)) if self.grouped
+            else self.series.diff(periods=periods)
+        ))
+    
+    def pct_change(self, periods: int = 1) -> pd.Series:
+        """Relative change to ``periods`` rows earlier."""
+        return self._memoized(('pct_change', periods), lambda: (
+            self._wrap(self._groupby.pct_change(periods)) if self.grouped
+            else self.series.pct_change(periods=periods)
+        ))
+    
+    def fill(self) -> pd.Series:
+        """Forward then backward fill missing values."""
+        if not self.grouped:
+            return self.series.fillna(method='ffill').fillna(method='bfill')
+        return self._wrap(self._groupby.ffill().groupby(self.groups, sort=False).bfill())
+    
+    def slope(self, window: int) -> pd.Series:
+        """Rolling least-squares slope, see ``rolling_slope``."""
+        return self._memoized(
+            ('slope', window),
+            lambda: pd.Series(rolling_slope(self.series, window, groups=self.groups), index=self.series.index)
+        )
+    
+    def _memoized(self, key: Tuple, compute: Callable[[], pd.Series]) -> pd.Series:
+        """Cached result of ``compute``; callers get a copy they may modify."""
+        if key not in self._results:
+            self._results[key] = compute()
+        return self._results[key].copy()
+    
+    def _window(self, window: int):
+        """Rolling window argument: the size, or a series-clipped indexer."""
+        if not self.grouped:
+            return window
+        
+        if window not in self._indexers:
+            if 'series_start' not in self._indexers:
+                positions = np.arange(len(self.groups))
+                is_start = np.r_[True, self.groups[1:] != self.groups[:-1]]
+                self._indexers['series_start'] = np.maximum.accumulate(np.where(is_start, positions, 0))
+            self._indexers[window] = SeriesWindowIndexer(
+                window_size=window, series_start=self._indexers['series_start']
+            )
+        return self._indexers[window]
+    
+    def _align(self, result: pd.Series) -> pd.Series:
+        """Drop group levels of a groupby-window result and restore row order."""
+        result = result.droplevel(0).sort_index()
+        return self._wrap(result)
+    
+    def _wrap(self, result: pd.Series) -> pd.Series:
+        """Positional result back on the original index."""
+        return pd.Series(result.to_numpy(), index=self.series.index, name=self.series.name)
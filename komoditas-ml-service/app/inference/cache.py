@@ -0,0 +1,93 @@
+"""In-process prediction cache untuk hot inference keys."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.config.settings import settings
+
+
+class PredictionCache:
+    """Bounded LRU cache with a per-entry TTL, kept in front of Redis."""
+    
+    def __init__(self, max_entries: int = None, ttl_seconds: float = None):
+        self.max_entries = max_entries if max_entries is not None else settings.prediction_l1_cache_max_entries
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.prediction_l1_cache_ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a live entry, or None when missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            value, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: str, value: Any, ttl_seconds: float = None) -> None:
+        """Store an entry, evicting the least recently used beyond the bound."""
+        if self.max_entries <= 0:
+            return
+        
+        ttl_seconds = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self, prefix: str = None) -> int:
+        """Drop entries whose key starts with ``prefix`` (all when None)."""
+        with self._lock:
+            if prefix is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+    
+    def keys(self) -> List[str]:
+        """Cached keys from least to most recently used."""
+        with self._lock:
+            return list(self._entries)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / lookups * 100) if lookups else 0.0
+            }
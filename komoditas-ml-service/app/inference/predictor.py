@@ -1,24 +1,136 @@
 """Inference pipeline untuk real-time predictions."""
 
 import asyncio
+import functools
+import multiprocessing
+import os
 import time
+import traceback
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union, Any
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 import numpy as np
 import pandas as pd
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
 import warnings
 
 from app.config.database import db_manager
 from app.config.logging import ml_logger
 from app.config.settings import settings
 from app.config.redis import redis_manager
+from app.config.metadata import metadata_cache
 from app.preprocessing.data_processor import DataProcessor
 from app.features.engineering import FeatureEngineer
+from app.features.incremental import IncrementalFeatureState
+from app.features.matrix import FeatureMatrix
+from app.inference.cache import PredictionCache
 from app.training.trainer import ModelTrainer
+from app.models.registry import model_registry
 
 warnings.filterwarnings('ignore')
 
+# Per-process state for inference pool workers
+_worker_trainer = None
+_worker_model_mtimes = {}
+
+
+def _run_forecast(model, model_type: str, data: pd.DataFrame, horizon_days: int) -> pd.DataFrame:
+    """Run model inference and return the forecast frame."""
+    
+    if model_type in ['prophet']:
+        return model.predict(
+            horizon_days=horizon_days,
+            include_history=False
+        )
+    elif model_type in ['lstm']:
+        return model.predict(
+            data,
+            horizon_days=horizon_days
+        )
+    else:
+        raise ValueError(f"Unknown model type: {model_type}")
+
+
+def _model_info(model, include_features: bool) -> Dict:
+    """Model version and, if requested, features reported with a prediction."""
+    
+    info = {'model_version': model.model_metadata.get('training_date', 'unknown')}
+    
+    # Add feature importance if requested
+    if include_features and hasattr(model, 'feature_columns'):
+        info['features_used'] = model.feature_columns[:10]  # Top 10 features
+        # Add feature importance if available
+        if hasattr(model, 'get_feature_importance'):
+            info['feature_importance'] = model.get_feature_importance()
+    
+    return info
+
+
+def _model_path(model_type: str, commodity_code: str, region_code: str = None) -> str:
+    """Path of a persisted model file."""
+    model_key = f"{model_type}_{commodity_code}_{region_code or 'national'}"
+    return os.path.join(settings.model_store_path, f"{model_key}.pkl")
+
+
+def _forecast_in_worker(
+    model_type: str,
+    commodity_code: str,
+    region_code: str,
+    data: Optional[Dict],
+    horizon_days: int,
+    include_features: bool = False
+) -> Tuple[pd.DataFrame, Dict]:
+    """Load a model inside an inference worker process and run it.
+    
+    ``data`` is the handle of a shared-memory FeatureMatrix (LSTM inputs),
+    read in place instead of being pickled across the process boundary.
+    """
+    global _worker_trainer
+    
+    if _worker_trainer is None:
+        _worker_trainer = ModelTrainer()
+    
+    # Drop the worker's copy when the model file was retrained
+    model_key = f"{model_type}_{commodity_code}_{region_code or 'national'}"
+    model_mtime = os.path.getmtime(_model_path(model_type, commodity_code, region_code))
+    if _worker_model_mtimes.get(model_key) != model_mtime:
+        model_registry.remove(model_key)
+        _worker_model_mtimes[model_key] = model_mtime
+    
+    model = _worker_trainer.load_model(model_type, commodity_code, region_code)
+    
+    if data is None:
+        return _run_forecast(model, model_type, None, horizon_days), _model_info(model, include_features)
+    
+    matrix = FeatureMatrix.attach(data)
+    try:
+        forecast = _run_forecast(model, model_type, matrix.to_frame(), horizon_days)
+    except Exception as e:
+        # Frames kept by the traceback still view the block
+        traceback.clear_frames(e.__traceback__)
+        raise
+    finally:
+        matrix.close()
+    return forecast, _model_info(model, include_features)
+
+
+class _SharedDataLoad:
+    """Run a data load at most once and share it between batch items."""
+    
+    def __init__(self, load: Callable[[], Awaitable[pd.DataFrame]]):
+        self._load = load
+        self._task = None
+    
+    @property
+    def started(self) -> bool:
+        """Whether the load has been triggered."""
+        return self._task is not None
+    
+    async def __call__(self) -> pd.DataFrame:
+        # Started lazily so groups served entirely from cache never load
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._load())
+        return await asyncio.shield(self._task)
+
 
 class PredictionService:
     """Service untuk melakukan prediksi harga komoditas."""
@@ -27,15 +139,1033 @@ class PredictionService:
         self.data_processor = DataProcessor()
         self.feature_engineer = FeatureEngineer()
         self.model_trainer = ModelTrainer()
-        self.prediction_cache = {}
-        self.model_cache = {}
+        self.prediction_cache = PredictionCache()
+        self.model_cache = model_registry
+        
+        # Batch engine state
+        self.inference_workers = settings.inference_process_workers
+        self._process_pool = None
+        self._inflight_data_loads = {}
+        self._inflight_predictions = {}
+        self._refresh_tasks = {}
         
         # Performance tracking
         self.prediction_stats = {
             'total_predictions': 0,
             'cache_hits': 0,
+            'l1_cache_hits': 0,
+            'l2_cache_hits': 0,
+            'cache_misses': 0,
+            'coalesced_requests': 0,
+            'stale_served': 0,
+            'background_refreshes': 0,
             'average_latency_ms': 0,
             'last_prediction_time': None
         }
     
-    async def predict_price(\n        self,\n        commodity_code: str,\n        region_code: str = None,\n        horizon_days: int = 7,\n        model_type: str = 'prophet',\n        include_uncertainty: bool = True,\n        include_features: bool = False\n    ) -> Dict:\n        \"\"\"Predict commodity price.\"\"\"\n        \n        start_time = time.time()\n        \n        try:\n            # Generate cache key\n            cache_key = self._generate_cache_key(\n                commodity_code, region_code, horizon_days, model_type\n            )\n            \n            # Check cache first\n            cached_prediction = await redis_manager.get_cached_predictions(cache_key)\n            if cached_prediction:\n                self.prediction_stats['cache_hits'] += 1\n                ml_logger.info(\n                    \"Prediction served from cache\",\n                    commodity_code=commodity_code,\n                    cache_key=cache_key\n                )\n                return cached_prediction\n            \n            # Load model\n            model = await self._load_model(model_type, commodity_code, region_code)\n            \n            # Get recent data for prediction\n            recent_data = await self._get_recent_data(\n                commodity_code, region_code, lookback_days=90\n            )\n            \n            # Make prediction\n            prediction_result = await self._make_prediction(\n                model=model,\n                data=recent_data,\n                commodity_code=commodity_code,\n                region_code=region_code,\n                horizon_days=horizon_days,\n                model_type=model_type,\n                include_uncertainty=include_uncertainty,\n                include_features=include_features\n            )\n            \n            # Cache prediction\n            await redis_manager.cache_model_predictions(\n                cache_key, prediction_result, expire=1800  # 30 minutes\n            )\n            \n            # Update stats\n            latency_ms = (time.time() - start_time) * 1000\n            self._update_prediction_stats(latency_ms)\n            \n            # Log prediction\n            ml_logger.log_prediction_request(\n                request_id=cache_key,\n                commodity_code=commodity_code,\n                region_code=region_code,\n                prediction_horizon=horizon_days,\n                latency_ms=latency_ms\n            )\n            \n            return prediction_result\n            \n        except Exception as e:\n            ml_logger.error(\n                \"Price prediction failed\",\n                commodity_code=commodity_code,\n                region_code=region_code,\n                model_type=model_type,\n                error=str(e)\n            )\n            raise e\n    \n    async def batch_predict(\n        self,\n        requests: List[Dict],\n        max_workers: int = 5\n    ) -> List[Dict]:\n        \"\"\"Perform batch predictions.\"\"\"\n        \n        start_time = time.time()\n        \n        try:\n            ml_logger.info(\n                \"Starting batch prediction\",\n                request_count=len(requests),\n                max_workers=max_workers\n            )\n            \n            results = []\n            \n            # Use ThreadPoolExecutor for concurrent predictions\n            with ThreadPoolExecutor(max_workers=max_workers) as executor:\n                # Create async tasks\n                future_to_request = {\n                    executor.submit(self._predict_single_async, req): req\n                    for req in requests\n                }\n                \n                # Collect results\n                for future in as_completed(future_to_request):\n                    request = future_to_request[future]\n                    try:\n                        result = future.result()\n                        results.append({\n                            'status': 'success',\n                            'request': request,\n                            'prediction': result\n                        })\n                    except Exception as e:\n                        ml_logger.error(\n                            \"Batch prediction item failed\",\n                            request=request,\n                            error=str(e)\n                        )\n                        results.append({\n                            'status': 'error',\n                            'request': request,\n                            'error': str(e)\n                        })\n            \n            # Calculate statistics\n            successful = sum(1 for r in results if r['status'] == 'success')\n            failed = len(results) - successful\n            processing_time_ms = (time.time() - start_time) * 1000\n            \n            batch_result = {\n                'total_requests': len(requests),\n                'successful_predictions': successful,\n                'failed_predictions': failed,\n                'processing_time_ms': processing_time_ms,\n                'predictions': results\n            }\n            \n            ml_logger.info(\n                \"Batch prediction completed\",\n                **{k: v for k, v in batch_result.items() if k != 'predictions'}\n            )\n            \n            return batch_result\n            \n        except Exception as e:\n            ml_logger.error(\"Batch prediction failed\", error=str(e))\n            raise e\n    \n    def _predict_single_async(self, request: Dict) -> Dict:\n        \"\"\"Wrapper for async prediction in thread pool.\"\"\"\n        loop = asyncio.new_event_loop()\n        asyncio.set_event_loop(loop)\n        try:\n            return loop.run_until_complete(self.predict_price(**request))\n        finally:\n            loop.close()\n    \n    async def detect_anomalies(\n        self,\n        commodity_code: str = None,\n        region_code: str = None,\n        detection_type: str = 'both',\n        sensitivity: float = 0.1,\n        time_window_days: int = 30\n    ) -> Dict:\n        \"\"\"Detect price anomalies.\"\"\"\n        \n        try:\n            # Generate cache key for anomaly detection\n            cache_key = f\"anomaly:{commodity_code or 'all'}:{region_code or 'all'}:{detection_type}:{sensitivity}\"\n            \n            # Check cache\n            cached_anomalies = await redis_manager.get_cached_anomaly_scores(cache_key)\n            if cached_anomalies:\n                return cached_anomalies\n            \n            # Load anomaly detection model\n            model = await self._load_model('anomaly', commodity_code)\n            \n            # Get recent data\n            recent_data = await self._get_recent_data(\n                commodity_code, region_code, lookback_days=time_window_days\n            )\n            \n            # Detect anomalies\n            detection_types = [\n                detection_type\n            ] if detection_type != 'both' else ['temporal', 'geographic']\n            \n            anomalies_df = model.detect_anomalies(\n                recent_data,\n                detection_types=detection_types,\n                sensitivity=sensitivity\n            )\n            \n            # Process results\n            anomalies_list = []\n            if not anomalies_df.empty:\n                for _, anomaly in anomalies_df.iterrows():\n                    anomaly_dict = anomaly.to_dict()\n                    # Convert datetime to string for JSON serialization\n                    if 'date' in anomaly_dict and hasattr(anomaly_dict['date'], 'isoformat'):\n                        anomaly_dict['date'] = anomaly_dict['date'].isoformat()\n                    anomalies_list.append(anomaly_dict)\n            \n            # Calculate summary statistics\n            summary_stats = self._calculate_anomaly_summary(anomalies_df)\n            \n            result = {\n                'detection_type': detection_type,\n                'total_anomalies': len(anomalies_list),\n                'anomalies': anomalies_list,\n                'summary_statistics': summary_stats,\n                'detection_metadata': {\n                    'commodity_code': commodity_code,\n                    'region_code': region_code,\n                    'sensitivity': sensitivity,\n                    'time_window_days': time_window_days,\n                    'detection_date': datetime.now().isoformat()\n                }\n            }\n            \n            # Cache results\n            await redis_manager.cache_anomaly_scores(\n                cache_key, result, expire=3600  # 1 hour\n            )\n            \n            ml_logger.info(\n                \"Anomaly detection completed\",\n                commodity_code=commodity_code,\n                total_anomalies=len(anomalies_list),\n                detection_type=detection_type\n            )\n            \n            return result\n            \n        except Exception as e:\n            ml_logger.error(\n                \"Anomaly detection failed\",\n                commodity_code=commodity_code,\n                error=str(e)\n            )\n            raise e\n    \n    async def analyze_price_correlation(\n        self,\n        commodity_code: str,\n        region_codes: List[str] = None,\n        weather_types: List[str] = None,\n        time_window_days: int = 365\n    ) -> Dict:\n        \"\"\"Analyze price-weather correlation.\"\"\"\n        \n        try:\n            # Get price and weather data\n            price_data, weather_data = self.data_processor.load_and_preprocess_data(\n                commodity_codes=[commodity_code],\n                region_codes=region_codes,\n                start_date=(datetime.now() - timedelta(days=time_window_days)).isoformat(),\n                include_weather=True\n            )\n            \n            if price_data.empty or weather_data.empty:\n                return {\n                    'commodity_code': commodity_code,\n                    'correlations': [],\n                    'error': 'Insufficient data for correlation analysis'\n                }\n            \n            # Engineer features for correlation analysis\n            features_df = self.feature_engineer.engineer_features(\n                price_data=price_data,\n                weather_data=weather_data,\n                commodity_code=commodity_code\n            )\n            \n            # Calculate correlations\n            correlations = self._calculate_weather_correlations(\n                features_df, commodity_code, weather_types or ['TEMPERATURE', 'RAINFALL', 'HUMIDITY']\n            )\n            \n            # Generate insights and recommendations\n            insights = self._generate_correlation_insights(correlations)\n            recommendations = self._generate_correlation_recommendations(correlations)\n            \n            result = {\n                'commodity_code': commodity_code,\n                'analysis_period': {\n                    'start': price_data['date'].min().isoformat(),\n                    'end': price_data['date'].max().isoformat()\n                },\n                'correlations': correlations,\n                'summary_insights': insights,\n                'recommendations': recommendations\n            }\n            \n            ml_logger.info(\n                \"Price-weather correlation analysis completed\",\n                commodity_code=commodity_code,\n                correlation_count=len(correlations)\n            )\n            \n            return result\n            \n        except Exception as e:\n            ml_logger.error(\n                \"Correlation analysis failed\",\n                commodity_code=commodity_code,\n                error=str(e)\n            )\n            raise e\n    \n    async def _load_model(self, model_type: str, commodity_code: str, region_code: str = None):\n        \"\"\"Load ML model with caching.\"\"\"\n        \n        model_key = f\"{model_type}_{commodity_code}_{region_code or 'national'}\"\n        \n        # Check memory cache\n        if model_key in self.model_cache:\n            return self.model_cache[model_key]\n        \n        # Load model\n        model = self.model_trainer.load_model(model_type, commodity_code, region_code)\n        \n        # Cache in memory\n        self.model_cache[model_key] = model\n        \n        return model\n    \n    async def _get_recent_data(\n        self,\n        commodity_code: str,\n        region_code: str = None,\n        lookback_days: int = 90\n    ) -> pd.DataFrame:\n        \"\"\"Get recent data for prediction.\"\"\"\n        \n        start_date = (datetime.now() - timedelta(days=lookback_days)).isoformat()\n        \n        price_data, weather_data = self.data_processor.load_and_preprocess_data(\n            commodity_codes=[commodity_code],\n            region_codes=[region_code] if region_code else None,\n            start_date=start_date,\n            include_weather=True\n        )\n        \n        if price_data.empty:\n            raise ValueError(f\"No recent data available for {commodity_code}\")\n        \n        # Engineer features\n        features_df = self.feature_engineer.engineer_features(\n            price_data=price_data,\n            weather_data=weather_data,\n            commodity_code=commodity_code,\n            region_code=region_code\n        )\n        \n        return features_df\n    \n    async def _make_prediction(\n        self,\n        model,\n        data: pd.DataFrame,\n        commodity_code: str,\n        region_code: str,\n        horizon_days: int,\n        model_type: str,\n        include_uncertainty: bool,\n        include_features: bool\n    ) -> Dict:\n        \"\"\"Make prediction using loaded model.\"\"\"\n        \n        # Make prediction based on model type\n        if model_type in ['prophet']:\n            forecast = model.predict(\n                horizon_days=horizon_days,\n                include_history=False\n            )\n        elif model_type in ['lstm']:\n            forecast = model.predict(\n                data,\n                horizon_days=horizon_days\n            )\n        else:\n            raise ValueError(f\"Unknown model type: {model_type}\")\n        \n        # Get current price\n        current_price = data['price'].iloc[-1] if not data.empty else 0\n        \n        # Calculate price change forecast\n        if not forecast.empty:\n            future_price = forecast['yhat'].iloc[-1]\n            price_change = ((future_price - current_price) / current_price) * 100\n            \n            # Determine trend direction\n            if price_change > 2:\n                trend_direction = 'up'\n            elif price_change < -2:\n                trend_direction = 'down'\n            else:\n                trend_direction = 'stable'\n        else:\n            future_price = current_price\n            price_change = 0\n            trend_direction = 'stable'\n        \n        # Format predictions\n        predictions = []\n        for _, row in forecast.iterrows():\n            prediction_point = {\n                'date': row['ds'].isoformat() if hasattr(row['ds'], 'isoformat') else str(row['ds']),\n                'predicted_price': float(row['yhat']),\n                'confidence': float(row.get('confidence', 0.8))\n            }\n            \n            if include_uncertainty:\n                prediction_point['lower_bound'] = float(row.get('yhat_lower', row['yhat'] * 0.95))\n                prediction_point['upper_bound'] = float(row.get('yhat_upper', row['yhat'] * 1.05))\n            \n            predictions.append(prediction_point)\n        \n        # Get commodity info\n        commodity_info = db_manager.get_commodities_info()\n        commodity_name = commodity_info[\n            commodity_info['code'] == commodity_code\n        ]['name'].iloc[0] if not commodity_info.empty else commodity_code\n        \n        # Get region info\n        region_name = None\n        if region_code:\n            region_info = db_manager.get_regions_info()\n            region_name = region_info[\n                region_info['code'] == region_code\n            ]['name'].iloc[0] if not region_info.empty else region_code\n        \n        result = {\n            'commodity_code': commodity_code,\n            'commodity_name': commodity_name,\n            'region_code': region_code,\n            'region_name': region_name,\n            'model_type': model_type,\n            'model_version': model.model_metadata.get('training_date', 'unknown'),\n            'predictions': predictions,\n            'current_price': float(current_price),\n            'price_change_forecast': float(price_change),\n            'trend_direction': trend_direction,\n            'prediction_date': datetime.now().isoformat()\n        }\n        \n        # Add feature importance if requested\n        if include_features and hasattr(model, 'feature_columns'):\n            result['features_used'] = model.feature_columns[:10]  # Top 10 features\n            # Add feature importance if available\n            if hasattr(model, 'get_feature_importance'):\n                result['feature_importance'] = model.get_feature_importance()\n        \n        return result\n    \n    def _generate_cache_key(\n        self,\n        commodity_code: str,\n        region_code: str,\n        horizon_days: int,\n        model_type: str\n    ) -> str:\n        \"\"\"Generate cache key for prediction.\"\"\"\n        return f\"pred:{commodity_code}:{region_code or 'national'}:{horizon_days}:{model_type}\"\n    \n    def _update_prediction_stats(self, latency_ms: float):\n        \"\"\"Update prediction statistics.\"\"\"\n        self.prediction_stats['total_predictions'] += 1\n        self.prediction_stats['last_prediction_time'] = datetime.now().isoformat()\n        \n        # Update average latency using exponential moving average\n        if self.prediction_stats['average_latency_ms'] == 0:\n            self.prediction_stats['average_latency_ms'] = latency_ms\n        else:\n            alpha = 0.1  # Smoothing factor\n            self.prediction_stats['average_latency_ms'] = (\n                alpha * latency_ms + \n                (1 - alpha) * self.prediction_stats['average_latency_ms']\n            )\n    \n    def _calculate_anomaly_summary(self, anomalies_df: pd.DataFrame) -> Dict:\n        \"\"\"Calculate summary statistics for anomalies.\"\"\"\n        \n        if anomalies_df.empty:\n            return {\n                'total_anomalies': 0,\n                'severity_distribution': {},\n                'anomaly_type_distribution': {},\n                'average_anomaly_score': 0\n            }\n        \n        summary = {\n            'total_anomalies': len(anomalies_df),\n            'severity_distribution': anomalies_df['severity'].value_counts().to_dict(),\n            'anomaly_type_distribution': anomalies_df['anomaly_type'].value_counts().to_dict(),\n            'average_anomaly_score': float(anomalies_df['anomaly_score'].mean()),\n            'max_anomaly_score': float(anomalies_df['anomaly_score'].max()),\n            'recent_anomalies_count': len(anomalies_df[\n                anomalies_df['date'] >= (datetime.now() - timedelta(days=7)).isoformat()\n            ])\n        }\n        \n        return summary\n    \n    def _calculate_weather_correlations(\n        self,\n        features_df: pd.DataFrame,\n        commodity_code: str,\n        weather_types: List[str]\n    ) -> List[Dict]:\n        \"\"\"Calculate weather-price correlations.\"\"\"\n        \n        correlations = []\n        \n        for weather_type in weather_types:\n            weather_col = f\"weather_{weather_type.lower()}\"\n            \n            if weather_col in features_df.columns and 'price' in features_df.columns:\n                # Calculate correlation\n                corr_coef = features_df[weather_col].corr(features_df['price'])\n                \n                if not np.isnan(corr_coef):\n                    # Determine significance level\n                    abs_corr = abs(corr_coef)\n                    if abs_corr > 0.7:\n                        significance = 'high'\n                    elif abs_corr > 0.5:\n                        significance = 'medium'\n                    elif abs_corr > 0.3:\n                        significance = 'low'\n                    else:\n                        significance = 'not_significant'\n                    \n                    correlations.append({\n                        'commodity_code': commodity_code,\n                        'weather_type': weather_type,\n                        'correlation_coefficient': float(corr_coef),\n                        'p_value': 0.05,  # Simplified\n                        'significance_level': significance,\n                        'lag_days': 0,  # Simplified\n                        'sample_size': len(features_df.dropna(subset=[weather_col, 'price']))\n                    })\n        \n        return correlations\n    \n    def _generate_correlation_insights(self, correlations: List[Dict]) -> List[str]:\n        \"\"\"Generate insights from correlation analysis.\"\"\"\n        \n        insights = []\n        \n        for corr in correlations:\n            if corr['significance_level'] in ['high', 'medium']:\n                direction = 'positif' if corr['correlation_coefficient'] > 0 else 'negatif'\n                insights.append(\n                    f\"{corr['weather_type']} memiliki korelasi {direction} \"\n                    f\"({corr['correlation_coefficient']:.2f}) dengan harga {corr['commodity_code']}\"\n                )\n        \n        if not insights:\n            insights.append(\"Tidak ditemukan korelasi signifikan antara cuaca dan harga\")\n        \n        return insights\n    \n    def _generate_correlation_recommendations(self, correlations: List[Dict]) -> List[str]:\n        \"\"\"Generate recommendations from correlation analysis.\"\"\"\n        \n        recommendations = []\n        \n        significant_correlations = [\n            c for c in correlations if c['significance_level'] in ['high', 'medium']\n        ]\n        \n        if significant_correlations:\n            recommendations.append(\n                \"Monitor kondisi cuaca untuk memprediksi perubahan harga\"\n            )\n            recommendations.append(\n                \"Pertimbangkan data cuaca dalam model prediksi harga\"\n            )\n        \n        return recommendations\n    \n    def get_prediction_stats(self) -> Dict:\n        \"\"\"Get prediction service statistics.\"\"\"\n        \n        cache_hit_rate = (\n            self.prediction_stats['cache_hits'] / \n            max(self.prediction_stats['total_predictions'], 1)\n        ) * 100\n        \n        return {\n            **self.prediction_stats,\n            'cache_hit_rate': cache_hit_rate,\n            'models_loaded': len(self.model_cache)\n        }\n    \n    async def health_check(self) -> Dict:\n        \"\"\"Check service health.\"\"\"\n        \n        try:\n            # Check database connectivity\n            db_healthy = await db_manager.health_check()\n            \n            # Check Redis connectivity\n            redis_healthy = await redis_manager.health_check()\n            \n            # Check model availability\n            models_available = len(self.model_cache) > 0\n            \n            overall_healthy = db_healthy and redis_healthy\n            \n            return {\n                'status': 'healthy' if overall_healthy else 'unhealthy',\n                'database': db_healthy,\n                'redis': redis_healthy,\n                'models_available': models_available,\n                'prediction_stats': self.get_prediction_stats(),\n                'timestamp': datetime.now().isoformat()\n            }\n            \n        except Exception as e:\n            ml_logger.error(\"Health check failed\", error=str(e))\n            return {\n                'status': 'unhealthy',\n                'error': str(e),\n                'timestamp': datetime.now().isoformat()\n            }\n\n\n# Global prediction service instance\nprediction_service = PredictionService()\n
\ No newline at end of file
+    async def predict_price(
+        self,
+        commodity_code: str,
+        region_code: str = None,
+        horizon_days: int = 7,
+        model_type: str = 'prophet',
+        include_uncertainty: bool = True,
+        include_features: bool = False,
+        lookback_days: int = 90
+    ) -> Dict:
+        """Predict commodity price."""
+        
+        async def load_data() -> pd.DataFrame:
+            # Shared with concurrent requests for the same series
+            return await self._get_recent_data_coalesced(
+                commodity_code, region_code, lookback_days=lookback_days
+            )
+        
+        return await self._predict_price(
+            commodity_code=commodity_code,
+            region_code=region_code,
+            horizon_days=horizon_days,
+            model_type=model_type,
+            include_uncertainty=include_uncertainty,
+            include_features=include_features,
+            load_data=load_data
+        )
+    
+    async def _predict_price(
+        self,
+        commodity_code: str,
+        region_code: str,
+        horizon_days: int,
+        model_type: str,
+        include_uncertainty: bool,
+        include_features: bool,
+        load_data: Callable[[], Awaitable[pd.DataFrame]],
+        refresh: bool = False,
+        l2_checked: bool = False,
+        cache_writes: Optional[List] = None
+    ) -> Dict:
+        """Predict commodity price using ``load_data`` for the feature frame.
+        
+        ``refresh`` skips both cache tiers and recomputes the prediction.
+        ``l2_checked`` skips the Redis lookup for keys a batch already
+        missed, and ``cache_writes`` collects Redis writes for one pipeline.
+        """
+        
+        try:
+            # Generate cache key
+            cache_key = self._generate_cache_key(
+                commodity_code, region_code, horizon_days, model_type
+            )
+            
+            # L1: in-process cache, no Redis round trip
+            cached_prediction = None if refresh else self.prediction_cache.get(cache_key)
+            if cached_prediction is not None:
+                self.prediction_stats['cache_hits'] += 1
+                self.prediction_stats['l1_cache_hits'] += 1
+                return cached_prediction
+            
+            # Concurrent misses for the same key share one resolution (per
+            # loop); refreshes never join a lookup that may serve the cache
+            inflight_key = (cache_key, refresh)
+            prediction_task = self._inflight_predictions.get(inflight_key)
+            if prediction_task is None or prediction_task.get_loop() is not asyncio.get_running_loop():
+                prediction_task = asyncio.ensure_future(
+                    self._resolve_prediction(
+                        cache_key=cache_key,
+                        commodity_code=commodity_code,
+                        region_code=region_code,
+                        horizon_days=horizon_days,
+                        model_type=model_type,
+                        include_uncertainty=include_uncertainty,
+                        include_features=include_features,
+                        load_data=load_data,
+                        use_cache=not (refresh or l2_checked),
+                        cache_writes=cache_writes
+                    )
+                )
+                self._inflight_predictions[inflight_key] = prediction_task
+                prediction_task.add_done_callback(
+                    lambda task: self._inflight_predictions.pop(inflight_key, None)
+                    if self._inflight_predictions.get(inflight_key) is task else None
+                )
+            else:
+                self.prediction_stats['coalesced_requests'] += 1
+            
+            # Shield so a cancelled waiter does not cancel the shared work
+            return await asyncio.shield(prediction_task)
+            
+        except Exception as e:
+            ml_logger.error(
+                "Price prediction failed",
+                commodity_code=commodity_code,
+                region_code=region_code,
+                model_type=model_type,
+                error=str(e)
+            )
+            raise e
+    
+    async def _resolve_prediction(
+        self,
+        cache_key: str,
+        commodity_code: str,
+        region_code: str,
+        horizon_days: int,
+        model_type: str,
+        include_uncertainty: bool,
+        include_features: bool,
+        load_data: Callable[[], Awaitable[pd.DataFrame]],
+        use_cache: bool = True,
+        cache_writes: Optional[List] = None
+    ) -> Dict:
+        """Resolve an L1 miss from Redis, else run the model."""
+        
+        prediction_params = dict(
+            cache_key=cache_key,
+            commodity_code=commodity_code,
+            region_code=region_code,
+            horizon_days=horizon_days,
+            model_type=model_type,
+            include_uncertainty=include_uncertainty,
+            include_features=include_features,
+            load_data=load_data
+        )
+        
+        # L2: shared Redis cache
+        cached_prediction = await redis_manager.get_cached_predictions(cache_key) if use_cache else None
+        if cached_prediction:
+            return self._serve_l2_hit(cached_prediction, prediction_params)
+        
+        if use_cache:
+            self.prediction_stats['cache_misses'] += 1
+        
+        return await self._compute_prediction(**prediction_params, cache_writes=cache_writes)
+    
+    def _serve_l2_hit(self, cached_prediction: Dict, prediction_params: Dict) -> Dict:
+        """Return a Redis hit, refreshing it in the background when stale."""
+        
+        cache_key = prediction_params['cache_key']
+        self.prediction_stats['cache_hits'] += 1
+        self.prediction_stats['l2_cache_hits'] += 1
+        
+        if self._is_stale(cached_prediction):
+            # Serve the expired entry, recompute in the background
+            self.prediction_stats['stale_served'] += 1
+            self._schedule_refresh(prediction_params)
+        else:
+            self.prediction_cache.put(cache_key, cached_prediction)
+        
+        ml_logger.info(
+            "Prediction served from cache",
+            commodity_code=prediction_params['commodity_code'],
+            cache_key=cache_key
+        )
+        return cached_prediction
+    
+    async def _compute_prediction(
+        self,
+        cache_key: str,
+        commodity_code: str,
+        region_code: str,
+        horizon_days: int,
+        model_type: str,
+        include_uncertainty: bool,
+        include_features: bool,
+        load_data: Callable[[], Awaitable[pd.DataFrame]],
+        cache_writes: Optional[List] = None
+    ) -> Dict:
+        """Run the model and store the result in both cache tiers.
+        
+        With ``cache_writes`` the Redis write is queued for the caller.
+        """
+        
+        start_time = time.time()
+        
+        # Get recent data for prediction
+        recent_data = await load_data()
+        
+        # Make prediction; the model is loaded where inference runs
+        prediction_result = await self._make_prediction(
+            data=recent_data,
+            commodity_code=commodity_code,
+            region_code=region_code,
+            horizon_days=horizon_days,
+            model_type=model_type,
+            include_uncertainty=include_uncertainty,
+            include_features=include_features
+        )
+        
+        # Cache prediction, kept past freshness so it can be served stale
+        cache_tags = [
+            redis_manager.commodity_tag(commodity_code),
+            redis_manager.model_version_tag(
+                model_type, commodity_code, prediction_result['model_version']
+            )
+        ]
+        if cache_writes is not None:
+            cache_writes.append((cache_key, prediction_result, cache_tags))
+        else:
+            await redis_manager.cache_model_predictions(
+                cache_key,
+                prediction_result,
+                expire=self._prediction_cache_expire(),
+                tags=cache_tags
+            )
+        self.prediction_cache.put(cache_key, prediction_result)
+        
+        # Update stats
+        latency_ms = (time.time() - start_time) * 1000
+        self._update_prediction_stats(latency_ms)
+        
+        # Log prediction
+        ml_logger.log_prediction_request(
+            request_id=cache_key,
+            commodity_code=commodity_code,
+            region_code=region_code,
+            prediction_horizon=horizon_days,
+            latency_ms=latency_ms
+        )
+        
+        return prediction_result
+    
+    def _prediction_cache_expire(self) -> int:
+        """Redis TTL covering the fresh and stale windows."""
+        return settings.prediction_cache_ttl_seconds + settings.prediction_cache_stale_ttl_seconds
+    
+    def _is_stale(self, prediction: Dict) -> bool:
+        """Whether a cached prediction is older than the fresh TTL."""
+        try:
+            generated_at = datetime.fromisoformat(prediction['prediction_date'])
+        except (KeyError, TypeError, ValueError):
+            return False
+        
+        return (datetime.now() - generated_at).total_seconds() > settings.prediction_cache_ttl_seconds
+    
+    def _schedule_refresh(self, prediction_params: Dict) -> None:
+        """Recompute a stale prediction in the background, once per key."""
+        
+        cache_key = prediction_params['cache_key']
+        refresh_task = self._refresh_tasks.get(cache_key)
+        if refresh_task is not None and not refresh_task.done():
+            return
+        
+        async def refresh():
+            try:
+                await self._compute_prediction(**prediction_params)
+                self.prediction_stats['background_refreshes'] += 1
+            except Exception as e:
+                ml_logger.warning("Background prediction refresh failed", cache_key=cache_key, error=str(e))
+        
+        refresh_task = asyncio.ensure_future(refresh())
+        self._refresh_tasks[cache_key] = refresh_task
+        refresh_task.add_done_callback(
+            lambda task: self._refresh_tasks.pop(cache_key, None)
+            if self._refresh_tasks.get(cache_key) is task else None
+        )
+    
+    async def batch_predict(
+        self,
+        requests: List[Dict],
+        max_workers: int = None,
+        refresh: bool = False
+    ) -> List[Dict]:
+        """Perform batch predictions concurrently on the running event loop.
+        
+        ``refresh`` recomputes every prediction instead of reading the caches.
+        """
+        
+        start_time = time.time()
+        max_workers = max_workers or settings.batch_max_concurrency
+        
+        try:
+            ml_logger.info(
+                "Starting batch prediction",
+                request_count=len(requests),
+                max_workers=max_workers
+            )
+            
+            # Bound the number of in-flight predictions
+            semaphore = asyncio.Semaphore(max_workers)
+            
+            # One data load per (commodity, region, lookback) group
+            request_groups = self._plan_batch(requests)
+            shared_loads = {
+                group_key: _SharedDataLoad(
+                    lambda group_key=group_key: self._get_recent_data_coalesced(*group_key)
+                )
+                for group_key in request_groups
+            }
+            
+            # Every cache hit resolved up front: L1, then one MGET for the rest
+            cache_keys = [self._request_cache_key(request) for request in requests]
+            cached_predictions = {} if refresh else await self._prefetch_predictions(cache_keys)
+            cache_writes = []
+            
+            async def predict_item(request: Dict, cache_key: str) -> Dict:
+                request_params = {'lookback_days': 90, **request}
+                group_key = self._request_group_key(request_params)
+                prediction_params = dict(
+                    commodity_code=request_params['commodity_code'],
+                    region_code=request_params.get('region_code'),
+                    horizon_days=request_params.get('horizon_days', 7),
+                    model_type=request_params.get('model_type', 'prophet'),
+                    include_uncertainty=request_params.get('include_uncertainty', True),
+                    include_features=request_params.get('include_features', False),
+                    load_data=shared_loads[group_key]
+                )
+                
+                cached = cached_predictions.get(cache_key)
+                if cached is not None:
+                    tier, prediction = cached
+                    if tier == 'l1':
+                        self.prediction_stats['cache_hits'] += 1
+                        self.prediction_stats['l1_cache_hits'] += 1
+                    else:
+                        prediction = self._serve_l2_hit(prediction, {'cache_key': cache_key, **prediction_params})
+                    return {
+                        'status': 'success',
+                        'request': request,
+                        'prediction': prediction
+                    }
+                
+                if not refresh:
+                    self.prediction_stats['cache_misses'] += 1
+                
+                async with semaphore:
+                    try:
+                        prediction = await self._predict_price(
+                            **prediction_params,
+                            refresh=refresh,
+                            l2_checked=not refresh,
+                            cache_writes=cache_writes
+                        )
+                        return {
+                            'status': 'success',
+                            'request': request,
+                            'prediction': prediction
+                        }
+                    except Exception as e:
+                        ml_logger.error(
+                            "Batch prediction item failed",
+                            request=request,
+                            error=str(e)
+                        )
+                        return {
+                            'status': 'error',
+                            'request': request,
+                            'error': str(e)
+                        }
+            
+            results = await asyncio.gather(*(
+                predict_item(request, cache_key) for request, cache_key in zip(requests, cache_keys)
+            ))
+            
+            # New predictions go to Redis in one pipeline
+            if cache_writes:
+                await redis_manager.cache_many_model_predictions(
+                    {cache_key: prediction for cache_key, prediction, _ in cache_writes},
+                    expire=self._prediction_cache_expire(),
+                    tags={cache_key: cache_tags for cache_key, _, cache_tags in cache_writes}
+                )
+            
+            # Calculate statistics
+            successful = sum(1 for r in results if r['status'] == 'success')
+            failed = len(results) - successful
+            processing_time_ms = (time.time() - start_time) * 1000
+            
+            batch_result = {
+                'total_requests': len(requests),
+                'successful_predictions': successful,
+                'failed_predictions': failed,
+                'processing_time_ms': processing_time_ms,
+                'predictions': list(results)
+            }
+            
+            ml_logger.info(
+                "Batch prediction completed",
+                request_groups=len(request_groups),
+                cache_hits=len(cached_predictions),
+                cache_writes=len(cache_writes),
+                data_loads=sum(load.started for load in shared_loads.values()),
+                **{k: v for k, v in batch_result.items() if k != 'predictions'}
+            )
+            
+            return batch_result
+            
+        except Exception as e:
+            ml_logger.error("Batch prediction failed", error=str(e))
+            raise e
+    
+    async def _prefetch_predictions(self, cache_keys: List[str]) -> Dict[str, Tuple[str, Dict]]:
+        """Look up batch keys in L1, then fetch the L1 misses with one MGET."""
+        
+        cached_predictions = {}
+        l1_misses = []
+        for cache_key in dict.fromkeys(cache_keys):
+            prediction = self.prediction_cache.get(cache_key)
+            if prediction is not None:
+                cached_predictions[cache_key] = ('l1', prediction)
+            else:
+                l1_misses.append(cache_key)
+        
+        if l1_misses:
+            l2_hits = await redis_manager.get_many_cached_predictions(l1_misses)
+            for cache_key, prediction in l2_hits.items():
+                cached_predictions[cache_key] = ('l2', prediction)
+        
+        return cached_predictions
+    
+    def _request_cache_key(self, request: Dict) -> str:
+        """Prediction cache key of a batch request."""
+        return self._generate_cache_key(
+            request['commodity_code'],
+            request.get('region_code'),
+            request.get('horizon_days', 7),
+            request.get('model_type', 'prophet')
+        )
+    
+    def _request_group_key(self, request: Dict) -> Tuple:
+        """Key of the shared feature frame a request needs."""
+        return (
+            request['commodity_code'],
+            request.get('region_code'),
+            request.get('lookback_days', 90)
+        )
+    
+    def _plan_batch(self, requests: List[Dict]) -> Dict[Tuple, List[int]]:
+        """Group batch request indices by commodity, region and lookback."""
+        
+        request_groups = {}
+        for index, request in enumerate(requests):
+            request_groups.setdefault(self._request_group_key(request), []).append(index)
+        
+        return request_groups
+    
+    async def detect_anomalies(
+        self,
+        commodity_code: str = None,
+        region_code: str = None,
+        detection_type: str = 'both',
+        sensitivity: float = 0.1,
+        time_window_days: int = 30
+    ) -> Dict:
+        """Detect price anomalies."""
+        
+        try:
+            # Generate cache key for anomaly detection
+            cache_key = f"anomaly:{commodity_code or 'all'}:{region_code or 'all'}:{detection_type}:{sensitivity}"
+            
+            # Check cache
+            cached_anomalies = await redis_manager.get_cached_anomaly_scores(cache_key)
+            if cached_anomalies:
+                return cached_anomalies
+            
+            # Load anomaly detection model
+            model = await self._load_model('anomaly', commodity_code)
+            
+            # Get recent data
+            recent_data = await self._get_recent_data(
+                commodity_code, region_code, lookback_days=time_window_days
+            )
+            
+            # Detect anomalies
+            detection_types = [
+                detection_type
+            ] if detection_type != 'both' else ['temporal', 'geographic']
+            
+            anomalies_df = model.detect_anomalies(
+                recent_data,
+                detection_types=detection_types,
+                sensitivity=sensitivity
+            )
+            
+            # Process results
+            anomalies_list = []
+            if not anomalies_df.empty:
+                records_df = anomalies_df
+                if 'date' in records_df:
+                    # Convert datetime to string for JSON serialization
+                    records_df = records_df.assign(date=[
+                        date.isoformat() if hasattr(date, 'isoformat') else date
+                        for date in records_df['date']
+                    ])
+                anomalies_list = records_df.to_dict('records')
+            
+            # Calculate summary statistics
+            summary_stats = self._calculate_anomaly_summary(anomalies_df)
+            
+            result = {
+                'detection_type': detection_type,
+                'total_anomalies': len(anomalies_list),
+                'anomalies': anomalies_list,
+                'summary_statistics': summary_stats,
+                'detection_metadata': {
+                    'commodity_code': commodity_code,
+                    'region_code': region_code,
+                    'sensitivity': sensitivity,
+                    'time_window_days': time_window_days,
+                    'detection_date': datetime.now().isoformat()
+                }
+            }
+            
+            # Cache results
+            await redis_manager.cache_anomaly_scores(
+                cache_key,
+                result,
+                expire=3600,  # 1 hour
+                tags=[redis_manager.commodity_tag(commodity_code)]
+            )
+            
+            ml_logger.info(
+                "Anomaly detection completed",
+                commodity_code=commodity_code,
+                total_anomalies=len(anomalies_list),
+                detection_type=detection_type
+            )
+            
+            return result
+            
+        except Exception as e:
+            ml_logger.error(
+                "Anomaly detection failed",
+                commodity_code=commodity_code,
+                error=str(e)
+            )
+            raise e
+    
+    async def analyze_price_correlation(
+        self,
+        commodity_code: str,
+        region_codes: List[str] = None,
+        weather_types: List[str] = None,
+        time_window_days: int = 365
+    ) -> Dict:
+        """Analyze price-weather correlation."""
+        
+        try:
+            # Get price and weather data
+            price_data, weather_data = await self.data_processor.load_and_preprocess_data_async(
+                commodity_codes=[commodity_code],
+                region_codes=region_codes,
+                start_date=(datetime.now() - timedelta(days=time_window_days)).isoformat(),
+                include_weather=True
+            )
+            
+            if price_data.empty or weather_data.empty:
+                return {
+                    'commodity_code': commodity_code,
+                    'correlations': [],
+                    'error': 'Insufficient data for correlation analysis'
+                }
+            
+            # Engineer features for correlation analysis
+            features_df = self.feature_engineer.engineer_features(
+                price_data=price_data,
+                weather_data=weather_data,
+                commodity_code=commodity_code
+            )
+            
+            # Calculate correlations
+            correlations = self._calculate_weather_correlations(
+                features_df, commodity_code, weather_types or ['TEMPERATURE', 'RAINFALL', 'HUMIDITY']
+            )
+            
+            # Generate insights and recommendations
+            insights = self._generate_correlation_insights(correlations)
+            recommendations = self._generate_correlation_recommendations(correlations)
+            
+            result = {
+                'commodity_code': commodity_code,
+                'analysis_period': {
+                    'start': price_data['date'].min().isoformat(),
+                    'end': price_data['date'].max().isoformat()
+                },
+                'correlations': correlations,
+                'summary_insights': insights,
+                'recommendations': recommendations
+            }
+            
+            ml_logger.info(
+                "Price-weather correlation analysis completed",
+                commodity_code=commodity_code,
+                correlation_count=len(correlations)
+            )
+            
+            return result
+            
+        except Exception as e:
+            ml_logger.error(
+                "Correlation analysis failed",
+                commodity_code=commodity_code,
+                error=str(e)
+            )
+            raise e
+    
+    async def _load_model(self, model_type: str, commodity_code: str, region_code: str = None):
+        """Load ML model through the shared model registry, off the event loop."""
+        
+        # ModelTrainer.load_model checks the registry before reading from disk
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(self.model_trainer.load_model, model_type, commodity_code, region_code)
+        )
+    
+    async def _get_recent_data_coalesced(
+        self,
+        commodity_code: str,
+        region_code: str = None,
+        lookback_days: int = 90
+    ) -> pd.DataFrame:
+        """Share one in-flight data load between concurrent requests."""
+        
+        load_key = (commodity_code, region_code, lookback_days)
+        
+        # Only share a load started on this event loop
+        load_task = self._inflight_data_loads.get(load_key)
+        if load_task is None or load_task.get_loop() is not asyncio.get_running_loop():
+            load_task = asyncio.ensure_future(
+                self._get_recent_data(commodity_code, region_code, lookback_days)
+            )
+            self._inflight_data_loads[load_key] = load_task
+            load_task.add_done_callback(
+                lambda task: self._inflight_data_loads.pop(load_key, None)
+                if self._inflight_data_loads.get(load_key) is task else None
+            )
+        
+        # Shield so a cancelled waiter does not cancel the shared load
+        return await asyncio.shield(load_task)
+    
+    async def _get_recent_data(
+        self,
+        commodity_code: str,
+        region_code: str = None,
+        lookback_days: int = 90
+    ) -> pd.DataFrame:
+        """Get recent data for prediction."""
+        
+        now = datetime.now()
+        
+        # Load at least the daily history the incremental feature state
+        # needs (today's price may not be published yet), so warm series
+        # only featurize new rows; the requested lookback is returned
+        fetch_days = max(lookback_days, IncrementalFeatureState.min_history() + 1)
+        start_date = (now - timedelta(days=fetch_days)).isoformat()
+        
+        # Non-blocking load through the async engine
+        price_data, weather_data = await self.data_processor.load_and_preprocess_data_async(
+            commodity_codes=[commodity_code],
+            region_codes=[region_code] if region_code else None,
+            start_date=start_date,
+            include_weather=True
+        )
+        
+        if price_data.empty:
+            raise ValueError(f"No recent data available for {commodity_code}")
+        
+        # Engineer features (only newly arrived rows when state is warm) in a
+        # worker thread, so the incremental state stays in this process
+        loop = asyncio.get_running_loop()
+        features_df = await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.feature_engineer.engineer_features,
+                price_data=price_data,
+                weather_data=weather_data,
+                commodity_code=commodity_code,
+                region_code=region_code,
+                incremental=True
+            )
+        )
+        
+        return features_df[features_df.index >= now - timedelta(days=lookback_days)]
+    
+    async def _make_prediction(
+        self,
+        data: pd.DataFrame,
+        commodity_code: str,
+        region_code: str,
+        horizon_days: int,
+        model_type: str,
+        include_uncertainty: bool,
+        include_features: bool
+    ) -> Dict:
+        """Make prediction with the model for ``model_type``."""
+        
+        # Make prediction based on model type
+        forecast, model_info = await self._run_inference(
+            model_type, commodity_code, region_code, data, horizon_days, include_features
+        )
+        
+        # Get current price
+        current_price = data['price'].iloc[-1] if not data.empty else 0
+        
+        # Calculate price change forecast
+        if not forecast.empty:
+            future_price = forecast['yhat'].iloc[-1]
+            price_change = ((future_price - current_price) / current_price) * 100
+            
+            # Determine trend direction
+            if price_change > 2:
+                trend_direction = 'up'
+            elif price_change < -2:
+                trend_direction = 'down'
+            else:
+                trend_direction = 'stable'
+        else:
+            future_price = current_price
+            price_change = 0
+            trend_direction = 'stable'
+        
+        # Format predictions
+        predictions = []
+        for _, row in forecast.iterrows():
+            prediction_point = {
+                'date': row['ds'].isoformat() if hasattr(row['ds'], 'isoformat') else str(row['ds']),
+                'predicted_price': float(row['yhat']),
+                'confidence': float(row.get('confidence', 0.8))
+            }
+            
+            if include_uncertainty:
+                prediction_point['lower_bound'] = float(row.get('yhat_lower', row['yhat'] * 0.95))
+                prediction_point['upper_bound'] = float(row.get('yhat_upper', row['yhat'] * 1.05))
+            
+            predictions.append(prediction_point)
+        
+        # Resolve names from the in-memory metadata cache
+        await metadata_cache.ensure_fresh()
+        commodity_name = metadata_cache.commodity_name(commodity_code)
+        region_name = metadata_cache.region_name(region_code) if region_code else None
+        
+        result = {
+            'commodity_code': commodity_code,
+            'commodity_name': commodity_name,
+            'region_code': region_code,
+            'region_name': region_name,
+            'model_type': model_type,
+            'model_version': model_info.pop('model_version'),
+            'predictions': predictions,
+            'current_price': float(current_price),
+            'price_change_forecast': float(price_change),
+            'trend_direction': trend_direction,
+            'prediction_date': datetime.now().isoformat()
+        }
+        result.update(model_info)
+        
+        return result
+    
+    async def _run_inference(
+        self,
+        model_type: str,
+        commodity_code: str,
+        region_code: str,
+        data: pd.DataFrame,
+        horizon_days: int,
+        include_features: bool = False
+    ) -> Tuple[pd.DataFrame, Dict]:
+        """Run CPU-heavy model inference in the process pool.
+        
+        Pool workers load the model themselves, so the model is only loaded
+        in this process when inference runs here. Returns the forecast and
+        the model fields reported with it.
+        """
+        
+        use_pool = (
+            self.inference_workers > 0
+            and model_type in ['prophet', 'lstm']
+            and os.path.exists(_model_path(model_type, commodity_code, region_code))
+        )
+        
+        if use_pool:
+            # Prophet forecasts from its own history, so skip shipping the
+            # frame; LSTM inputs go through shared memory, not a pickle
+            shared = FeatureMatrix.from_frame(data).share() if model_type == 'lstm' else None
+            
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    self._get_process_pool(),
+                    _forecast_in_worker,
+                    model_type,
+                    commodity_code,
+                    region_code,
+                    shared.handle if shared is not None else None,
+                    horizon_days,
+                    include_features
+                )
+            except FileNotFoundError:
+                # Model file removed since the check
+                pass
+            finally:
+                if shared is not None:
+                    shared.close()
+        
+        # Model only exists in this process (not persisted yet) or no pool
+        model = await self._load_model(model_type, commodity_code, region_code)
+        return _run_forecast(model, model_type, data, horizon_days), _model_info(model, include_features)
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """Create the inference process pool on first use."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.inference_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._process_pool
+    
+    def shutdown(self):
+        """Release the inference process pool."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+    
+    def _generate_cache_key(
+        self,
+        commodity_code: str,
+        region_code: str,
+        horizon_days: int,
+        model_type: str
+    ) -> str:
+        """Generate cache key for prediction."""
+        return f"pred:{commodity_code}:{region_code or 'national'}:{horizon_days}:{model_type}"
+    
+    def _update_prediction_stats(self, latency_ms: float):
+        """Update prediction statistics."""
+        self.prediction_stats['total_predictions'] += 1
+        self.prediction_stats['last_prediction_time'] = datetime.now().isoformat()
+        
+        # Update average latency using exponential moving average
+        if self.prediction_stats['average_latency_ms'] == 0:
+            self.prediction_stats['average_latency_ms'] = latency_ms
+        else:
+            alpha = 0.1  # Smoothing factor
+            self.prediction_stats['average_latency_ms'] = (
+                alpha * latency_ms + 
+                (1 - alpha) * self.prediction_stats['average_latency_ms']
+            )
+    
+    def _calculate_anomaly_summary(self, anomalies_df: pd.DataFrame) -> Dict:
+        """Calculate summary statistics for anomalies."""
+        
+        if anomalies_df.empty:
+            return {
+                'total_anomalies': 0,
+                'severity_distribution': {},
+                'anomaly_type_distribution': {},
+                'average_anomaly_score': 0
+            }
+        
+        summary = {
+            'total_anomalies': len(anomalies_df),
+            'severity_distribution': anomalies_df['severity'].value_counts().to_dict(),
+            'anomaly_type_distribution': anomalies_df['anomaly_type'].value_counts().to_dict(),
+            'average_anomaly_score': float(anomalies_df['anomaly_score'].mean()),
+            'max_anomaly_score': float(anomalies_df['anomaly_score'].max()),
+            'recent_anomalies_count': len(anomalies_df[
+                anomalies_df['date'] >= (datetime.now() - timedelta(days=7)).isoformat()
+            ])
+        }
+        
+        return summary
+    
+    def _calculate_weather_correlations(
+        self,
+        features_df: pd.DataFrame,
+        commodity_code: str,
+        weather_types: List[str]
+    ) -> List[Dict]:
+        """Calculate weather-price correlations."""
+        
+        correlations = []
+        
+        for weather_type in weather_types:
+            weather_col = f"weather_{weather_type.lower()}"
+            
+            if weather_col in features_df.columns and 'price' in features_df.columns:
+                # Calculate correlation
+                corr_coef = features_df[weather_col].corr(features_df['price'])
+                
+                if not np.isnan(corr_coef):
+                    # Determine significance level
+                    abs_corr = abs(corr_coef)
+                    if abs_corr > 0.7:
+                        significance = 'high'
+                    elif abs_corr > 0.5:
+                        significance = 'medium'
+                    elif abs_corr > 0.3:
+                        significance = 'low'
+                    else:
+                        significance = 'not_significant'
+                    
+                    correlations.append({
+                        'commodity_code': commodity_code,
+                        'weather_type': weather_type,
+                        'correlation_coefficient': float(corr_coef),
+                        'p_value': 0.05,  # Simplified
+                        'significance_level': significance,
+                        'lag_days': 0,  # Simplified
+                        'sample_size': len(features_df.dropna(subset=[weather_col, 'price']))
+                    })
+        
+        return correlations
+    
+    def _generate_correlation_insights(self, correlations: List[Dict]) -> List[str]:
+        """Generate insights from correlation analysis."""
+        
+        insights = []
+        
+        for corr in correlations:
+            if corr['significance_level'] in ['high', 'medium']:
+                direction = 'positif' if corr['correlation_coefficient'] > 0 else 'negatif'
+                insights.append(
+                    f"{corr['weather_type']} memiliki korelasi {direction} "
+                    f"({corr['correlation_coefficient']:.2f}) dengan harga {corr['commodity_code']}"
+                )
+        
+        if not insights:
+            insights.append("Tidak ditemukan korelasi signifikan antara cuaca dan harga")
+        
+        return insights
+    
+    def _generate_correlation_recommendations(self, correlations: List[Dict]) -> List[str]:
+        """Generate recommendations from correlation analysis."""
+        
+        recommendations = []
+        
+        significant_correlations = [
+            c for c in correlations if c['significance_level'] in ['high', 'medium']
+        ]
+        
+        if significant_correlations:
+            recommendations.append(
+                "Monitor kondisi cuaca untuk memprediksi perubahan harga"
+            )
+            recommendations.append(
+                "Pertimbangkan data cuaca dalam model prediksi harga"
+            )
+        
+        return recommendations
+    
+    def get_prediction_stats(self) -> Dict:
+        """Get prediction service statistics."""
+        
+        cache_hit_rate = (
+            self.prediction_stats['cache_hits'] / 
+            max(self.prediction_stats['total_predictions'], 1)
+        ) * 100
+        
+        # L1 sees every lookup, Redis only sees L1 misses
+        l1_lookups = self.prediction_stats['l1_cache_hits'] + self.prediction_stats['l2_cache_hits'] + self.prediction_stats['cache_misses']
+        l2_lookups = self.prediction_stats['l2_cache_hits'] + self.prediction_stats['cache_misses']
+        
+        return {
+            **self.prediction_stats,
+            'cache_hit_rate': cache_hit_rate,
+            'cache_tiers': {
+                'l1': {
+                    **self.prediction_cache.get_stats(),
+                    'hit_rate': (self.prediction_stats['l1_cache_hits'] / l1_lookups * 100) if l1_lookups else 0.0
+                },
+                'l2': {
+                    'hits': self.prediction_stats['l2_cache_hits'],
+                    'misses': self.prediction_stats['cache_misses'],
+                    'hit_rate': (self.prediction_stats['l2_cache_hits'] / l2_lookups * 100) if l2_lookups else 0.0
+                }
+            },
+            'models_loaded': len(self.model_cache)
+        }
+    
+    async def health_check(self) -> Dict:
+        """Check service health."""
+        
+        try:
+            # Check database connectivity
+            db_healthy = await db_manager.health_check()
+            
+            # Check Redis connectivity
+            redis_healthy = await redis_manager.health_check()
+            
+            # Check model availability
+            models_available = len(self.model_cache) > 0
+            
+            overall_healthy = db_healthy and redis_healthy
+            
+            return {
+                'status': 'healthy' if overall_healthy else 'unhealthy',
+                'database': db_healthy,
+                'redis': redis_healthy,
+                'models_available': models_available,
+                'prediction_stats': self.get_prediction_stats(),
+                'timestamp': datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            ml_logger.error("Health check failed", error=str(e))
+            return {
+                'status': 'unhealthy',
+                'error': str(e),
+                'timestamp': datetime.now().isoformat()
+            }
+
+
+# Global prediction service instance
+prediction_service = PredictionService()
@@ -0,0 +1,171 @@
+"""Proactive prediction cache warming."""
+
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config.logging import ml_logger
+from app.config.redis import redis_manager
+from app.config.settings import settings
+from app.inference.predictor import PredictionService, prediction_service
+
+
+class PredictionCacheWarmer:
+    """Recompute hot predictions before they expire from the cache.
+    
+    A run only recomputes predictions that are missing from Redis or would
+    go stale before the next run; the rest are left to their TTL.
+    """
+    
+    def __init__(
+        self,
+        service: PredictionService,
+        interval_seconds: int = None,
+        horizons: List[int] = None,
+        model_types: List[str] = None,
+        startup_jitter_seconds: float = None
+    ):
+        self.service = service
+        self.interval_seconds = interval_seconds or settings.cache_warmer_interval_seconds
+        self.horizons = horizons or settings.cache_warmer_horizons
+        self.model_types = model_types or settings.cache_warmer_model_types
+        self.startup_jitter_seconds = (
+            startup_jitter_seconds if startup_jitter_seconds is not None
+            else settings.cache_warmer_startup_jitter_seconds
+        )
+        self._task = None
+        
+        # Statistics
+        self.runs = 0
+        self.last_run = None
+    
+    @property
+    def is_running(self) -> bool:
+        """Whether the periodic warming loop is active."""
+        return self._task is not None and not self._task.done()
+    
+    def build_requests(self, commodity_codes: List[str] = None) -> List[Dict]:
+        """Warm requests for every trained commodity/region/horizon combination."""
+        
+        commodity_codes = commodity_codes or settings.supported_commodities
+        region_codes = [None] + list(settings.supported_regions)
+        
+        return [
+            {
+                'commodity_code': commodity_code,
+                'region_code': region_code,
+                'horizon_days': horizon_days,
+                'model_type': model_type
+            }
+            for commodity_code in commodity_codes
+            for region_code in region_codes
+            for model_type in self.model_types
+            if self._has_model(model_type, commodity_code, region_code)
+            for horizon_days in self.horizons
+        ]
+    
+    async def warm(self, commodity_codes: List[str] = None, force: bool = False) -> Dict:
+        """Recompute due predictions for ``commodity_codes`` (all supported when None).
+        
+        ``force`` recomputes every prediction, e.g. after retraining.
+        """
+        
+        start_time = time.time()
+        candidates = self.build_requests(commodity_codes)
+        requests = candidates if force else await self._due_requests(candidates)
+        
+        if not requests:
+            return {'requests': 0, 'skipped': len(candidates), 'successful': 0, 'failed': 0, 'duration_ms': 0.0}
+        
+        batch_result = await self.service.batch_predict(requests, refresh=True)
+        
+        self.runs += 1
+        self.last_run = {
+            'requests': len(requests),
+            'skipped': len(candidates) - len(requests),
+            'successful': batch_result['successful_predictions'],
+            'failed': batch_result['failed_predictions'],
+            'duration_ms': (time.time() - start_time) * 1000,
+            'completed_at': datetime.now().isoformat()
+        }
+        
+        ml_logger.info("Prediction cache warmed", commodity_codes=commodity_codes, **self.last_run)
+        return self.last_run
+    
+    def start(self) -> None:
+        """Start periodic warming on the running event loop."""
+        if not self.is_running:
+            self._task = asyncio.ensure_future(self._run())
+    
+    async def stop(self) -> None:
+        """Stop periodic warming."""
+        if self._task is None:
+            return
+        
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def _run(self) -> None:
+        """Warm every interval; the interval is kept below the cache TTL."""
+        
+        # Replicas started together should not all warm at the same moment
+        await asyncio.sleep(random.uniform(0, self.startup_jitter_seconds))
+        
+        while True:
+            try:
+                await self.warm()
+            except Exception as e:
+                ml_logger.error("Prediction cache warming failed", error=str(e))
+            
+            await asyncio.sleep(self.interval_seconds)
+    
+    def get_stats(self) -> Dict:
+        """Get cache warmer statistics."""
+        return {
+            'running': self.is_running,
+            'interval_seconds': self.interval_seconds,
+            'horizons': self.horizons,
+            'model_types': self.model_types,
+            'runs': self.runs,
+            'last_run': self.last_run
+        }
+    
+    async def _due_requests(self, requests: List[Dict]) -> List[Dict]:
+        """Requests missing from Redis or going stale before the next run."""
+        
+        cache_keys = [self.service._request_cache_key(request) for request in requests]
+        cached_predictions = await redis_manager.get_many_cached_predictions(cache_keys)
+        
+        return [
+            request
+            for request, cache_key in zip(requests, cache_keys)
+            if self._fresh_seconds_left(cached_predictions.get(cache_key)) < self.interval_seconds
+        ]
+    
+    @staticmethod
+    def _fresh_seconds_left(prediction: Optional[Dict]) -> float:
+        """Seconds until a cached prediction turns stale, 0 when missing."""
+        try:
+            generated_at = datetime.fromisoformat(prediction['prediction_date'])
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+        
+        age = (datetime.now() - generated_at).total_seconds()
+        return settings.prediction_cache_ttl_seconds - age
+    
+    @staticmethod
+    def _has_model(model_type: str, commodity_code: str, region_code: Optional[str]) -> bool:
+        """Whether a trained model file exists for the combination."""
+        model_key = f"{model_type}_{commodity_code}_{region_code or 'national'}"
+        return os.path.exists(os.path.join(settings.model_store_path, f"{model_key}.pkl"))
+
+
+# Global prediction cache warmer instance
+prediction_cache_warmer = PredictionCacheWarmer(prediction_service)
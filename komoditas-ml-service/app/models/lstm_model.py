@@ -21,6 +21,7 @@ except ImportError:
 
 from app.config.logging import ml_logger
 from app.config.settings import settings
+from app.features.matrix import FeatureMatrix
 
 warnings.filterwarnings('ignore')
 
@@ -28,6 +29,14 @@ warnings.filterwarnings('ignore')
 class LSTMForecaster:
     """LSTM-based price forecasting model."""
     
+    # prepare_data auto-selects every numeric column, so all features are needed
+    FEATURE_COLUMNS = None
+    
+    # Features added after the LSTM input layout was fixed. Auto-selection
+    # leaves them out so retrained models keep the input columns of saved
+    # ones; saved models always predict with their stored feature_columns
+    EXCLUDED_FEATURES = ['price_trend_7d', 'price_trend_30d']
+    
     def __init__(
         self,
         commodity_code: str,
@@ -62,7 +71,7 @@ class LSTMForecaster:
             tf.random.set_seed(42)
             np.random.seed(42)
     
-    def _build_model(self, input_shape: Tuple[int, int]) -> keras.Model:
+    def _build_model(self, input_shape: Tuple[int, int]) -> "keras.Model":
         """Build LSTM model architecture."""
         
         model = keras.Sequential([
@@ -122,10 +131,7 @@ class LSTMForecaster:
     ) -> Tuple[np.ndarray, np.ndarray, List[str]]:
         """Prepare data for LSTM training."""
         
-        # Copy to avoid modifying original
-        df = df.copy()
-        
-        # Sort by date
+        # Sort by date (a new frame, the original is untouched)
         if 'date' in df.columns:
             df = df.sort_values('date')
         
@@ -138,23 +144,16 @@ class LSTMForecaster:
             ]
             feature_cols = [
                 col for col in df.select_dtypes(include=[np.number]).columns
-                if col not in exclude_cols
+                if col not in exclude_cols and col not in self.EXCLUDED_FEATURES
             ]
         
         # Ensure target column exists
         if target_col not in df.columns:
             raise ValueError(f"Target column '{target_col}' not found")
         
-        # Handle missing values
-        for col in feature_cols:
-            if col in df.columns:
-                df[col] = df[col].fillna(df[col].median())
-        
-        df[target_col] = df[target_col].fillna(method='ffill').fillna(method='bfill')
-        
-        # Extract features and target
-        X = df[feature_cols].values
-        y = df[target_col].values.reshape(-1, 1)
+        # Extract features as one float32 block, missing values as column medians
+        X = FeatureMatrix.from_frame(df, feature_cols).fillna_median().values
+        y = df[target_col].fillna(method='ffill').fillna(method='bfill').values.reshape(-1, 1)
         
         # Store feature columns
         self.feature_columns = feature_cols
@@ -363,4 +362,254 @@ class LSTMForecaster:
             # Get last sequence for prediction
             last_sequence = X_scaled[-self.sequence_length:].reshape(1, self.sequence_length, -1)
             
-            predictions = []\n            last_features = X_scaled[-1].copy()\n            \n            # Generate multi-step predictions\n            for step in range(horizon_days):\n                # Predict next value\n                pred_scaled = self.model.predict(last_sequence, verbose=0)\n                pred_price = self.scaler_y.inverse_transform(pred_scaled)[0, 0]\n                \n                predictions.append(pred_price)\n                \n                # Update features for next prediction\n                # This is a simplified approach - in practice, you'd want to\n                # properly forecast the features as well\n                new_features = self._update_features_for_next_step(\n                    last_features, pred_scaled[0, 0], step\n                )\n                \n                # Update sequence\n                new_sequence = np.concatenate([\n                    last_sequence[0, 1:, :],\n                    new_features.reshape(1, -1)\n                ]).reshape(1, self.sequence_length, -1)\n                \n                last_sequence = new_sequence\n                last_features = new_features\n            \n            # Create prediction dataframe\n            start_date = df['date'].max() + timedelta(days=1)\n            pred_dates = [start_date + timedelta(days=i) for i in range(horizon_days)]\n            \n            forecast_df = pd.DataFrame({\n                'ds': pred_dates,\n                'yhat': predictions,\n                'commodity_code': self.commodity_code,\n                'region_code': self.region_code,\n                'model_type': 'lstm'\n            })\n            \n            # Add confidence intervals (simplified)\n            forecast_df['yhat_lower'] = forecast_df['yhat'] * 0.95\n            forecast_df['yhat_upper'] = forecast_df['yhat'] * 1.05\n            \n            # Calculate confidence scores\n            forecast_df['confidence'] = self._calculate_prediction_confidence(forecast_df)\n            \n            return forecast_df\n            \n        except Exception as e:\n            ml_logger.error(\n                "LSTM prediction failed",\n                commodity_code=self.commodity_code,\n                error=str(e)\n            )\n            raise e\n    \n    def _update_features_for_next_step(\n        self,\n        last_features: np.ndarray,\n        predicted_price_scaled: float,\n        step: int\n    ) -> np.ndarray:\n        """Update features for next prediction step."""\n        \n        # This is a simplified feature update\n        # In practice, you'd want more sophisticated feature forecasting\n        \n        new_features = last_features.copy()\n        \n        # Update price-related features if they exist\n        for i, col in enumerate(self.feature_columns):\n            if 'price' in col.lower():\n                if 'lag' in col:\n                    # Shift lag features\n                    continue\n                elif 'change' in col:\n                    # Price change features\n                    new_features[i] = predicted_price_scaled - last_features[i]\n                elif 'ma_' in col:\n                    # Moving average features (simplified)\n                    new_features[i] = (last_features[i] * 0.9 + predicted_price_scaled * 0.1)\n            \n            # For other features, use simple persistence or decay\n            elif 'volatility' in col.lower():\n                new_features[i] *= 0.95  # Decay volatility\n            elif 'seasonal' in col.lower() or 'month' in col.lower():\n                # Seasonal features remain relatively stable\n                pass\n        \n        return new_features\n    \n    def _calculate_prediction_confidence(self, forecast_df: pd.DataFrame) -> pd.Series:\n        """Calculate confidence scores for predictions."""\n        \n        # Confidence decreases with prediction horizon\n        base_confidence = 0.9\n        decay_rate = 0.05\n        \n        confidence_scores = []\n        for i in range(len(forecast_df)):\n            confidence = base_confidence * np.exp(-decay_rate * i)\n            confidence_scores.append(max(confidence, 0.3))  # Minimum confidence\n        \n        return pd.Series(confidence_scores)\n    \n    def evaluate_model(\n        self,\n        test_df: pd.DataFrame,\n        target_col: str = 'price'\n    ) -> Dict:\n        """Evaluate model on test data."""\n        \n        if not self.is_fitted:\n            raise ValueError("Model must be fitted before evaluation")\n        \n        try:\n            # Prepare test data\n            X_test, y_test, _ = self.prepare_data(test_df, target_col, self.feature_columns)\n            \n            # Scale data\n            X_test_scaled = self.scaler_X.transform(X_test)\n            y_test_scaled = self.scaler_y.transform(y_test)\n            \n            # Create sequences\n            X_test_seq, y_test_seq = self.create_sequences(X_test_scaled, y_test_scaled)\n            \n            # Make predictions\n            y_pred_scaled = self.model.predict(X_test_seq, verbose=0)\n            \n            # Inverse transform\n            y_true = self.scaler_y.inverse_transform(y_test_seq)\n            y_pred = self.scaler_y.inverse_transform(y_pred_scaled)\n            \n            # Calculate metrics\n            mae = mean_absolute_error(y_true, y_pred)\n            rmse = np.sqrt(mean_squared_error(y_true, y_pred))\n            mape = np.mean(np.abs((y_true - y_pred) / y_true)) * 100\n            \n            # R-squared\n            ss_res = np.sum((y_true - y_pred) ** 2)\n            ss_tot = np.sum((y_true - np.mean(y_true)) ** 2)\n            r2 = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0\n            \n            evaluation_metrics = {\n                'test_mae': float(mae),\n                'test_rmse': float(rmse),\n                'test_mape': float(mape),\n                'test_r2': float(r2),\n                'test_samples': len(y_test_seq)\n            }\n            \n            ml_logger.info(\n                "LSTM model evaluation completed",\n                commodity_code=self.commodity_code,\n                **evaluation_metrics\n            )\n            \n            return evaluation_metrics\n            \n        except Exception as e:\n            ml_logger.error("Model evaluation failed", error=str(e))\n            raise e\n    \n    def save_model(self, filepath: str):\n        """Save trained model."""\n        \n        if not self.is_fitted:\n            raise ValueError("Model must be fitted before saving")\n        \n        try:\n            # Save TensorFlow model\n            model_path = filepath.replace('.pkl', '_model')\n            self.model.save(model_path)\n            \n            # Save metadata and scalers\n            model_data = {\n                'metadata': self.model_metadata,\n                'feature_columns': self.feature_columns,\n                'commodity_code': self.commodity_code,\n                'region_code': self.region_code,\n                'is_fitted': self.is_fitted,\n                'scaler_X': self.scaler_X,\n                'scaler_y': self.scaler_y,\n                'sequence_length': self.sequence_length,\n                'hidden_units': self.hidden_units,\n                'dropout_rate': self.dropout_rate,\n                'learning_rate': self.learning_rate,\n                'model_path': model_path\n            }\n            \n            with open(filepath, 'wb') as f:\n                pickle.dump(model_data, f)\n            \n            ml_logger.info(\n                "LSTM model saved",\n                commodity_code=self.commodity_code,\n                filepath=filepath\n            )\n            \n        except Exception as e:\n            ml_logger.error("Failed to save model", error=str(e))\n            raise e\n    \n    def load_model(self, filepath: str):\n        """Load trained model."""\n        \n        try:\n            # Load metadata and scalers\n            with open(filepath, 'rb') as f:\n                model_data = pickle.load(f)\n            \n            # Load TensorFlow model\n            model_path = model_data['model_path']\n            self.model = keras.models.load_model(model_path)\n            \n            # Restore attributes\n            self.metadata = model_data['metadata']\n            self.feature_columns = model_data['feature_columns']\n            self.commodity_code = model_data['commodity_code']\n            self.region_code = model_data['region_code']\n            self.is_fitted = model_data['is_fitted']\n            self.scaler_X = model_data['scaler_X']\n            self.scaler_y = model_data['scaler_y']\n            self.sequence_length = model_data['sequence_length']\n            self.hidden_units = model_data['hidden_units']\n            self.dropout_rate = model_data['dropout_rate']\n            self.learning_rate = model_data['learning_rate']\n            \n            ml_logger.info(\n                "LSTM model loaded",\n                commodity_code=self.commodity_code,\n                filepath=filepath\n            )\n            \n        except Exception as e:\n            ml_logger.error("Failed to load model", error=str(e))\n            raise e\n    \n    def get_model_info(self) -> Dict:\n        """Get model information."""\n        \n        return {\n            'model_type': 'lstm',\n            'commodity_code': self.commodity_code,\n            'region_code': self.region_code,\n            'is_fitted': self.is_fitted,\n            'feature_count': len(self.feature_columns),\n            'sequence_length': self.sequence_length,\n            'hidden_units': self.hidden_units,\n            'metadata': self.model_metadata\n        }\n
\ No newline at end of file
+            predictions = []
+            last_features = X_scaled[-1].copy()
+            
+            # Generate multi-step predictions
+            for step in range(horizon_days):
+                # Predict next value
+                pred_scaled = self.model.predict(last_sequence, verbose=0)
+                pred_price = self.scaler_y.inverse_transform(pred_scaled)[0, 0]
+                
+                predictions.append(pred_price)
+                
+                # Update features for next prediction
+                # This is a simplified approach - in practice, you'd want to
+                # properly forecast the features as well
+                new_features = self._update_features_for_next_step(
+                    last_features, pred_scaled[0, 0], step
+                )
+                
+                # Update sequence
+                new_sequence = np.concatenate([
+                    last_sequence[0, 1:, :],
+                    new_features.reshape(1, -1)
+                ]).reshape(1, self.sequence_length, -1)
+                
+                last_sequence = new_sequence
+                last_features = new_features
+            
+            # Create prediction dataframe
+            start_date = df['date'].max() + timedelta(days=1)
+            pred_dates = [start_date + timedelta(days=i) for i in range(horizon_days)]
+            
+            forecast_df = pd.DataFrame({
+                'ds': pred_dates,
+                'yhat': predictions,
+                'commodity_code': self.commodity_code,
+                'region_code': self.region_code,
+                'model_type': 'lstm'
+            })
+            
+            # Add confidence intervals (simplified)
+            forecast_df['yhat_lower'] = forecast_df['yhat'] * 0.95
+            forecast_df['yhat_upper'] = forecast_df['yhat'] * 1.05
+            
+            # Calculate confidence scores
+            forecast_df['confidence'] = self._calculate_prediction_confidence(forecast_df)
+            
+            return forecast_df
+            
+        except Exception as e:
+            ml_logger.error(
+                "LSTM prediction failed",
+                commodity_code=self.commodity_code,
+                error=str(e)
+            )
+            raise e
+    
+    def _update_features_for_next_step(
+        self,
+        last_features: np.ndarray,
+        predicted_price_scaled: float,
+        step: int
+    ) -> np.ndarray:
+        """Update features for next prediction step."""
+        
+        # This is a simplified feature update
+        # In practice, you'd want more sophisticated feature forecasting
+        
+        new_features = last_features.copy()
+        
+        # Update price-related features if they exist
+        for i, col in enumerate(self.feature_columns):
+            if 'price' in col.lower():
+                if 'lag' in col:
+                    # Shift lag features
+                    continue
+                elif 'change' in col:
+                    # Price change features
+                    new_features[i] = predicted_price_scaled - last_features[i]
+                elif 'ma_' in col:
+                    # Moving average features (simplified)
+                    new_features[i] = (last_features[i] * 0.9 + predicted_price_scaled * 0.1)
+            
+            # For other features, use simple persistence or decay
+            elif 'volatility' in col.lower():
+                new_features[i] *= 0.95  # Decay volatility
+            elif 'seasonal' in col.lower() or 'month' in col.lower():
+                # Seasonal features remain relatively stable
+                pass
+        
+        return new_features
+    
+    def _calculate_prediction_confidence(self, forecast_df: pd.DataFrame) -> pd.Series:
+        """Calculate confidence scores for predictions."""
+        
+        # Confidence decreases with prediction horizon
+        base_confidence = 0.9
+        decay_rate = 0.05
+        
+        confidence_scores = []
+        for i in range(len(forecast_df)):
+            confidence = base_confidence * np.exp(-decay_rate * i)
+            confidence_scores.append(max(confidence, 0.3))  # Minimum confidence
+        
+        return pd.Series(confidence_scores)
+    
+    def evaluate_model(
+        self,
+        test_df: pd.DataFrame,
+        target_col: str = 'price'
+    ) -> Dict:
+        """Evaluate model on test data."""
+        
+        if not self.is_fitted:
+            raise ValueError("Model must be fitted before evaluation")
+        
+        try:
+            # Prepare test data
+            X_test, y_test, _ = self.prepare_data(test_df, target_col, self.feature_columns)
+            
+            # Scale data
+            X_test_scaled = self.scaler_X.transform(X_test)
+            y_test_scaled = self.scaler_y.transform(y_test)
+            
+            # Create sequences
+            X_test_seq, y_test_seq = self.create_sequences(X_test_scaled, y_test_scaled)
+            
+            # Make predictions
+            y_pred_scaled = self.model.predict(X_test_seq, verbose=0)
+            
+            # Inverse transform
+            y_true = self.scaler_y.inverse_transform(y_test_seq)
+            y_pred = self.scaler_y.inverse_transform(y_pred_scaled)
+            
+            # Calculate metrics
+            mae = mean_absolute_error(y_true, y_pred)
+            rmse = np.sqrt(mean_squared_error(y_true, y_pred))
+            mape = np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+            
+            # R-squared
+            ss_res = np.sum((y_true - y_pred) ** 2)
+            ss_tot = np.sum((y_true - np.mean(y_true)) ** 2)
+            r2 = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+            
+            evaluation_metrics = {
+                'test_mae': float(mae),
+                'test_rmse': float(rmse),
+                'test_mape': float(mape),
+                'test_r2': float(r2),
+                'test_samples': len(y_test_seq)
+            }
+            
+            ml_logger.info(
+                "LSTM model evaluation completed",
+                commodity_code=self.commodity_code,
+                **evaluation_metrics
+            )
+            
+            return evaluation_metrics
+            
+        except Exception as e:
+            ml_logger.error("Model evaluation failed", error=str(e))
+            raise e
+    
+    def save_model(self, filepath: str):
+        """Save trained model."""
+        
+        if not self.is_fitted:
+            raise ValueError("Model must be fitted before saving")
+        
+        try:
+            # Save TensorFlow model
+            model_path = filepath.replace('.pkl', '_model')
+            self.model.save(model_path)
+            
+            # Save metadata and scalers
+            model_data = {
+                'metadata': self.model_metadata,
+                'feature_columns': self.feature_columns,
+                'commodity_code': self.commodity_code,
+                'region_code': self.region_code,
+                'is_fitted': self.is_fitted,
+                'scaler_X': self.scaler_X,
+                'scaler_y': self.scaler_y,
+                'sequence_length': self.sequence_length,
+                'hidden_units': self.hidden_units,
+                'dropout_rate': self.dropout_rate,
+                'learning_rate': self.learning_rate,
+                'model_path': model_path
+            }
+            
+            with open(filepath, 'wb') as f:
+                pickle.dump(model_data, f)
+            
+            ml_logger.info(
+                "LSTM model saved",
+                commodity_code=self.commodity_code,
+                filepath=filepath
+            )
+            
+        except Exception as e:
+            ml_logger.error("Failed to save model", error=str(e))
+            raise e
+    
+    def load_model(self, filepath: str):
+        """Load trained model."""
+        
+        try:
+            # Load metadata and scalers
+            with open(filepath, 'rb') as f:
+                model_data = pickle.load(f)
+            
+            # Load TensorFlow model
+            model_path = model_data['model_path']
+            self.model = keras.models.load_model(model_path)
+            
+            # Restore attributes
+            self.metadata = model_data['metadata']
+            self.feature_columns = model_data['feature_columns']
+            self.commodity_code = model_data['commodity_code']
+            self.region_code = model_data['region_code']
+            self.is_fitted = model_data['is_fitted']
+            self.scaler_X = model_data['scaler_X']
+            self.scaler_y = model_data['scaler_y']
+            self.sequence_length = model_data['sequence_length']
+            self.hidden_units = model_data['hidden_units']
+            self.dropout_rate = model_data['dropout_rate']
+            self.learning_rate = model_data['learning_rate']
+            
+            ml_logger.info(
+                "LSTM model loaded",
+                commodity_code=self.commodity_code,
+                filepath=filepath
+            )
+            
+        except Exception as e:
+            ml_logger.error("Failed to load model", error=str(e))
+            raise e
+    
+    def get_model_info(self) -> Dict:
+        """Get model information."""
+        
+        return {
+            'model_type': 'lstm',
+            'commodity_code': self.commodity_code,
+            'region_code': self.region_code,
+            'is_fitted': self.is_fitted,
+            'feature_count': len(self.feature_columns),
+            'sequence_length': self.sequence_length,
+            'hidden_units': self.hidden_units,
+            'metadata': self.model_metadata
+        }
@@ -24,6 +24,14 @@ warnings.filterwarnings('ignore')
 class ProphetForecaster:
     """Prophet-based price forecasting model."""
     
+    # Engineered columns _add_regressors can pick up (FeatureEngineer names or patterns)
+    FEATURE_COLUMNS = [
+        'weather_*',
+        'ma_7', 'price_ma_7_ratio', 'ma_14', 'price_ma_14_ratio', 'ma_30', 'price_ma_30_ratio',
+        'ema_12', 'ema_26', 'rsi', 'momentum_1',
+        'is_dry_season', 'is_wet_season', 'is_rice_harvest', 'is_corn_harvest'
+    ]
+    
     def __init__(
         self,
         commodity_code: str,
@@ -0,0 +1,212 @@
+"""Shared in-memory model registry dengan memory budget dan eviction."""
+
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.config.logging import ml_logger
+from app.config.settings import settings
+
+
+class _ByteCounter:
+    """File-like sink that only counts bytes written by pickle."""
+    
+    def __init__(self):
+        self.size = 0
+    
+    def write(self, data: bytes) -> int:
+        # Large buffers arrive as memoryviews whose len() counts items, not bytes
+        nbytes = memoryview(data).nbytes
+        self.size += nbytes
+        return nbytes
+
+
+def estimate_model_size(model: Any) -> int:
+    """Estimate the in-memory footprint of a model in bytes."""
+    
+    # Keras models (LSTMForecaster.model): float32 weights plus Adam slots
+    inner_model = getattr(model, 'model', None)
+    if inner_model is not None and hasattr(inner_model, 'count_params'):
+        try:
+            return int(inner_model.count_params()) * 4 * 3
+        except Exception:
+            pass
+    
+    # Everything else: pickled size is a good proxy and avoids holding a copy
+    try:
+        counter = _ByteCounter()
+        pickle.Pickler(counter, protocol=pickle.HIGHEST_PROTOCOL).dump(model)
+        return counter.size
+    except Exception:
+        return sys.getsizeof(model)
+
+
+class ModelRegistry:
+    """Process-wide model cache shared by training and inference.
+    
+    Models are evicted by LRU or LFU policy once ``max_bytes`` is exceeded.
+    Pinned models are never evicted.
+    """
+    
+    EVICTION_POLICIES = ('lru', 'lfu')
+    
+    def __init__(
+        self,
+        max_bytes: int = None,
+        eviction_policy: str = None,
+        pinned_models: List[str] = None
+    ):
+        self.max_bytes = max_bytes if max_bytes is not None else settings.registry_max_bytes
+        self.eviction_policy = (eviction_policy or settings.registry_eviction_policy).lower()
+        
+        if self.eviction_policy not in self.EVICTION_POLICIES:
+            raise ValueError(f"eviction_policy must be one of {self.EVICTION_POLICIES}")
+        
+        self._models = OrderedDict()  # key -> model, ordered by recency
+        self._sizes = {}
+        self._frequency = {}
+        self._pinned = set(pinned_models if pinned_models is not None else settings.registry_pinned_models)
+        self._lock = threading.RLock()
+        
+        self.bytes_used = 0
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'evicted_bytes': 0,
+            'rejected': 0
+        }
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get a model and record the access."""
+        with self._lock:
+            model = self._models.get(key)
+            
+            if model is None:
+                self.stats['misses'] += 1
+                return None
+            
+            self.stats['hits'] += 1
+            self._frequency[key] += 1
+            self._models.move_to_end(key)
+            return model
+    
+    def put(self, key: str, model: Any, size_bytes: int = None) -> bool:
+        """Register a model, evicting others to stay within the byte budget.
+        
+        Returns False, without evicting anything or replacing an existing
+        entry, if the model cannot fit even after evicting every unpinned
+        model; the caller can still use it uncached.
+        """
+        size_bytes = size_bytes if size_bytes is not None else estimate_model_size(model)
+        
+        with self._lock:
+            if key not in self._pinned and size_bytes > self.max_bytes - self._pinned_bytes():
+                self.stats['rejected'] += 1
+                ml_logger.warning(
+                    "Model too large for registry budget",
+                    model_key=key,
+                    size_bytes=size_bytes,
+                    max_bytes=self.max_bytes
+                )
+                return False
+            
+            if key in self._models:
+                self._remove(key)
+            if key not in self._pinned:
+                self._make_room(size_bytes)
+            
+            self._models[key] = model
+            self._sizes[key] = size_bytes
+            self._frequency[key] = 1
+            self.bytes_used += size_bytes
+            return True
+    
+    def remove(self, key: str) -> bool:
+        """Remove a model from the registry."""
+        with self._lock:
+            if key not in self._models:
+                return False
+            self._remove(key)
+            return True
+    
+    def invalidate(self, prefix: str = '') -> int:
+        """Remove every model whose key starts with ``prefix``."""
+        with self._lock:
+            keys = [key for key in self._models if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+    
+    def pin(self, key: str) -> None:
+        """Protect a model key from eviction."""
+        with self._lock:
+            self._pinned.add(key)
+    
+    def unpin(self, key: str) -> None:
+        """Allow a model key to be evicted again."""
+        with self._lock:
+            self._pinned.discard(key)
+            self._make_room(0)
+    
+    def keys(self) -> List[str]:
+        """Registered model keys, least recently used first."""
+        with self._lock:
+            return list(self._models)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._models
+    
+    def __len__(self) -> int:
+        return len(self._models)
+    
+    def _remove(self, key: str) -> None:
+        del self._models[key]
+        self.bytes_used -= self._sizes.pop(key)
+        self._frequency.pop(key, None)
+    
+    def _pinned_bytes(self) -> int:
+        """Bytes held by pinned models, which eviction cannot free."""
+        return sum(size for key, size in self._sizes.items() if key in self._pinned)
+    
+    def _make_room(self, size_bytes: int) -> bool:
+        """Evict unpinned models until ``size_bytes`` fits in the budget."""
+        
+        while self.bytes_used + size_bytes > self.max_bytes:
+            candidates = [key for key in self._models if key not in self._pinned]
+            if not candidates:
+                return size_bytes == 0
+            
+            if self.eviction_policy == 'lfu':
+                # Least frequently used; recency order breaks ties
+                victim = min(candidates, key=lambda key: self._frequency[key])
+            else:
+                victim = candidates[0]
+            
+            self.stats['evictions'] += 1
+            self.stats['evicted_bytes'] += self._sizes[victim]
+            self._remove(victim)
+            
+            ml_logger.debug("Model evicted from registry", model_key=victim)
+        
+        return True
+    
+    def get_stats(self) -> Dict:
+        """Get registry statistics."""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': (self.stats['hits'] / max(lookups, 1)) * 100,
+                'models_loaded': len(self._models),
+                'bytes_used': self.bytes_used,
+                'max_bytes': self.max_bytes,
+                'eviction_policy': self.eviction_policy,
+                'pinned_models': sorted(self._pinned & set(self._models)),
+            }
+
+
+# Global model registry instance
+model_registry = ModelRegistry()
@@ -30,6 +30,7 @@ class PredictionRequest(BaseModel):
     model_type: str = Field("prophet", description="Jenis model (prophet, lstm, ensemble)")
     include_uncertainty: bool = Field(True, description="Include confidence intervals")
     include_features: bool = Field(False, description="Include feature contributions")
+    lookback_days: int = Field(90, ge=30, le=365, description="Hari data historis untuk features")
     
     @validator('commodity_code')
     def validate_commodity_code(cls, v):
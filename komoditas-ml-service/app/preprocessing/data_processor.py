@@ -1,15 +1,20 @@
 """Data preprocessing untuk ML pipeline."""
 
+import asyncio
+
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from pandas.api.types import union_categoricals
 from sklearn.preprocessing import LabelEncoder
 import warnings
 
 from app.config.database import db_manager
 from app.config.logging import ml_logger
 from app.config.settings import settings
+from app.features.matrix import FeatureMatrix
+from app.preprocessing.price_store import price_store
 
 warnings.filterwarnings('ignore')
 
@@ -27,18 +32,25 @@ class DataProcessor:
         region_codes: List[str] = None,
         start_date: str = None,
         end_date: str = None,
-        include_weather: bool = True
+        include_weather: bool = True,
+        chunk_size: int = None
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Load dan preprocess data dari database."""
+        """Load dan preprocess data dari database.
+        
+        With ``chunk_size`` price rows are streamed in typed chunks instead
+        of being read as one object-typed frame.
+        """
         
         try:
-            # Load price data
-            price_data = db_manager.get_price_data(
-                commodity_codes=commodity_codes,
-                region_codes=region_codes,
-                start_date=start_date,
-                end_date=end_date
-            )
+            # Load price data, history from the local store when available
+            if price_store.available:
+                price_data = self._load_price_history(
+                    commodity_codes, region_codes, start_date, end_date, chunk_size
+                )
+            else:
+                price_data = self._query_price_data(
+                    commodity_codes, region_codes, start_date, end_date, chunk_size
+                )
             
             if price_data.empty:
                 raise ValueError("No price data found for given criteria")
@@ -52,32 +64,168 @@ class DataProcessor:
                     end_date=end_date
                 )
             
-            # Preprocess price data
-            price_data = self._preprocess_price_data(price_data)
+            return self._preprocess_loaded_data(price_data, weather_data)
+        
+        except Exception as e:
+            ml_logger.error("Failed to load and preprocess data", error=str(e))
+            raise e
+    
+    async def load_and_preprocess_data_async(
+        self,
+        commodity_codes: List[str] = None,
+        region_codes: List[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        include_weather: bool = True
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Load dan preprocess data tanpa memblokir event loop."""
+        
+        try:
+            # Price and weather queries run concurrently on the async pool
+            loads = [
+                db_manager.get_price_data_async(
+                    commodity_codes=commodity_codes,
+                    region_codes=region_codes,
+                    start_date=start_date,
+                    end_date=end_date
+                )
+            ]
+            if include_weather:
+                loads.append(
+                    db_manager.get_weather_data_async(
+                        region_codes=region_codes,
+                        start_date=start_date,
+                        end_date=end_date
+                    )
+                )
+            
+            columns = await asyncio.gather(*loads)
             
-            # Preprocess weather data
-            if not weather_data.empty:
-                weather_data = self._preprocess_weather_data(weather_data)
+            # Columnar construction, one array per column
+            price_data = pd.DataFrame(columns[0])
+            weather_data = pd.DataFrame(columns[1]) if include_weather else pd.DataFrame()
             
-            # Validate data quality
-            self._validate_data_quality(price_data, weather_data)
+            if price_data.empty:
+                raise ValueError("No price data found for given criteria")
             
-            ml_logger.info(
-                "Data loaded and preprocessed successfully",
-                price_records=len(price_data),
-                weather_records=len(weather_data),
-                date_range={
-                    "start": price_data['date'].min().isoformat() if not price_data.empty else None,
-                    "end": price_data['date'].max().isoformat() if not price_data.empty else None
-                }
+            # CPU-bound pandas preprocessing runs off the event loop
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self._preprocess_loaded_data, price_data, weather_data
             )
             
-            return price_data, weather_data
-            
         except Exception as e:
             ml_logger.error("Failed to load and preprocess data", error=str(e))
             raise e
     
+    def _load_price_history(
+        self,
+        commodity_codes: List[str] = None,
+        region_codes: List[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        chunk_size: int = None
+    ) -> pd.DataFrame:
+        """Pull the requested commodities' delta into the price store, then read from it."""
+        
+        try:
+            price_store.sync(commodity_codes=commodity_codes, chunk_size=chunk_size)
+            return price_store.read(
+                commodity_codes=commodity_codes,
+                region_codes=region_codes,
+                start_date=start_date,
+                end_date=end_date
+            )
+        
+        except Exception as e:
+            ml_logger.warning("Price store unavailable, querying database", error=str(e))
+            return self._query_price_data(
+                commodity_codes, region_codes, start_date, end_date, chunk_size
+            )
+    
+    def _query_price_data(
+        self,
+        commodity_codes: List[str] = None,
+        region_codes: List[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        chunk_size: int = None
+    ) -> pd.DataFrame:
+        """Query price data from PostgreSQL, streamed when ``chunk_size`` is set."""
+        
+        if chunk_size:
+            return self._concat_price_chunks(
+                db_manager.stream_price_data(
+                    commodity_codes=commodity_codes,
+                    region_codes=region_codes,
+                    start_date=start_date,
+                    end_date=end_date,
+                    chunk_size=chunk_size
+                )
+            )
+        
+        return db_manager.get_price_data(
+            commodity_codes=commodity_codes,
+            region_codes=region_codes,
+            start_date=start_date,
+            end_date=end_date
+        )
+    
+    def _concat_price_chunks(self, chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """Combine streamed price chunks, keeping categorical columns compact."""
+        
+        chunks = [chunk for chunk in chunks if not chunk.empty]
+        if not chunks:
+            return pd.DataFrame()
+        
+        column_order = list(chunks[0].columns)
+        categorical_cols = [
+            col for col in column_order
+            if isinstance(chunks[0][col].dtype, pd.CategoricalDtype)
+        ]
+        
+        # Chunks carry their own categories; pd.concat would fall back to object
+        price_data = pd.concat(
+            [chunk.drop(columns=categorical_cols) for chunk in chunks],
+            ignore_index=True
+        )
+        for col in categorical_cols:
+            price_data[col] = union_categoricals(
+                [chunk[col] for chunk in chunks],
+                sort_categories=True
+            )
+        
+        return price_data[column_order]
+    
+    def _preprocess_loaded_data(
+        self,
+        price_data: pd.DataFrame,
+        weather_data: pd.DataFrame
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Preprocess and validate freshly loaded price and weather data."""
+        
+        # Preprocess price data
+        price_data = self._preprocess_price_data(price_data)
+        
+        # Preprocess weather data
+        if not weather_data.empty:
+            weather_data = self._preprocess_weather_data(weather_data)
+        
+        # Validate data quality
+        self._validate_data_quality(price_data, weather_data)
+        
+        ml_logger.info(
+            "Data loaded and preprocessed successfully",
+            price_records=len(price_data),
+            weather_records=len(weather_data),
+            date_range={
+                "start": price_data['date'].min().isoformat() if not price_data.empty else None,
+                "end": price_data['date'].max().isoformat() if not price_data.empty else None
+            }
+        )
+        
+        return price_data, weather_data
+    
     def _preprocess_price_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Preprocess price data."""
         
@@ -138,25 +286,24 @@ class DataProcessor:
     def _remove_price_outliers(self, df: pd.DataFrame) -> pd.DataFrame:
         """Remove price outliers using statistical methods."""
         
-        cleaned_df = pd.DataFrame()
+        group_keys = ['commodity_code', 'region_code']
+        grouped_price = df.groupby(group_keys, sort=False, observed=True)['price']
         
-        for (commodity, region), group in df.groupby(['commodity_code', 'region_code']):
-            # Calculate IQR
-            Q1 = group['price'].quantile(0.25)
-            Q3 = group['price'].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            # Define outlier bounds
-            lower_bound = Q1 - 2.5 * IQR  # More conservative than 1.5
-            upper_bound = Q3 + 2.5 * IQR
-            
-            # Filter outliers
-            group_cleaned = group[
-                (group['price'] >= lower_bound) & 
-                (group['price'] <= upper_bound)
-            ]
-            
-            cleaned_df = pd.concat([cleaned_df, group_cleaned])
+        # Calculate IQR per commodity-region in a single pass
+        Q1 = grouped_price.transform('quantile', 0.25)
+        Q3 = grouped_price.transform('quantile', 0.75)
+        IQR = Q3 - Q1
+        
+        # Define outlier bounds
+        lower_bound = Q1 - 2.5 * IQR  # More conservative than 1.5
+        upper_bound = Q3 + 2.5 * IQR
+        
+        # Filter outliers with one boolean mask (rows with missing keys have
+        # NaN bounds and are dropped, same as groupby)
+        cleaned_df = df[(df['price'] >= lower_bound) & (df['price'] <= upper_bound)]
+        
+        # Keep rows ordered by group, as the per-group concat used to
+        cleaned_df = cleaned_df.sort_values(group_keys, kind='stable')
         
         outliers_removed = len(df) - len(cleaned_df)
         if outliers_removed > 0:
@@ -167,38 +314,81 @@ class DataProcessor:
     def _fill_missing_dates(self, df: pd.DataFrame) -> pd.DataFrame:
         """Fill missing dates and interpolate prices."""
         
-        filled_df = pd.DataFrame()
+        group_keys = ['commodity_code', 'region_code']
         
-        for (commodity, region), group in df.groupby(['commodity_code', 'region_code']):
-            # Create date range
-            date_range = pd.date_range(
-                start=group['date'].min(),
-                end=group['date'].max(),
-                freq='D'
-            )
-            
-            # Reindex to include all dates
-            group_indexed = group.set_index('date').reindex(date_range)
-            
-            # Fill metadata columns
-            group_indexed['commodity_code'] = commodity
-            group_indexed['region_code'] = region
-            
-            # Forward fill then backward fill for categorical columns
-            categorical_cols = ['commodity_name', 'region_name', 'price_type', 'currency']
-            for col in categorical_cols:
-                if col in group_indexed.columns:
-                    group_indexed[col] = group_indexed[col].fillna(method='ffill').fillna(method='bfill')
-            
-            # Interpolate prices
-            group_indexed['price'] = group_indexed['price'].interpolate(method='linear')
-            
-            # Reset index to get date as column
-            group_indexed = group_indexed.reset_index().rename(columns={'index': 'date'})
-            
-            filled_df = pd.concat([filled_df, group_indexed])
+        # Reindex all commodity-region groups to a daily calendar at once
+        filled_df = self._reindex_to_daily_calendar(df, group_keys)
+        
+        # Forward fill then backward fill for categorical columns
+        categorical_cols = [
+            col for col in ['commodity_name', 'region_name', 'price_type', 'currency']
+            if col in filled_df.columns
+        ]
+        if categorical_cols:
+            filled_df[categorical_cols] = filled_df.groupby(group_keys, sort=False, observed=True)[categorical_cols].ffill()
+            filled_df[categorical_cols] = filled_df.groupby(group_keys, sort=False, observed=True)[categorical_cols].bfill()
+        
+        # Interpolate prices
+        filled_df['price'] = self._interpolate_by_group(filled_df, group_keys, 'price')
+        
+        return filled_df
+    
+    def _reindex_to_daily_calendar(self, df: pd.DataFrame, group_keys: List[str]) -> pd.DataFrame:
+        """Reindex every group to a continuous daily date range in one pass."""
+        
+        # Per-group calendar bounds, in sorted key order like groupby iteration
+        bounds = df.groupby(group_keys, observed=True)['date'].agg(['min', 'max'])
+        lengths = ((bounds['max'] - bounds['min']) // pd.Timedelta(days=1) + 1).to_numpy(dtype=np.int64)
         
-        return filled_df.reset_index(drop=True)
+        # Build the full (key..., date) index without looping over groups
+        group_starts = np.cumsum(lengths) - lengths
+        day_offsets = np.arange(lengths.sum()) - np.repeat(group_starts, lengths)
+        dates = np.repeat(bounds['min'].to_numpy(), lengths) + day_offsets.astype('timedelta64[D]')
+        
+        full_index = pd.MultiIndex.from_arrays(
+            [np.repeat(bounds.index.get_level_values(key), lengths) for key in group_keys] + [dates],
+            names=group_keys + ['date']
+        )
+        
+        # Reindex once; rows with missing keys are dropped as groupby does
+        filled_df = df.set_index(group_keys + ['date']).reindex(full_index).reset_index()
+        
+        # Keep date as the first column followed by the original column order
+        column_order = ['date'] + [col for col in df.columns if col != 'date']
+        return filled_df[column_order]
+    
+    def _interpolate_by_group(self, df: pd.DataFrame, group_keys: List[str], column: str) -> pd.Series:
+        """Linearly interpolate a column within each group (vectorized).
+        
+        Mirrors ``Series.interpolate(method='linear')`` per group: leading
+        NaNs stay NaN and trailing NaNs take the last valid value.
+        """
+        
+        values = df[column].to_numpy(dtype=float)
+        positions = pd.Series(np.arange(len(df), dtype=float), index=df.index)
+        valid_positions = positions.where(df[column].notna())
+        
+        grouped = valid_positions.groupby([df[key] for key in group_keys], sort=False, observed=True)
+        prev_pos = grouped.ffill().to_numpy()
+        next_pos = grouped.bfill().to_numpy()
+        
+        result = values.copy()
+        missing = np.isnan(values) & ~np.isnan(prev_pos)
+        
+        # Trailing gaps: carry the last valid value forward
+        trailing = missing & np.isnan(next_pos)
+        result[trailing] = values[prev_pos[trailing].astype(np.int64)]
+        
+        # Inner gaps: same formula as np.interp
+        inner = missing & ~trailing
+        x0 = prev_pos[inner]
+        x1 = next_pos[inner]
+        y0 = values[x0.astype(np.int64)]
+        y1 = values[x1.astype(np.int64)]
+        slope = (y1 - y0) / (x1 - x0)
+        result[inner] = slope * (positions.to_numpy()[inner] - x0) + y0
+        
+        return pd.Series(result, index=df.index, name=column)
     
     def _add_price_derivatives(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add derived price features."""
@@ -206,16 +396,16 @@ class DataProcessor:
         # Add price change and percentage change
         df = df.sort_values(['commodity_code', 'region_code', 'date'])
         
-        df['price_change'] = df.groupby(['commodity_code', 'region_code'])['price'].diff()
-        df['price_pct_change'] = df.groupby(['commodity_code', 'region_code'])['price'].pct_change()
+        df['price_change'] = df.groupby(['commodity_code', 'region_code'], observed=True)['price'].diff()
+        df['price_pct_change'] = df.groupby(['commodity_code', 'region_code'], observed=True)['price'].pct_change()
         
         # Add 7-day and 30-day price changes
-        df['price_change_7d'] = df.groupby(['commodity_code', 'region_code'])['price'].diff(7)
-        df['price_change_30d'] = df.groupby(['commodity_code', 'region_code'])['price'].diff(30)
+        df['price_change_7d'] = df.groupby(['commodity_code', 'region_code'], observed=True)['price'].diff(7)
+        df['price_change_30d'] = df.groupby(['commodity_code', 'region_code'], observed=True)['price'].diff(30)
         
         # Add log prices for better model performance
         df['log_price'] = np.log(df['price'])
-        df['log_price_change'] = df.groupby(['commodity_code', 'region_code'])['log_price'].diff()
+        df['log_price_change'] = df.groupby(['commodity_code', 'region_code'], observed=True)['log_price'].diff()
         
         return df
     
@@ -269,36 +459,22 @@ class DataProcessor:
         if df.empty:
             return df
         
-        filled_df = pd.DataFrame()
+        group_keys = ['region_code', 'weather_type']
         
-        for (region, weather_type), group in df.groupby(['region_code', 'weather_type']):
-            # Create date range
-            if not group.empty:
-                date_range = pd.date_range(
-                    start=group['date'].min(),
-                    end=group['date'].max(),
-                    freq='D'
-                )
-                
-                # Reindex to include all dates
-                group_indexed = group.set_index('date').reindex(date_range)
-                
-                # Fill metadata
-                group_indexed['region_code'] = region
-                group_indexed['weather_type'] = weather_type
-                
-                # Interpolate weather values
-                group_indexed['value'] = group_indexed['value'].interpolate(method='linear')
-                
-                # Fill remaining NaNs with median
-                group_indexed['value'] = group_indexed['value'].fillna(group['value'].median())
-                
-                # Reset index
-                group_indexed = group_indexed.reset_index().rename(columns={'index': 'date'})
-                
-                filled_df = pd.concat([filled_df, group_indexed])
-        
-        return filled_df.reset_index(drop=True)
+        # Median of the observed values, before calendar gaps are added
+        observed_median = df.groupby(group_keys, observed=True)['value'].median()
+        
+        # Reindex all region-weather type groups to a daily calendar at once
+        filled_df = self._reindex_to_daily_calendar(df, group_keys)
+        
+        # Interpolate weather values
+        filled_df['value'] = self._interpolate_by_group(filled_df, group_keys, 'value')
+        
+        # Fill remaining NaNs with median
+        group_median = observed_median.reindex(pd.MultiIndex.from_frame(filled_df[group_keys])).to_numpy()
+        filled_df['value'] = filled_df['value'].fillna(pd.Series(group_median, index=filled_df.index))
+        
+        return filled_df
     
     def _validate_data_quality(self, price_data: pd.DataFrame, weather_data: pd.DataFrame) -> None:
         """Validate data quality and log metrics."""
@@ -385,10 +561,7 @@ class DataProcessor:
     ) -> Dict[str, np.ndarray]:
         """Prepare data for ML models."""
         
-        # Copy to avoid modifying original
-        df = df.copy()
-        
-        # Sort by date
+        # Sort by date (a new frame, the original is untouched)
         df = df.sort_values('date')
         
         # Select features
@@ -399,8 +572,8 @@ class DataProcessor:
             feature_cols = [col for col in df.select_dtypes(include=[np.number]).columns 
                           if col not in exclude_cols]
         
-        # Prepare features and target
-        X = df[feature_cols].values
+        # Prepare features (float32 block) and target
+        X = FeatureMatrix.from_frame(df, feature_cols).values
         y = df[target_col].values
         
         # Handle sequence data for LSTM
@@ -0,0 +1,263 @@
+"""Local columnar price store untuk historical price data."""
+
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+    ds = None
+
+from app.config.database import db_manager
+from app.config.logging import ml_logger
+from app.config.settings import settings
+
+
+class PriceStore:
+    """Parquet copy of prices, partitioned by commodity and month.
+    
+    PostgreSQL stays the source of truth. Each commodity keeps an
+    ``updated_at`` watermark, so a sync pulls rows inserted, backfilled,
+    corrected or (in)validated since the previous one. Every month
+    partition holds one version of each row: a sync rewrites the months
+    that received newer versions and leaves the others untouched, so the
+    store grows with the data, not with the number of syncs. Reads return
+    only validated prices.
+    """
+    
+    PARTITION_COLUMNS = ['commodity_code', 'month']
+    
+    # Tracked per row for syncing, not returned by read()
+    SYNC_COLUMNS = ['updated_at', 'is_validated']
+    
+    # Watermark before the first sync of a commodity
+    EPOCH = datetime(1970, 1, 1)
+    
+    def __init__(self, root: str = None, enabled: bool = None):
+        self.root = Path(root or settings.feature_store_path) / 'prices'
+        self.enabled = settings.price_store_enabled if enabled is None else enabled
+        self.state_path = self.root / '_state.json'
+    
+    @property
+    def available(self) -> bool:
+        """Whether the store is enabled and pyarrow is installed."""
+        return self.enabled and pa is not None
+    
+    def get_watermark(self, commodity_code: str) -> Optional[datetime]:
+        """Get the newest ``updated_at`` stored for a commodity."""
+        state = self._read_state()
+        if not state or commodity_code not in state['watermarks']:
+            return None
+        
+        return datetime.fromisoformat(state['watermarks'][commodity_code])
+    
+    def sync(self, commodity_codes: List[str] = None, chunk_size: int = None) -> int:
+        """Merge rows changed since each commodity's watermark; returns rows written.
+        
+        Only ``commodity_codes`` (all supported commodities by default) are
+        synced. Rows are re-read from a trailing overlap before the
+        watermark, which covers transactions that committed after a newer
+        ``updated_at`` had already been synced; rows whose stored version
+        is as new are skipped.
+        """
+        
+        start_time = time.time()
+        state = self._read_state() or {'watermarks': {}, 'columns': None}
+        overlap = timedelta(seconds=settings.price_store_sync_overlap_seconds)
+        rows_added = 0
+        
+        try:
+            for commodity_code in commodity_codes or settings.supported_commodities:
+                watermark = self.get_watermark(commodity_code)
+                changed_since = watermark - overlap if watermark else self.EPOCH
+                
+                # All price types are stored; read() filters them
+                for chunk in db_manager.stream_price_data(
+                    commodity_codes=[commodity_code],
+                    price_type=None,
+                    chunk_size=chunk_size,
+                    changed_since=changed_since
+                ):
+                    if chunk.empty:
+                        continue
+                    
+                    rows_added += self._write_chunk(chunk)
+                    state['columns'] = [col for col in chunk.columns if col not in self.SYNC_COLUMNS]
+                    
+                    chunk_watermark = chunk['updated_at'].max().to_pydatetime()
+                    watermark = max(watermark, chunk_watermark) if watermark else chunk_watermark
+                
+                # Watermark moves only after every chunk is on disk
+                if watermark:
+                    state['watermarks'][commodity_code] = watermark.isoformat()
+                    self._write_state(state)
+            
+            ml_logger.info(
+                "Price store synced",
+                commodity_count=len(commodity_codes or settings.supported_commodities),
+                rows_added=rows_added,
+                duration_ms=(time.time() - start_time) * 1000
+            )
+            
+            return rows_added
+        
+        except Exception as e:
+            ml_logger.error("Failed to sync price store", error=str(e))
+            raise e
+    
+    def read(
+        self,
+        commodity_codes: List[str] = None,
+        region_codes: List[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        price_type: str = "KONSUMEN"
+    ) -> pd.DataFrame:
+        """Read stored prices with partition pruning and predicate pushdown."""
+        
+        state = self._read_state()
+        if not state:
+            return pd.DataFrame()
+        
+        dataset = ds.dataset(
+            str(self.root),
+            format='parquet',
+            partitioning=ds.partitioning(
+                pa.schema([('commodity_code', pa.string()), ('month', pa.string())]),
+                flavor='hive'
+            )
+        )
+        table = dataset.to_table(
+            filter=self._build_filter(commodity_codes, region_codes, start_date, end_date, price_type)
+        )
+        
+        df = table.to_pandas()
+        
+        # A sync running concurrently can briefly leave two versions of a
+        # row; keep the newest, then drop rows that are not (or no longer)
+        # validated
+        df = df.sort_values('updated_at', kind='stable').drop_duplicates('id', keep='last')
+        df = df[df['is_validated'].astype(bool)]
+        df = df[[col for col in state['columns'] if col in df.columns]]
+        
+        return df.sort_values('date', kind='stable').reset_index(drop=True)
+    
+    def _build_filter(
+        self,
+        commodity_codes: List[str] = None,
+        region_codes: List[str] = None,
+        start_date: str = None,
+        end_date: str = None,
+        price_type: str = None
+    ):
+        """Build the dataset filter; partition fields prune files, the rest row groups."""
+        
+        conditions = []
+        
+        if commodity_codes:
+            conditions.append(ds.field('commodity_code').isin(commodity_codes))
+        
+        if region_codes:
+            conditions.append(ds.field('region_code').isin(region_codes))
+        
+        if start_date:
+            start = pd.Timestamp(start_date)
+            conditions.append(ds.field('month') >= start.strftime('%Y-%m'))
+            conditions.append(ds.field('date') >= start.to_pydatetime())
+        
+        if end_date:
+            end = pd.Timestamp(end_date)
+            conditions.append(ds.field('month') <= end.strftime('%Y-%m'))
+            conditions.append(ds.field('date') <= end.to_pydatetime())
+        
+        if price_type:
+            conditions.append(ds.field('price_type') == price_type)
+        
+        if not conditions:
+            return None
+        
+        expression = conditions[0]
+        for condition in conditions[1:]:
+            expression = expression & condition
+        
+        return expression
+    
+    def _write_chunk(self, chunk: pd.DataFrame) -> int:
+        """Merge one chunk into its commodity/month partitions; returns rows written.
+        
+        Each touched partition is rewritten as a single file holding the
+        newest version of every row, then its previous files are removed.
+        """
+        
+        chunk = chunk.assign(
+            commodity_code=chunk['commodity_code'].astype(str),
+            month=chunk['date'].dt.strftime('%Y-%m')
+        )
+        rows_written = 0
+        
+        for (commodity_code, month), rows in chunk.groupby(self.PARTITION_COLUMNS, sort=False):
+            partition = self.root / f'commodity_code={commodity_code}' / f'month={month}'
+            old_files = sorted(partition.glob('*.parquet'))
+            merged = rows
+            
+            if old_files:
+                stored = ds.dataset([str(path) for path in old_files], format='parquet').to_table().to_pandas()
+                stored = stored.assign(commodity_code=commodity_code, month=month)
+                
+                # Skip versions already stored, e.g. re-read from the overlap
+                stored_updated_at = rows['id'].map(stored.set_index('id')['updated_at'])
+                rows = rows[stored_updated_at.isna().to_numpy() | (rows['updated_at'] > stored_updated_at).to_numpy()]
+                if rows.empty:
+                    continue
+                
+                merged = pd.concat([stored[~stored['id'].isin(rows['id'])], rows], ignore_index=True)
+                # Keep dictionary-encoded columns consistent across partitions
+                merged = merged.astype({col: 'category' for col in rows.select_dtypes('category').columns})
+            
+            ds.write_dataset(
+                pa.Table.from_pandas(merged, preserve_index=False),
+                str(self.root),
+                format='parquet',
+                partitioning=self.PARTITION_COLUMNS,
+                partitioning_flavor='hive',
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior='overwrite_or_ignore'
+            )
+            for path in old_files:
+                path.unlink()
+            
+            rows_written += len(rows)
+        
+        return rows_written
+    
+    def _read_state(self) -> Optional[Dict]:
+        """Load watermarks and column order, None before the first sync."""
+        if not self.state_path.exists():
+            return None
+        
+        with open(self.state_path, 'r') as f:
+            return json.load(f)
+    
+    def _write_state(self, state: Dict) -> None:
+        """Atomically persist the watermarks and column order."""
+        
+        self.root.mkdir(parents=True, exist_ok=True)
+        state = {**state, 'updated_at': datetime.now().isoformat()}
+        
+        temp_path = self.state_path.with_suffix('.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+
+
+# Global price store instance
+price_store = PriceStore()
@@ -0,0 +1,31 @@
+-- Unique key untuk prediction upserts (DatabaseManager.save_predictions(upsert=True))
+--
+-- Jalankan sekali setelah tabel predictions dibuat oleh backend (Prisma):
+--   psql "$DATABASE_URL" -f docker/postgres/migrations/001_predictions_upsert_key.sql
+--
+-- National predictions have region_id NULL; NULLS NOT DISTINCT (PostgreSQL 15+)
+-- makes them share one key instead of piling up duplicates.
+
+BEGIN;
+
+-- Keep only the newest row per key; the window treats NULL region_id as one group
+DELETE FROM predictions
+WHERE ctid IN (
+    SELECT ctid
+    FROM (
+        SELECT
+            ctid,
+            row_number() OVER (
+                PARTITION BY commodity_id, region_id, prediction_date, algorithm
+                ORDER BY created_at DESC, ctid DESC
+            ) AS version
+        FROM predictions
+    ) ranked
+    WHERE version > 1
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS predictions_upsert_key
+    ON predictions (commodity_id, region_id, prediction_date, algorithm)
+    NULLS NOT DISTINCT;
+
+COMMIT;
@@ -0,0 +1,78 @@
+"""Benchmarks untuk geographic anomaly scoring.
+
+Run with: pytest tests/benchmarks -m slow -s --no-cov
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.spatial.distance import pdist
+
+from app.models.anomaly_detection import GeographicAnomalyDetector
+
+
+def _national_prices(n_regions: int = 38, days: int = 365, seed: int = 0) -> pd.DataFrame:
+    """Daily prices of one commodity across ``n_regions`` provinces."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start='2024-01-01', periods=days, freq='D')
+    
+    return pd.DataFrame({
+        'date': np.tile(dates.values, n_regions),
+        'commodity_code': 'BERAS',
+        'region_code': np.repeat([f'{i:02d}' for i in range(n_regions)], days),
+        'price': (
+            12000 + np.repeat(rng.normal(0, 800, n_regions), days)
+            + rng.normal(0, 150, n_regions * days)
+            + np.where(rng.random(n_regions * days) < 0.02, 5000, 0)
+        )
+    })
+
+
+@pytest.mark.slow
+class TestGeographicAnomalyBenchmark:
+    """Scoring benchmark untuk GeographicAnomalyDetector at national scale."""
+    
+    def test_scoring_38_provinces_365_days(self):
+        """All outliers are scored in one pass; timings are printed, not asserted."""
+        detector = GeographicAnomalyDetector(eps=0.3)
+        df = _national_prices()
+        detector.fit(df)
+        
+        features = detector._prepare_features(df)
+        X = detector.scaler.transform(features[detector.feature_columns])
+        labels = detector.dbscan.fit_predict(X)
+        outliers = X[labels == -1]
+        
+        start = time.perf_counter()
+        max_distance = detector._max_pairwise_distance(X)
+        scores = detector._calculate_geographic_anomaly_scores(outliers, X[labels != -1], max_distance)
+        scoring_ms = (time.perf_counter() - start) * 1000
+        
+        # The legacy path ran pdist over every row for each outlier; time it on a subset
+        subset = X[:5000]
+        start = time.perf_counter()
+        pdist(subset).max()
+        legacy_row_ms = (time.perf_counter() - start) * 1000
+        
+        print(
+            f"geographic scoring rows={len(X)} outliers={len(outliers)} "
+            f"time={scoring_ms:8.1f} ms; legacy pdist per outlier (5000 rows)={legacy_row_ms:8.1f} ms"
+        )
+        
+        assert len(scores) == len(outliers) > 0
+    
+    def test_detect_anomalies_38_provinces_365_days(self):
+        """End-to-end detection at national scale."""
+        detector = GeographicAnomalyDetector(eps=0.3)
+        df = _national_prices()
+        detector.fit(df)
+        
+        start = time.perf_counter()
+        anomalies = detector.detect_anomalies(df, sensitivity=0.01)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        print(f"geographic detect_anomalies rows={len(df)} anomalies={len(anomalies)} time={elapsed_ms:8.1f} ms")
+        
+        assert anomalies
@@ -0,0 +1,74 @@
+"""Benchmarks untuk PredictionService.batch_predict.
+
+Run with: pytest tests/benchmarks -m slow -s --no-cov
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pytest
+
+
+def _legacy_batch_predict(service, requests: list, max_workers: int = 5) -> list:
+    """Reference thread pool implementation with one event loop per item."""
+    
+    def predict_single(request):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(service.predict_price(**request))
+        finally:
+            loop.close()
+    
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(predict_single, req) for req in requests]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return results
+
+
+def _batch_requests(n_requests: int) -> list:
+    """Requests across 12 commodities and three horizons."""
+    return [
+        {
+            'commodity_code': f'KOM{i % 12}',
+            'region_code': '31',
+            'horizon_days': [7, 14, 30][i % 3],
+            'model_type': 'prophet'
+        }
+        for i in range(n_requests)
+    ]
+
+
+@pytest.mark.slow
+class TestBatchPredictBenchmark:
+    """Batch prediction throughput benchmarks."""
+    
+    BATCH_SIZES = [10, 100, 1000]
+    LOAD_DELAY_S = 0.005
+    
+    def test_batch_predict_scaling(self, stub_prediction_service):
+        """Native asyncio batching versus the thread pool path."""
+        
+        for n_requests in self.BATCH_SIZES:
+            requests = _batch_requests(n_requests)
+            
+            legacy_service = stub_prediction_service(load_delay_s=self.LOAD_DELAY_S)
+            start = time.perf_counter()
+            _legacy_batch_predict(legacy_service, requests)
+            legacy_ms = (time.perf_counter() - start) * 1000
+            
+            service = stub_prediction_service(load_delay_s=self.LOAD_DELAY_S)
+            start = time.perf_counter()
+            result = asyncio.run(service.batch_predict(requests))
+            asyncio_ms = (time.perf_counter() - start) * 1000
+            
+            print(
+                f"batch_predict requests={n_requests:>5} "
+                f"threads={legacy_ms:8.1f} ms asyncio={asyncio_ms:8.1f} ms "
+                f"data_loads={service.data_loads:>4} (legacy {legacy_service.data_loads})"
+            )
+            
+            assert result['successful_predictions'] == n_requests
+            assert service.data_loads <= legacy_service.data_loads
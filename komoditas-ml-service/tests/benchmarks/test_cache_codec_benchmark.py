@@ -0,0 +1,91 @@
+"""Benchmarks untuk Redis cache serialization.
+
+Run with: pytest tests/benchmarks -m slow -s --no-cov
+"""
+
+import json
+import pickle
+import time
+
+import pytest
+import numpy as np
+
+from app.config.codec import CacheCodec
+
+
+def _legacy_encode(value, use_pickle: bool = False) -> bytes:
+    """Reference encoder used by set_cache before the codec."""
+    if use_pickle:
+        return pickle.dumps(value)
+    return json.dumps(value, default=str).encode('utf-8')
+
+
+def _legacy_decode(data: bytes):
+    """Reference decoder used by get_cache before the codec."""
+    try:
+        return json.loads(data.decode('utf-8'))
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return pickle.loads(data)
+
+
+def _prediction_payload(horizon_days: int = 30) -> dict:
+    """Prediction result shaped like PredictionService output."""
+    return {
+        'commodity_code': 'BERAS',
+        'region_code': '31',
+        'model_type': 'prophet',
+        'model_version': '2024-01-01T00:00:00',
+        'predictions': [
+            {'date': f'2024-02-{day:02d}', 'predicted_price': 15000.0 + day, 'lower_bound': 14000.0, 'upper_bound': 16000.0}
+            for day in range(1, horizon_days + 1)
+        ],
+        'current_price': 15000.0,
+        'confidence': 0.9
+    }
+
+
+def _feature_payload(n_features: int = 120) -> dict:
+    """Feature summary shaped like the trainer's feature store entry."""
+    rng = np.random.default_rng(0)
+    return {
+        'features_summary': {
+            f'feature_{i}': {'mean': float(rng.normal()), 'std': float(rng.random()), 'missing': 0}
+            for i in range(n_features)
+        },
+        'feature_columns': [f'feature_{i}' for i in range(n_features)],
+        'data_shape': [365, n_features],
+        'cache_date': '2024-01-01T00:00:00'
+    }
+
+
+def _time_per_op(fn, repeats: int = 2000) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('name, payload, use_pickle', [
+    ('prediction', _prediction_payload(), False),
+    ('features', _feature_payload(), True),
+])
+def test_codec_vs_legacy(name, payload, use_pickle):
+    """Compare encode/decode cost of the legacy path and the codec."""
+    codec = CacheCodec()
+    
+    legacy_data = _legacy_encode(payload, use_pickle)
+    codec_data = codec.encode(payload)
+    
+    timings = {
+        'legacy_encode': _time_per_op(lambda: _legacy_encode(payload, use_pickle)),
+        'legacy_decode': _time_per_op(lambda: _legacy_decode(legacy_data)),
+        'codec_encode': _time_per_op(lambda: codec.encode(payload)),
+        'codec_decode': _time_per_op(lambda: codec.decode(codec_data)),
+    }
+    
+    print(f"\n{name}: legacy {len(legacy_data)} B, codec {len(codec_data)} B")
+    for label, micros in timings.items():
+        print(f"  {label:>14}: {micros:8.1f} us")
+    
+    assert codec.decode(codec_data) == _legacy_decode(legacy_data)
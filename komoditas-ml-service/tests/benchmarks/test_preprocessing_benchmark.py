@@ -0,0 +1,63 @@
+"""Benchmarks untuk data preprocessing hot paths.
+
+Run with: pytest tests/benchmarks -m slow -s --no-cov
+"""
+
+import time
+
+import pytest
+import pandas as pd
+
+from app.preprocessing.data_processor import DataProcessor
+
+
+def _best_of(func, *args, repeats: int = 3) -> float:
+    """Return the best wall-clock time in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+@pytest.mark.slow
+class TestPreprocessingBenchmark:
+    """Scaling benchmarks untuk DataProcessor."""
+    
+    GROUP_COUNTS = [10, 100, 1000, 5000]
+    
+    def test_remove_price_outliers_scaling(self, multi_region_price_data):
+        """Outlier removal should scale roughly linearly with group count."""
+        processor = DataProcessor()
+        timings = {}
+        
+        for n_groups in self.GROUP_COUNTS:
+            df = multi_region_price_data(n_groups, days=60)
+            timings[n_groups] = _best_of(processor._remove_price_outliers, df)
+            print(
+                f"_remove_price_outliers groups={n_groups:>5} rows={len(df):>7} "
+                f"time={timings[n_groups]:8.1f} ms"
+            )
+        
+        # 500x more groups must not cost anywhere near 500x^2 (quadratic concat)
+        growth = timings[5000] / max(timings[10], 1e-3)
+        assert growth < 500 * 5
+    
+    def test_fill_missing_dates_scaling(self, multi_region_price_data):
+        """Calendar gap filling should scale roughly linearly with group count."""
+        processor = DataProcessor()
+        timings = {}
+        
+        for n_groups in self.GROUP_COUNTS:
+            df = multi_region_price_data(n_groups, days=60)
+            df = df.drop(df.sample(frac=0.3, random_state=0).index)
+            df = df.sort_values(['commodity_code', 'region_code', 'date'])
+            timings[n_groups] = _best_of(processor._fill_missing_dates, df)
+            print(
+                f"_fill_missing_dates groups={n_groups:>5} rows={len(df):>7} "
+                f"time={timings[n_groups]:8.1f} ms"
+            )
+        
+        growth = timings[5000] / max(timings[10], 1e-3)
+        assert growth < 500 * 5
@@ -1,4 +1,277 @@
 """Test configuration dan fixtures untuk ML service tests."""
 
 import asyncio
-import pytest\nimport pandas as pd\nimport numpy as np\nfrom datetime import datetime, timedelta\nfrom typing import Generator, AsyncGenerator\n\n# Test fixtures\n@pytest.fixture(scope=\"session\")\ndef event_loop():\n    \"\"\"Create an instance of the default event loop for the test session.\"\"\"\n    loop = asyncio.get_event_loop_policy().new_event_loop()\n    yield loop\n    loop.close()\n\n\n@pytest.fixture\ndef sample_price_data() -> pd.DataFrame:\n    \"\"\"Sample price data for testing.\"\"\"\n    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')\n    np.random.seed(42)\n    \n    data = []\n    for date in dates:\n        # Generate price with trend and seasonality\n        day_of_year = date.timetuple().tm_yday\n        trend = 12000 + (day_of_year * 5)  # Increasing trend\n        seasonal = 500 * np.sin(2 * np.pi * day_of_year / 365)  # Yearly seasonality\n        noise = np.random.normal(0, 200)  # Random noise\n        price = trend + seasonal + noise\n        \n        data.append({\n            'date': date,\n            'commodity_code': 'BERAS',\n            'region_code': '31',\n            'commodity_name': 'Beras',\n            'region_name': 'DKI Jakarta',\n            'price': max(price, 8000),  # Minimum price\n            'currency': 'IDR',\n            'price_type': 'KONSUMEN',\n            'source': 'TEST'\n        })\n    \n    return pd.DataFrame(data)\n\n\n@pytest.fixture\ndef sample_weather_data() -> pd.DataFrame:\n    \"\"\"Sample weather data for testing.\"\"\"\n    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')\n    np.random.seed(42)\n    \n    data = []\n    for date in dates:\n        day_of_year = date.timetuple().tm_yday\n        \n        # Temperature (tropical pattern)\n        temp = 27 + 3 * np.sin(2 * np.pi * day_of_year / 365) + np.random.normal(0, 2)\n        \n        # Rainfall (wet/dry season)\n        rainfall_base = 5 if (day_of_year >= 300 or day_of_year <= 90) else 1\n        rainfall = np.random.exponential(rainfall_base)\n        \n        # Humidity\n        humidity = 70 + 10 * np.sin(2 * np.pi * day_of_year / 365) + np.random.normal(0, 5)\n        \n        for weather_type, value in [('TEMPERATURE', temp), ('RAINFALL', rainfall), ('HUMIDITY', humidity)]:\n            data.append({\n                'date': date,\n                'region_code': '31',\n                'region_name': 'DKI Jakarta',\n                'weather_type': weather_type,\n                'value': max(value, 0),\n                'unit': '°C' if weather_type == 'TEMPERATURE' else ('mm' if weather_type == 'RAINFALL' else '%'),\n                'source': 'TEST'\n            })\n    \n    return pd.DataFrame(data)\n\n\n@pytest.fixture\ndef sample_features_data(sample_price_data: pd.DataFrame) -> pd.DataFrame:\n    \"\"\"Sample engineered features data for testing.\"\"\"\n    df = sample_price_data.copy()\n    \n    # Add some basic features\n    df['price_ma_7'] = df['price'].rolling(7).mean()\n    df['price_ma_30'] = df['price'].rolling(30).mean()\n    df['price_pct_change'] = df['price'].pct_change()\n    df['volatility_7d'] = df['price_pct_change'].rolling(7).std()\n    \n    # Add seasonal features\n    df['month'] = df['date'].dt.month\n    df['day_of_week'] = df['date'].dt.dayofweek\n    df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)\n    \n    return df.dropna()\n\n\n@pytest.fixture\ndef mock_prediction_request() -> dict:\n    \"\"\"Mock prediction request for testing.\"\"\"\n    return {\n        \"commodity_code\": \"BERAS\",\n        \"region_code\": \"31\",\n        \"horizon_days\": 7,\n        \"model_type\": \"prophet\",\n        \"include_uncertainty\": True,\n        \"include_features\": False\n    }\n\n\n@pytest.fixture\ndef mock_anomaly_request() -> dict:\n    \"\"\"Mock anomaly detection request for testing.\"\"\"\n    return {\n        \"commodity_code\": \"BERAS\",\n        \"region_code\": \"31\",\n        \"detection_type\": \"both\",\n        \"sensitivity\": 0.1,\n        \"time_window_days\": 30\n    }\n\n\n@pytest.fixture\ndef mock_batch_request(mock_prediction_request: dict) -> dict:\n    \"\"\"Mock batch prediction request for testing.\"\"\"\n    return {\n        \"requests\": [\n            mock_prediction_request,\n            {\n                **mock_prediction_request,\n                \"commodity_code\": \"JAGUNG\",\n                \"horizon_days\": 14\n            }\n        ]\n    }\n\n\n@pytest.fixture\ndef mock_correlation_request() -> dict:\n    \"\"\"Mock correlation analysis request for testing.\"\"\"\n    return {\n        \"commodity_code\": \"BERAS\",\n        \"region_codes\": [\"31\"],\n        \"weather_types\": [\"TEMPERATURE\", \"RAINFALL\"],\n        \"time_window_days\": 365,\n        \"correlation_method\": \"pearson\"\n    }\n\n\n# Test markers\npytestmark = pytest.mark.asyncio\n
\ No newline at end of file
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Generator, AsyncGenerator
+
+# Test fixtures
+@pytest.fixture(scope="session")
+def event_loop():
+    """Create an instance of the default event loop for the test session."""
+    loop = asyncio.get_event_loop_policy().new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(autouse=True)
+def disable_price_store(monkeypatch):
+    """Keep tests off the on-disk price store unless they build their own."""
+    from app.preprocessing.price_store import price_store
+    
+    monkeypatch.setattr(price_store, 'enabled', False)
+
+
+@pytest.fixture
+def sample_price_data() -> pd.DataFrame:
+    """Sample price data for testing."""
+    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')
+    np.random.seed(42)
+    
+    data = []
+    for date in dates:
+        # Generate price with trend and seasonality
+        day_of_year = date.timetuple().tm_yday
+        trend = 12000 + (day_of_year * 5)  # Increasing trend
+        seasonal = 500 * np.sin(2 * np.pi * day_of_year / 365)  # Yearly seasonality
+        noise = np.random.normal(0, 200)  # Random noise
+        price = trend + seasonal + noise
+        
+        data.append({
+            'date': date,
+            'commodity_code': 'BERAS',
+            'region_code': '31',
+            'commodity_name': 'Beras',
+            'region_name': 'DKI Jakarta',
+            'price': max(price, 8000),  # Minimum price
+            'currency': 'IDR',
+            'price_type': 'KONSUMEN',
+            'source': 'TEST'
+        })
+    
+    return pd.DataFrame(data)
+
+
+@pytest.fixture
+def sample_weather_data() -> pd.DataFrame:
+    """Sample weather data for testing."""
+    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='D')
+    np.random.seed(42)
+    
+    data = []
+    for date in dates:
+        day_of_year = date.timetuple().tm_yday
+        
+        # Temperature (tropical pattern)
+        temp = 27 + 3 * np.sin(2 * np.pi * day_of_year / 365) + np.random.normal(0, 2)
+        
+        # Rainfall (wet/dry season)
+        rainfall_base = 5 if (day_of_year >= 300 or day_of_year <= 90) else 1
+        rainfall = np.random.exponential(rainfall_base)
+        
+        # Humidity
+        humidity = 70 + 10 * np.sin(2 * np.pi * day_of_year / 365) + np.random.normal(0, 5)
+        
+        for weather_type, value in [('TEMPERATURE', temp), ('RAINFALL', rainfall), ('HUMIDITY', humidity)]:
+            data.append({
+                'date': date,
+                'region_code': '31',
+                'region_name': 'DKI Jakarta',
+                'weather_type': weather_type,
+                'value': max(value, 0),
+                'unit': '°C' if weather_type == 'TEMPERATURE' else ('mm' if weather_type == 'RAINFALL' else '%'),
+                'source': 'TEST'
+            })
+    
+    return pd.DataFrame(data)
+
+
+@pytest.fixture
+def multi_region_price_data():
+    """Factory for shuffled price data across many commodity-region groups."""
+    
+    def _make(n_groups: int, days: int = 60, seed: int = 0) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        dates = pd.date_range(start='2024-01-01', periods=days, freq='D')
+        
+        df = pd.DataFrame({
+            'date': np.tile(dates.values, n_groups),
+            'commodity_code': np.repeat([f'KOM{i % 12}' for i in range(n_groups)], days),
+            'region_code': np.repeat([f'{i:02d}' for i in range(n_groups)], days),
+            'commodity_name': 'Komoditas',
+            'region_name': 'Region',
+            'price': rng.lognormal(9.5, 0.3, n_groups * days),
+            'currency': 'IDR',
+            'price_type': 'KONSUMEN',
+        })
+        
+        # Inject a few extreme spikes so outlier filters have work to do
+        spikes = rng.choice(len(df), size=max(n_groups // 2, 1), replace=False)
+        df.loc[spikes, 'price'] *= 10
+        
+        return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+    
+    return _make
+
+
+@pytest.fixture
+def sample_features_data(sample_price_data: pd.DataFrame) -> pd.DataFrame:
+    """Sample engineered features data for testing."""
+    df = sample_price_data.copy()
+    
+    # Add some basic features
+    df['price_ma_7'] = df['price'].rolling(7).mean()
+    df['price_ma_30'] = df['price'].rolling(30).mean()
+    df['price_pct_change'] = df['price'].pct_change()
+    df['volatility_7d'] = df['price_pct_change'].rolling(7).std()
+    
+    # Add seasonal features
+    df['month'] = df['date'].dt.month
+    df['day_of_week'] = df['date'].dt.dayofweek
+    df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
+    
+    return df.dropna()
+
+
+@pytest.fixture
+def mock_prediction_request() -> dict:
+    """Mock prediction request for testing."""
+    return {
+        "commodity_code": "BERAS",
+        "region_code": "31",
+        "horizon_days": 7,
+        "model_type": "prophet",
+        "include_uncertainty": True,
+        "include_features": False
+    }
+
+
+@pytest.fixture
+def mock_anomaly_request() -> dict:
+    """Mock anomaly detection request for testing."""
+    return {
+        "commodity_code": "BERAS",
+        "region_code": "31",
+        "detection_type": "both",
+        "sensitivity": 0.1,
+        "time_window_days": 30
+    }
+
+
+@pytest.fixture
+def mock_batch_request(mock_prediction_request: dict) -> dict:
+    """Mock batch prediction request for testing."""
+    return {
+        "requests": [
+            mock_prediction_request,
+            {
+                **mock_prediction_request,
+                "commodity_code": "JAGUNG",
+                "horizon_days": 14
+            }
+        ]
+    }
+
+
+class StubForecaster:
+    """Forecaster double returning a flat forecast from the last price."""
+    
+    model_metadata = {'training_date': '2024-01-01T00:00:00'}
+    
+    def __init__(self, last_price: float = 15000.0):
+        self.last_price = last_price
+    
+    def predict(self, data: pd.DataFrame = None, horizon_days: int = 7, include_history: bool = False) -> pd.DataFrame:
+        """Return ``horizon_days`` rows at the last price."""
+        dates = pd.date_range(start=datetime(2024, 1, 1), periods=horizon_days, freq='D')
+        return pd.DataFrame({'ds': dates, 'yhat': np.full(horizon_days, self.last_price)})
+
+
+@pytest.fixture
+def stub_prediction_service(monkeypatch, sample_price_data: pd.DataFrame):
+    """Factory for a PredictionService with database, Redis and models stubbed.
+    
+    ``load_delay_s`` simulates database latency per data load. The
+    returned service counts data loads in ``service.data_loads``.
+    """
+    from app.config.database import db_manager
+    from app.config.metadata import metadata_cache
+    from app.config.redis import redis_manager
+    from app.inference.predictor import PredictionService
+    
+    async def _no_cache(*args, **kwargs):
+        return None
+    
+    monkeypatch.setattr(redis_manager, 'get_cached_predictions', _no_cache)
+    monkeypatch.setattr(redis_manager, 'cache_model_predictions', _no_cache)
+    monkeypatch.setattr(redis_manager, 'cache_many_model_predictions', _no_cache)
+    
+    async def _no_cached_predictions(model_keys):
+        return {}
+    
+    monkeypatch.setattr(redis_manager, 'get_many_cached_predictions', _no_cached_predictions)
+    
+    async def get_commodities_info_async():
+        return {
+            'code': np.array(['BERAS', 'JAGUNG'] + [f'KOM{i}' for i in range(12)], dtype=object),
+            'name': np.array(['Beras', 'Jagung'] + [f'Komoditas {i}' for i in range(12)], dtype=object)
+        }
+    
+    async def get_regions_info_async():
+        return {
+            'code': np.array(['31', '32'], dtype=object),
+            'name': np.array(['DKI Jakarta', 'Jawa Barat'], dtype=object)
+        }
+    
+    monkeypatch.setattr(db_manager, 'get_commodities_info_async', get_commodities_info_async)
+    monkeypatch.setattr(db_manager, 'get_regions_info_async', get_regions_info_async)
+    metadata_cache.invalidate()
+    
+    def _make(load_delay_s: float = 0.0) -> PredictionService:
+        service = PredictionService()
+        service.inference_workers = 0
+        service.data_loads = 0
+        
+        async def load_and_preprocess_data_async(commodity_codes=None, region_codes=None, start_date=None, **kwargs):
+            service.data_loads += 1
+            if load_delay_s:
+                await asyncio.sleep(load_delay_s)
+            if commodity_codes == ['MISSING']:
+                return pd.DataFrame(), pd.DataFrame()
+            
+            # Sample prices shifted to end today
+            price_data = sample_price_data.assign(
+                commodity_code=commodity_codes[0],
+                date=sample_price_data['date'] + (pd.Timestamp.now().normalize() - sample_price_data['date'].max())
+            )
+            if start_date is not None:
+                price_data = price_data[price_data['date'] >= pd.Timestamp(start_date)]
+            return price_data, pd.DataFrame()
+        
+        async def load_model(model_type, commodity_code, region_code=None):
+            return StubForecaster()
+        
+        service.data_processor.load_and_preprocess_data_async = load_and_preprocess_data_async
+        service.feature_engineer.engineer_features = lambda price_data, **kwargs: price_data.set_index('date')
+        service._load_model = load_model
+        return service
+    
+    return _make
+
+
+@pytest.fixture
+def mock_correlation_request() -> dict:
+    """Mock correlation analysis request for testing."""
+    return {
+        "commodity_code": "BERAS",
+        "region_codes": ["31"],
+        "weather_types": ["TEMPERATURE", "RAINFALL"],
+        "time_window_days": 365,
+        "correlation_method": "pearson"
+    }
+
+
+# Test markers
+pytestmark = pytest.mark.asyncio
@@ -0,0 +1,165 @@
+"""Unit tests untuk anomaly detection models."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.models.anomaly_detection import GeographicAnomalyDetector, TemporalAnomalyDetector
+
+
+@pytest.fixture
+def spiky_price_data(sample_price_data: pd.DataFrame) -> pd.DataFrame:
+    """Two regions of daily prices with injected spikes and drops."""
+    regions = []
+    for region_code, scale in [('31', 1.0), ('32', 1.2)]:
+        region = sample_price_data.assign(region_code=region_code, price=sample_price_data['price'] * scale)
+        region.loc[region.index[100::45], 'price'] *= 1.4
+        region.loc[region.index[120::60], 'price'] *= 0.7
+        regions.append(region)
+    return pd.concat(regions, ignore_index=True)
+
+
+def _row_reference(row: pd.Series, anomaly_score: float) -> dict:
+    """Per-row classification the vectorized path must reproduce."""
+    price_change = row['price_pct_change']
+    if price_change > 0.1:
+        anomaly_type = 'price_spike'
+    elif price_change < -0.1:
+        anomaly_type = 'price_drop'
+    else:
+        anomaly_type = 'volatility_anomaly'
+    
+    score_abs = abs(anomaly_score)
+    severity = (
+        'critical' if score_abs > 0.8 else 'high' if score_abs > 0.6
+        else 'medium' if score_abs > 0.4 else 'low'
+    )
+    
+    parts = []
+    if abs(price_change * 100) > 10:
+        parts.append(f"Harga {'naik' if price_change > 0 else 'turun'} {abs(price_change * 100):.1f}% dalam sehari")
+    if row['volatility_7d'] * 100 > 5:
+        parts.append(f"Volatilitas tinggi ({row['volatility_7d'] * 100:.1f}%) dalam 7 hari terakhir")
+    if score_abs > 0.6:
+        parts.append("Pola harga sangat tidak biasa dibanding historical")
+    
+    expected = row['price_ma_30'] if not pd.isna(row['price_ma_30']) else row['price']
+    return {
+        'anomaly_type': anomaly_type,
+        'severity': severity,
+        'explanation': "; ".join(parts) or "Anomali terdeteksi dalam pola temporal harga",
+        'expected_price': float(expected),
+        'anomaly_score': float(score_abs)
+    }
+
+
+class TestTemporalAnomalyDetector:
+    """Test suite untuk vectorized TemporalAnomalyDetector."""
+    
+    def test_matches_row_by_row_classification(self, spiky_price_data: pd.DataFrame):
+        """Array-based results equal the per-row rules for every flagged row."""
+        detector = TemporalAnomalyDetector(n_estimators=20)
+        detector.fit(spiky_price_data)
+        
+        anomalies = detector.detect_anomalies(spiky_price_data, sensitivity=0.1)
+        
+        features = detector._prepare_features(spiky_price_data)
+        complete = features[features[detector.feature_columns].notna().all(axis=1)]
+        scores = detector.isolation_forest.decision_function(
+            detector.scaler.transform(complete[detector.feature_columns])
+        )
+        flagged = (detector.isolation_forest.predict(
+            detector.scaler.transform(complete[detector.feature_columns])
+        ) == -1) | (scores <= np.percentile(scores, 10))
+        
+        assert len(anomalies) == flagged.sum() > 0
+        for anomaly, (_, row), score in zip(anomalies, complete[flagged].iterrows(), scores[flagged]):
+            assert anomaly['date'] == row['date']
+            assert anomaly['region_code'] == row['region_code']
+            assert anomaly['actual_price'] == pytest.approx(row['price'])
+            assert anomaly['detection_method'] == 'temporal_isolation_forest'
+            reference = _row_reference(row, score)
+            assert anomaly['expected_price'] == pytest.approx(reference.pop('expected_price'))
+            assert anomaly['anomaly_score'] == pytest.approx(reference.pop('anomaly_score'))
+            assert {field: anomaly[field] for field in reference} == reference
+    
+    def test_injected_spikes_are_classified(self, spiky_price_data: pd.DataFrame):
+        """Large one-day moves come back as spikes or drops."""
+        detector = TemporalAnomalyDetector(n_estimators=20)
+        detector.fit(spiky_price_data)
+        
+        anomalies = detector.detect_anomalies(spiky_price_data, sensitivity=0.1)
+        
+        assert {'price_spike', 'price_drop'} <= {anomaly['anomaly_type'] for anomaly in anomalies}
+
+
+class TestGeographicAnomalyDetector:
+    """Test suite untuk vectorized GeographicAnomalyDetector scoring."""
+    
+    def test_max_pairwise_distance_is_exact(self):
+        """The pruned diameter equals the brute-force pdist maximum."""
+        from scipy.spatial.distance import pdist
+        
+        rng = np.random.default_rng(0)
+        for scale in [np.ones(6), np.array([1, 8, 1, 1, 3, 1])]:
+            X = rng.normal(size=(600, 6)) * scale
+            assert GeographicAnomalyDetector._max_pairwise_distance(X, chunk_size=64) == pytest.approx(pdist(X).max())
+        
+        assert GeographicAnomalyDetector._max_pairwise_distance(np.zeros((1, 6))) == 1.0
+    
+    def test_scores_match_per_row_distance(self):
+        """Every outlier's score is its nearest cluster distance over the diameter."""
+        from scipy.spatial.distance import pdist
+        
+        rng = np.random.default_rng(1)
+        X = rng.normal(size=(300, 6))
+        labels = np.where(rng.random(300) < 0.1, -1, 0)
+        detector = GeographicAnomalyDetector()
+        
+        scores = detector._calculate_geographic_anomaly_scores(
+            X[labels == -1], X[labels != -1], detector._max_pairwise_distance(X)
+        )
+        
+        expected = [
+            min(np.linalg.norm(X[labels != -1] - point, axis=1).min() / pdist(X).max(), 1.0)
+            for point in X[labels == -1]
+        ]
+        np.testing.assert_allclose(scores, expected)
+    
+    def test_no_cluster_points_scores_maximum(self):
+        """Without any clustered rows every outlier gets the maximum score."""
+        detector = GeographicAnomalyDetector()
+        scores = detector._calculate_geographic_anomaly_scores(np.ones((3, 6)), np.empty((0, 6)), 2.0)
+        
+        np.testing.assert_array_equal(scores, np.ones(3))
+    
+    def test_missing_code_columns_raise_up_front(self, spiky_price_data: pd.DataFrame):
+        """Scoring needs commodity and region codes and says which are missing."""
+        detector = GeographicAnomalyDetector()
+        detector.fit(spiky_price_data)
+        
+        with pytest.raises(ValueError, match=r"\['commodity_code', 'region_code'\]"):
+            detector.detect_anomalies(spiky_price_data.drop(columns=['commodity_code', 'region_code']))
+        
+        anomalies = detector.detect_anomalies(spiky_price_data, sensitivity=0.0)
+        assert all(anomaly['region_code'] in {'31', '32'} for anomaly in anomalies)
+
+
+class TestAnomalyFeatureColumns:
+    """Test suite untuk the engineered columns anomaly training requests."""
+    
+    @pytest.mark.parametrize('model_types', [['anomaly'], ['prophet', 'anomaly'], []])
+    def test_same_columns_for_any_model_types(self, spiky_price_data: pd.DataFrame, model_types):
+        """The temporal detector trains on the same columns as with the full feature set."""
+        from app.features.engineering import FeatureEngineer
+        from app.training.trainer import ModelTrainer
+        
+        trainer = ModelTrainer.__new__(ModelTrainer)
+        
+        def temporal_columns(columns):
+            features = FeatureEngineer().engineer_features(spiky_price_data, columns=columns).reset_index()
+            detector = TemporalAnomalyDetector()
+            detector.fit(features)
+            return detector.feature_columns
+        
+        assert temporal_columns(trainer._feature_columns(model_types)) == temporal_columns(None)
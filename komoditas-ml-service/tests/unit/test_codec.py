@@ -0,0 +1,105 @@
+"""Unit tests untuk Redis cache codec."""
+
+import json
+import pickle
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from app.config import codec as codec_module
+from app.config.codec import CacheCodec
+
+
+@pytest.fixture
+def codec() -> CacheCodec:
+    """Codec with compression disabled unless a test opts in."""
+    return CacheCodec(compression_threshold=10 ** 9)
+
+
+class TestCacheCodec:
+    """Test suite untuk CacheCodec."""
+    
+    def test_dict_round_trip_has_v1_header(self, codec):
+        """Documents round-trip and carry the versioned format header."""
+        value = {'commodity_code': 'BERAS', 'predictions': [{'price': 15000.5}], 'confidence': None}
+        
+        data = codec.encode(value, key='predictions:pred:BERAS')
+        
+        assert data[0] & CacheCodec.VERSION_MASK == CacheCodec.VERSION_1
+        assert data[0] & CacheCodec.FORMAT_MASK in (
+            CacheCodec.FORMAT_ORJSON, CacheCodec.FORMAT_MSGPACK, CacheCodec.FORMAT_JSON
+        )
+        assert codec.decode(data) == value
+    
+    def test_numpy_values_are_serialized(self, codec):
+        """NumPy scalars and arrays in feature summaries encode natively."""
+        value = {'mean': np.float64(1.5), 'count': np.int64(3), 'values': np.arange(3)}
+        
+        decoded = codec.decode(codec.encode(value))
+        
+        assert decoded == {'mean': 1.5, 'count': 3, 'values': [0, 1, 2]}
+    
+    def test_pickle_payloads_skip_json(self, codec, monkeypatch):
+        """Pickled entries decode from the header without a failed JSON attempt."""
+        value = {'shape': (10, 3), 'created': pd.Timestamp('2024-01-01')}
+        data = codec.encode(value, use_pickle=True)
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("JSON decode attempted")
+        
+        monkeypatch.setattr(codec_module.json, 'loads', fail)
+        
+        assert data[0] & CacheCodec.FORMAT_MASK == CacheCodec.FORMAT_PICKLE
+        assert codec.decode(data) == value
+    
+    def test_dataframe_round_trip(self, codec, sample_price_data):
+        """DataFrames round-trip (Arrow IPC when pyarrow is installed)."""
+        df = sample_price_data.head(50)
+        
+        data = codec.encode(df)
+        expected_format = CacheCodec.FORMAT_ARROW if codec_module.pa is not None else CacheCodec.FORMAT_PICKLE
+        
+        assert data[0] & CacheCodec.FORMAT_MASK == expected_format
+        pd.testing.assert_frame_equal(codec.decode(data), df)
+    
+    @pytest.mark.parametrize('legacy', [
+        json.dumps({'price': 1, 'date': '2024-01-01'}).encode('utf-8'),
+        pickle.dumps({'price': 1, 'date': '2024-01-01'}),
+    ])
+    def test_legacy_payloads_still_decode(self, codec, legacy):
+        """Entries written before the codec remain readable."""
+        assert codec.decode(legacy) == {'price': 1, 'date': '2024-01-01'}
+    
+    @pytest.mark.skipif(codec_module.zstandard is None, reason="zstandard not installed")
+    def test_large_payloads_are_compressed(self):
+        """Payloads above the threshold are zstd compressed."""
+        codec = CacheCodec(compression_threshold=1024)
+        value = {'values': list(range(5000))}
+        
+        large = codec.encode(value)
+        small = codec.encode({'values': [1]})
+        
+        assert large[0] & CacheCodec.FLAG_ZSTD
+        assert not small[0] & CacheCodec.FLAG_ZSTD
+        assert codec.decode(large) == value
+    
+    def test_unknown_format_raises(self, codec):
+        """A v1 header with an unknown format id is rejected."""
+        with pytest.raises(ValueError):
+            codec.decode(bytes([CacheCodec.VERSION_1 | 0x0F]) + b'{}')
+    
+    def test_stats_are_recorded_per_namespace(self, codec):
+        """Encode and decode timings accumulate per key namespace."""
+        data = codec.encode({'a': 1}, key='predictions:pred:BERAS:31')
+        codec.decode(data, key='predictions:pred:BERAS:31')
+        codec.decode(data, key='predictions:pred:JAGUNG:31')
+        codec.encode({'a': 1}, key='features:BERAS')
+        
+        stats = codec.get_stats()
+        
+        assert stats['predictions']['encode_count'] == 1
+        assert stats['predictions']['decode_count'] == 2
+        assert stats['predictions']['decode_bytes'] == 2 * len(data)
+        assert stats['predictions']['avg_decode_ms'] >= 0
+        assert stats['features']['encode_count'] == 1
@@ -0,0 +1,157 @@
+"""Unit tests untuk data preprocessing module."""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from app.preprocessing.data_processor import DataProcessor
+
+
+def _legacy_remove_price_outliers(df: pd.DataFrame) -> pd.DataFrame:
+    """Reference per-group implementation used before vectorization."""
+    cleaned_df = pd.DataFrame()
+    
+    for (commodity, region), group in df.groupby(['commodity_code', 'region_code']):
+        Q1 = group['price'].quantile(0.25)
+        Q3 = group['price'].quantile(0.75)
+        IQR = Q3 - Q1
+        
+        group_cleaned = group[
+            (group['price'] >= Q1 - 2.5 * IQR) &
+            (group['price'] <= Q3 + 2.5 * IQR)
+        ]
+        
+        cleaned_df = pd.concat([cleaned_df, group_cleaned])
+    
+    return cleaned_df.reset_index(drop=True)
+
+
+class TestRemovePriceOutliers:
+    """Test suite untuk DataProcessor._remove_price_outliers."""
+    
+    @pytest.mark.parametrize("n_groups", [1, 7, 40])
+    def test_matches_per_group_implementation(self, multi_region_price_data, n_groups: int):
+        """Vectorized filter should match the per-group loop exactly."""
+        df = multi_region_price_data(n_groups)
+        
+        expected = _legacy_remove_price_outliers(df)
+        result = DataProcessor()._remove_price_outliers(df)
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_removes_injected_spikes(self, sample_price_data: pd.DataFrame):
+        """Extreme prices should be dropped and normal prices kept."""
+        df = sample_price_data.copy()
+        df.loc[10, 'price'] = df['price'].median() * 20
+        
+        result = DataProcessor()._remove_price_outliers(df)
+        
+        assert len(result) == len(df) - 1
+        assert result['price'].max() < df.loc[10, 'price']
+    
+    def test_rows_with_missing_keys_are_dropped(self, sample_price_data: pd.DataFrame):
+        """Rows without a region code are excluded like groupby does."""
+        df = sample_price_data.copy()
+        df.loc[:4, 'region_code'] = None
+        
+        expected = _legacy_remove_price_outliers(df)
+        result = DataProcessor()._remove_price_outliers(df)
+        
+        pd.testing.assert_frame_equal(result, expected)
+        assert result['region_code'].notna().all()
+
+
+def _legacy_fill_missing_dates(df: pd.DataFrame) -> pd.DataFrame:
+    """Reference per-group calendar reindexing for prices."""
+    filled_df = pd.DataFrame()
+    
+    for (commodity, region), group in df.groupby(['commodity_code', 'region_code']):
+        date_range = pd.date_range(start=group['date'].min(), end=group['date'].max(), freq='D')
+        group_indexed = group.set_index('date').reindex(date_range)
+        group_indexed['commodity_code'] = commodity
+        group_indexed['region_code'] = region
+        
+        for col in ['commodity_name', 'region_name', 'price_type', 'currency']:
+            if col in group_indexed.columns:
+                group_indexed[col] = group_indexed[col].fillna(method='ffill').fillna(method='bfill')
+        
+        group_indexed['price'] = group_indexed['price'].interpolate(method='linear')
+        group_indexed = group_indexed.reset_index().rename(columns={'index': 'date'})
+        filled_df = pd.concat([filled_df, group_indexed])
+    
+    return filled_df.reset_index(drop=True)
+
+
+def _legacy_fill_missing_weather(df: pd.DataFrame) -> pd.DataFrame:
+    """Reference per-group calendar reindexing for weather."""
+    filled_df = pd.DataFrame()
+    
+    for (region, weather_type), group in df.groupby(['region_code', 'weather_type']):
+        date_range = pd.date_range(start=group['date'].min(), end=group['date'].max(), freq='D')
+        group_indexed = group.set_index('date').reindex(date_range)
+        group_indexed['region_code'] = region
+        group_indexed['weather_type'] = weather_type
+        group_indexed['value'] = group_indexed['value'].interpolate(method='linear')
+        group_indexed['value'] = group_indexed['value'].fillna(group['value'].median())
+        group_indexed = group_indexed.reset_index().rename(columns={'index': 'date'})
+        filled_df = pd.concat([filled_df, group_indexed])
+    
+    return filled_df.reset_index(drop=True)
+
+
+def _drop_random_days(df: pd.DataFrame, frac: float, seed: int = 0) -> pd.DataFrame:
+    """Remove a random subset of rows to create calendar gaps."""
+    return df.drop(df.sample(frac=frac, random_state=seed).index)
+
+
+class TestFillMissingDates:
+    """Test suite untuk calendar gap filling."""
+    
+    @pytest.mark.parametrize("n_groups", [1, 5, 30])
+    def test_prices_match_per_group_implementation(self, multi_region_price_data, n_groups: int):
+        """Single-pass reindexing should match the per-group loop."""
+        df = _drop_random_days(multi_region_price_data(n_groups), frac=0.3)
+        df = df.sort_values(['commodity_code', 'region_code', 'date'])
+        df.loc[df.sample(frac=0.05, random_state=1).index, 'price'] = np.nan
+        
+        expected = _legacy_fill_missing_dates(df)
+        result = DataProcessor()._fill_missing_dates(df)
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_prices_are_continuous_and_interpolated(self, sample_price_data: pd.DataFrame):
+        """Every group should have one row per day with no missing price."""
+        df = sample_price_data.drop(index=[5, 6, 7]).reset_index(drop=True)
+        
+        result = DataProcessor()._fill_missing_dates(df)
+        
+        assert len(result) == len(sample_price_data)
+        assert result['price'].notna().all()
+        assert result['date'].diff().dropna().eq(pd.Timedelta(days=1)).all()
+        assert (result['commodity_name'] == 'Beras').all()
+    
+    def test_weather_matches_per_group_implementation(self, sample_weather_data: pd.DataFrame):
+        """Weather gap filling should match the per-group loop."""
+        second_region = sample_weather_data.assign(region_code='32', region_name='Jawa Barat')
+        df = pd.concat([sample_weather_data, second_region], ignore_index=True)
+        df = _drop_random_days(df, frac=0.2)
+        df.loc[df.sample(frac=0.05, random_state=2).index, 'value'] = np.nan
+        df = df.sort_values(['region_code', 'weather_type', 'date'])
+        
+        expected = _legacy_fill_missing_weather(df)
+        result = DataProcessor()._fill_missing_weather(df)
+        
+        pd.testing.assert_frame_equal(result, expected)
+        assert result['value'].notna().all()
+    
+    def test_weather_leading_gap_takes_observed_median(self, sample_weather_data: pd.DataFrame):
+        """Leading gaps get the median of observed values, not of the interpolated calendar."""
+        df = sample_weather_data[sample_weather_data['weather_type'] == 'RAINFALL'].head(10).copy()
+        df = df.drop(index=df.index[[4, 5, 6]])
+        df['value'] = [np.nan, np.nan, 100.0, 100.0, 50.0, 300.0, 320.0]
+        
+        expected = _legacy_fill_missing_weather(df)
+        result = DataProcessor()._fill_missing_weather(df)
+        
+        pd.testing.assert_frame_equal(result, expected)
+        assert result['value'].iloc[0] == 100.0
@@ -0,0 +1,187 @@
+"""Unit tests untuk columnar async database access."""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from app.config.database import DatabaseManager, db_manager
+from app.preprocessing.data_processor import DataProcessor
+
+
+class TestRowsToColumns:
+    """Test suite untuk DatabaseManager._rows_to_columns."""
+    
+    def test_columns_are_typed_arrays(self):
+        """Dates, numerics and text map to NumPy dtypes pandas expects."""
+        rows = [
+            (1, date(2024, 1, 1), Decimal('15000.50'), 'BERAS'),
+            (2, date(2024, 1, 2), None, 'JAGUNG'),
+        ]
+        
+        columns = DatabaseManager._rows_to_columns(
+            ['id', 'date', 'price', 'commodity_code'],
+            rows,
+            date_columns=['date'],
+            float_columns=['price']
+        )
+        
+        assert columns['id'].dtype == np.int64
+        assert columns['date'].dtype == np.dtype('datetime64[ns]')
+        assert columns['price'].dtype == np.float64
+        assert columns['price'][0] == 15000.5
+        assert np.isnan(columns['price'][1])
+        assert columns['commodity_code'].dtype == object
+        assert columns['commodity_code'].tolist() == ['BERAS', 'JAGUNG']
+    
+    def test_empty_result_keeps_columns(self):
+        """An empty result still yields every column."""
+        columns = DatabaseManager._rows_to_columns(
+            ['date', 'price'], [], date_columns=['date'], float_columns=['price']
+        )
+        
+        assert set(columns) == {'date', 'price'}
+        assert all(len(values) == 0 for values in columns.values())
+
+
+class TestAsyncLoading:
+    """Test suite untuk DataProcessor.load_and_preprocess_data_async."""
+    
+    @pytest.mark.asyncio
+    async def test_matches_sync_loading(self, monkeypatch, sample_price_data, sample_weather_data):
+        """Async columnar loading gives the same frames as the sync path."""
+        
+        def to_columns(df: pd.DataFrame) -> dict:
+            return {column: df[column].to_numpy() for column in df.columns}
+        
+        async def get_price_data_async(**kwargs):
+            return to_columns(sample_price_data)
+        
+        async def get_weather_data_async(**kwargs):
+            return to_columns(sample_weather_data)
+        
+        monkeypatch.setattr(db_manager, 'get_price_data', lambda **kwargs: sample_price_data.copy())
+        monkeypatch.setattr(db_manager, 'get_weather_data', lambda **kwargs: sample_weather_data.copy())
+        monkeypatch.setattr(db_manager, 'get_price_data_async', get_price_data_async)
+        monkeypatch.setattr(db_manager, 'get_weather_data_async', get_weather_data_async)
+        
+        processor = DataProcessor()
+        expected_price, expected_weather = processor.load_and_preprocess_data(commodity_codes=['BERAS'])
+        price_data, weather_data = await processor.load_and_preprocess_data_async(commodity_codes=['BERAS'])
+        
+        pd.testing.assert_frame_equal(price_data, expected_price)
+        pd.testing.assert_frame_equal(weather_data, expected_weather)
+    
+    @pytest.mark.asyncio
+    async def test_empty_price_data_raises(self, monkeypatch):
+        """Missing price data is reported like the sync path."""
+        
+        async def no_rows(**kwargs):
+            return {'date': np.array([], dtype='datetime64[ns]'), 'price': np.array([])}
+        
+        monkeypatch.setattr(db_manager, 'get_price_data_async', no_rows)
+        
+        with pytest.raises(ValueError):
+            await DataProcessor().load_and_preprocess_data_async(include_weather=False)
+
+
+class FakeStreamingResult:
+    """Result double yielding rows in ``yield_per`` partitions."""
+    
+    def __init__(self, keys: list, rows: list, yield_per: int):
+        self._keys = keys
+        self._rows = rows
+        self._yield_per = yield_per
+    
+    def keys(self):
+        return self._keys
+    
+    def partitions(self):
+        for start in range(0, len(self._rows), self._yield_per):
+            yield self._rows[start:start + self._yield_per]
+
+
+class FakeStreamingConnection:
+    """Connection double recording execution options."""
+    
+    def __init__(self, keys: list, rows: list):
+        self.keys = keys
+        self.rows = rows
+        self.options = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def execution_options(self, **options):
+        self.options.update(options)
+        return self
+    
+    def execute(self, statement, params=None):
+        return FakeStreamingResult(self.keys, self.rows, self.options['yield_per'])
+
+
+class TestPriceStreaming:
+    """Test suite untuk chunked price streaming."""
+    
+    @staticmethod
+    def _to_rows(df: pd.DataFrame) -> tuple:
+        """Convert a frame to DB-style keys and row tuples."""
+        df = df.assign(date=df['date'].dt.date)
+        return list(df.columns), list(df.itertuples(index=False, name=None))
+    
+    def test_price_chunk_uses_categorical_columns(self):
+        """Code and name columns are categorical, numerics stay numeric."""
+        rows = [
+            (1, date(2024, 1, 1), Decimal('15000'), 'BERAS', 'Beras', '31', -6.2, 106.8),
+            (2, date(2024, 1, 2), Decimal('15100'), 'BERAS', 'Beras', '31', -6.2, 106.8),
+        ]
+        keys = ['id', 'date', 'price', 'commodity_code', 'commodity_name', 'region_code', 'latitude', 'longitude']
+        
+        chunk = DatabaseManager._price_chunk(keys, rows)
+        
+        for column in ['commodity_code', 'commodity_name', 'region_code']:
+            assert isinstance(chunk[column].dtype, pd.CategoricalDtype)
+        assert chunk['price'].dtype == np.float64
+        assert chunk['latitude'].dtype == np.float64
+        assert chunk['date'].dtype == np.dtype('datetime64[ns]')
+    
+    def test_stream_uses_server_side_cursor(self, monkeypatch, sample_price_data):
+        """Rows are fetched through a streaming cursor in chunk_size batches."""
+        keys, rows = self._to_rows(sample_price_data)
+        conn = FakeStreamingConnection(keys, rows)
+        
+        manager = DatabaseManager.__new__(DatabaseManager)
+        manager.sync_engine = type('FakeEngine', (), {'connect': lambda self: conn})()
+        
+        chunks = list(manager.stream_price_data(commodity_codes=['BERAS'], chunk_size=100))
+        
+        assert conn.options == {'stream_results': True, 'yield_per': 100}
+        assert [len(chunk) for chunk in chunks] == [100, 100, 100, 66]
+        assert isinstance(chunks[0]['commodity_code'].dtype, pd.CategoricalDtype)
+    
+    def test_streamed_load_matches_in_memory_load(self, monkeypatch, multi_region_price_data):
+        """Streaming gives the same preprocessed data as the single-frame load."""
+        price_data = multi_region_price_data(n_groups=6, days=40).assign(source='TEST')
+        keys, rows = self._to_rows(price_data)
+        
+        def stream_price_data(chunk_size=None, **kwargs):
+            for start in range(0, len(rows), chunk_size):
+                yield DatabaseManager._price_chunk(keys, rows[start:start + chunk_size])
+        
+        monkeypatch.setattr(db_manager, 'get_price_data', lambda **kwargs: price_data.copy())
+        monkeypatch.setattr(db_manager, 'stream_price_data', stream_price_data)
+        
+        processor = DataProcessor()
+        expected, _ = processor.load_and_preprocess_data(include_weather=False)
+        streamed, _ = processor.load_and_preprocess_data(include_weather=False, chunk_size=50)
+        
+        assert isinstance(streamed['region_code'].dtype, pd.CategoricalDtype)
+        
+        categorical_cols = streamed.select_dtypes(include='category').columns
+        streamed = streamed.astype({col: object for col in categorical_cols})
+        pd.testing.assert_frame_equal(streamed, expected)
@@ -0,0 +1,114 @@
+"""Unit tests untuk float32 FeatureMatrix layout."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.features.engineering import FeatureEngineer
+from app.features.matrix import FeatureMatrix
+from app.models.lstm_model import LSTMForecaster
+from app.preprocessing.data_processor import DataProcessor
+
+
+@pytest.fixture
+def feature_frame(sample_price_data: pd.DataFrame) -> pd.DataFrame:
+    """Engineered features of one commodity-region series."""
+    return FeatureEngineer().engineer_features(sample_price_data)
+
+
+class TestFeatureMatrix:
+    """Test suite untuk FeatureMatrix packing and sharing."""
+    
+    def test_packs_numeric_columns_into_float32_block(self, feature_frame: pd.DataFrame):
+        """Numeric columns form one contiguous block, codes become categoricals."""
+        matrix = FeatureMatrix.from_frame(feature_frame)
+        
+        assert matrix.values.dtype == np.float32
+        assert matrix.values.flags['C_CONTIGUOUS']
+        assert matrix.shape == (len(feature_frame), len(matrix.columns))
+        assert 'price' in matrix.column_index and 'commodity_code' not in matrix.column_index
+        assert isinstance(matrix.metadata['commodity_code'].dtype, pd.CategoricalDtype)
+        np.testing.assert_allclose(matrix.column('ma_7'), feature_frame['ma_7'], rtol=1e-6)
+    
+    def test_halves_memory(self, feature_frame: pd.DataFrame):
+        """The block and metadata take at most half of the float64 frame."""
+        matrix = FeatureMatrix.from_frame(feature_frame)
+        
+        assert matrix.nbytes <= feature_frame.memory_usage(index=False, deep=True).sum() / 2
+    
+    def test_to_frame_round_trip(self, feature_frame: pd.DataFrame):
+        """Unpacking gives back the same columns at float32 precision."""
+        frame = FeatureMatrix.from_frame(feature_frame).to_frame()
+        
+        assert set(frame.columns) == set(feature_frame.columns) - {'date'}
+        pd.testing.assert_frame_equal(
+            frame[['price', 'rsi']], feature_frame[['price', 'rsi']].astype(np.float32)
+        )
+        assert (frame['region_code'] == feature_frame['region_code']).all()
+    
+    def test_fillna_median(self):
+        """Missing values take the median of their column."""
+        df = pd.DataFrame({'a': [1.0, np.nan, 3.0, 10.0], 'b': [np.nan, 2.0, 2.0, 4.0]})
+        
+        matrix = FeatureMatrix.from_frame(df).fillna_median()
+        
+        np.testing.assert_array_equal(matrix.column('a'), [1.0, 3.0, 3.0, 10.0])
+        np.testing.assert_array_equal(matrix.column('b'), [2.0, 2.0, 2.0, 4.0])
+    
+    def test_share_and_attach(self, feature_frame: pd.DataFrame):
+        """An attached matrix views the shared block without copying."""
+        matrix = FeatureMatrix.from_frame(feature_frame, ['price', 'ma_7'])
+        
+        with matrix.share() as shared:
+            handle = shared.handle
+            with FeatureMatrix.attach(handle) as attached:
+                np.testing.assert_array_equal(attached.values, matrix.values)
+                shared.values[0, 0] = -1.0
+                assert attached.column('price')[0] == -1.0
+                assert list(attached.metadata.columns) == list(matrix.metadata.columns)
+        
+        # The owner unlinks the block on close
+        with pytest.raises(FileNotFoundError):
+            FeatureMatrix.attach(handle)
+
+
+class TestFeatureMatrixConsumers:
+    """Test suite untuk float32 model inputs."""
+    
+    def test_engineer_features_as_matrix(self, sample_price_data: pd.DataFrame):
+        """engineer_features can return the packed layout directly."""
+        matrix = FeatureEngineer().engineer_features(sample_price_data, columns=['rsi'], as_matrix=True)
+        
+        assert isinstance(matrix, FeatureMatrix)
+        assert 'rsi' in matrix.column_index and matrix.values.dtype == np.float32
+    
+    def test_prepare_model_data_is_float32(self, feature_frame: pd.DataFrame):
+        """DataProcessor model inputs come from the float32 block."""
+        data = DataProcessor().prepare_model_data(feature_frame.reset_index(), feature_cols=['ma_7', 'rsi'])
+        
+        assert data['X'].dtype == np.float32
+        np.testing.assert_allclose(data['X'][:, 0], feature_frame['ma_7'], rtol=1e-6)
+    
+    def test_lstm_prepare_data_matches_median_fill(self, feature_frame: pd.DataFrame):
+        """LSTM features equal the per-column median fill, in float32."""
+        forecaster = LSTMForecaster.__new__(LSTMForecaster)
+        feature_cols = ['ma_30', 'rsi', 'volatility_30']
+        df = feature_frame.reset_index()
+        df.loc[::7, 'ma_30'] = np.nan
+        df.loc[:29, 'volatility_30'] = np.nan
+        
+        X, y, _ = forecaster.prepare_data(df, feature_cols=feature_cols)
+        
+        expected = df[feature_cols].fillna(df[feature_cols].median())
+        assert X.dtype == np.float32 and y.shape == (len(df), 1)
+        np.testing.assert_allclose(X, expected.to_numpy(), rtol=1e-6)
+        assert df['ma_30'].isna().any()
+    
+    def test_lstm_auto_selection_keeps_input_layout(self, feature_frame: pd.DataFrame):
+        """Auto-selected LSTM inputs leave out features newer than the input layout."""
+        forecaster = LSTMForecaster.__new__(LSTMForecaster)
+        
+        _, _, feature_cols = forecaster.prepare_data(feature_frame.reset_index())
+        
+        assert 'price_trend_7d' in feature_frame.columns
+        assert not set(LSTMForecaster.EXCLUDED_FEATURES) & set(feature_cols)
@@ -0,0 +1,105 @@
+"""Unit tests untuk declarative feature registry."""
+
+import pandas as pd
+import pytest
+
+from app.features.engineering import FeatureEngineer
+from app.features.registry import FeatureRegistry, feature_registry
+from app.models.prophet_model import ProphetForecaster
+
+
+class TestFeatureRegistry:
+    """Test suite untuk FeatureRegistry dependency resolution."""
+    
+    def test_resolve_returns_dependency_closure_in_order(self):
+        """Requesting one feature pulls in exactly what it is computed from."""
+        assert feature_registry.resolve(['bb_position']) == ['bb_middle', 'bb_upper', 'bb_lower', 'bb_position']
+        assert feature_registry.resolve(['is_dry_season']) == ['month', 'is_dry_season']
+    
+    def test_resolve_expands_patterns(self):
+        """fnmatch patterns select every matching feature."""
+        assert feature_registry.resolve(['price_lag_*']) == [
+            'price_lag_1', 'price_lag_2', 'price_lag_3', 'price_lag_7', 'price_lag_14', 'price_lag_30'
+        ]
+    
+    def test_history_window_covers_closure(self):
+        """The history requirement is the longest window in the closure."""
+        assert feature_registry.history_window(['macd_histogram']) == 35
+        assert feature_registry.history_window(['price_zscore_90', 'rsi']) == 90
+        assert feature_registry.history_window([]) == 0
+    
+    def test_unregistered_dependency_raises(self):
+        """Dependencies must be registered before the features using them."""
+        registry = FeatureRegistry()
+        
+        with pytest.raises(ValueError):
+            registry.register('ratio', 'custom', lambda df, w: df['a'] / df['b'], depends_on=('b',))
+
+
+class TestLazyFeatureEngineering:
+    """Test suite untuk engineer_features with requested columns."""
+    
+    def test_requested_columns_match_full_output(
+        self,
+        sample_price_data: pd.DataFrame,
+        sample_weather_data: pd.DataFrame
+    ):
+        """A subset equals the same columns of the full feature frame."""
+        fe = FeatureEngineer()
+        
+        full = fe.engineer_features(sample_price_data, weather_data=sample_weather_data)
+        subset = fe.engineer_features(
+            sample_price_data,
+            weather_data=sample_weather_data,
+            columns=['bb_position', 'volatility_30', 'is_dry_season', 'weather_*']
+        )
+        
+        raw_columns = [col for col in sample_price_data.columns if col != 'date']
+        engineered = [col for col in subset.columns if col not in raw_columns]
+        assert 'bb_position' in engineered and 'weather_temperature_mean_7' in engineered
+        assert not {'bb_middle', 'month', 'returns', 'price_lag_1'} & set(subset.columns)
+        pd.testing.assert_frame_equal(subset, full[list(subset.columns)])
+    
+    def test_skips_unrequested_groups(self, sample_price_data: pd.DataFrame, monkeypatch):
+        """Features outside the closure are never computed."""
+        fe = FeatureEngineer()
+        computed = []
+        
+        original = fe.registry.materialize
+        
+        def spy(df, group, windows=None, names=None):
+            result = original(df, group, windows, names)
+            computed.extend(col for col in result.columns if col not in computed)
+            return result
+        
+        monkeypatch.setattr(fe.registry, 'materialize', spy)
+        fe.engineer_features(sample_price_data, columns=['rsi'])
+        
+        assert 'rsi' in computed
+        assert not any(col.startswith(('price_mean_', 'garch_vol_', 'ma_')) for col in computed)
+    
+    def test_prophet_columns_keep_regressor_selection(
+        self,
+        sample_price_data: pd.DataFrame,
+        sample_weather_data: pd.DataFrame
+    ):
+        """Prophet's regressor candidates are the same with its declared columns."""
+        fe = FeatureEngineer()
+        indicators = ['ma_', 'rsi', 'volatility_', 'momentum_']
+        
+        def regressor_candidates(df: pd.DataFrame) -> list:
+            technical = [col for col in df.columns if any(indicator in col for indicator in indicators)]
+            return (
+                [col for col in df.columns if col.startswith('weather_')] + technical[:10] +
+                [col for col in df.columns if 'season' in col or 'harvest' in col]
+            )
+        
+        full = fe.engineer_features(sample_price_data, weather_data=sample_weather_data)
+        declared = fe.engineer_features(
+            sample_price_data,
+            weather_data=sample_weather_data,
+            columns=ProphetForecaster.FEATURE_COLUMNS
+        )
+        
+        assert regressor_candidates(declared) == regressor_candidates(full)
+        assert len(declared.columns) < len(full.columns) / 2
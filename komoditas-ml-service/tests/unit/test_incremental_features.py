@@ -0,0 +1,145 @@
+"""Unit tests untuk incremental feature engineering."""
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from app.features.engineering import FeatureEngineer
+from app.features.incremental import EMAState, IncrementalFeatureState
+
+
+class TestEMAState:
+    """Test suite untuk the EMA state primitive."""
+    
+    def test_ema_state_matches_pandas(self):
+        """EMA updates should follow pandas adjust=True weighting, gaps included."""
+        values = pd.Series(np.random.default_rng(1).normal(12000, 300, 120))
+        values.iloc[[0, 50, 110]] = np.nan
+        expected = values.ewm(span=12).mean()
+        
+        state = EMAState.from_series(12, values.iloc[:100])
+        results = [state.update(value) for value in values.iloc[100:]]
+        
+        np.testing.assert_allclose(results, expected.iloc[100:].to_numpy())
+
+
+class TestIncrementalFeatures:
+    """Test suite untuk FeatureEngineer incremental mode."""
+    
+    def _split(self, df: pd.DataFrame, n_new: int):
+        return df.iloc[:-n_new], df
+    
+    @pytest.mark.parametrize("n_new", [1, 5])
+    def test_new_rows_match_batch(
+        self,
+        sample_price_data: pd.DataFrame,
+        sample_weather_data: pd.DataFrame,
+        n_new: int
+    ):
+        """Appended rows should match a batch run over the same history."""
+        history, extended = self._split(sample_price_data, n_new)
+        
+        fe = FeatureEngineer()
+        fe.engineer_features(history, sample_weather_data, "BERAS", "31", incremental=True)
+        result = fe.engineer_features(extended, sample_weather_data, "BERAS", "31", incremental=True)
+        
+        expected = FeatureEngineer().engineer_features(extended, sample_weather_data, "BERAS", "31")
+        
+        assert list(result.columns) == list(expected.columns)
+        assert len(result) == len(expected)
+        pd.testing.assert_frame_equal(
+            result.iloc[-n_new:],
+            expected.iloc[-n_new:],
+            check_dtype=False,
+            rtol=1e-6
+        )
+    
+    def test_only_new_rows_are_computed(self, sample_price_data: pd.DataFrame, monkeypatch):
+        """A warm state should not rerun the batch pipeline."""
+        history, extended = self._split(sample_price_data, 1)
+        
+        fe = FeatureEngineer()
+        fe.engineer_features(history, commodity_code="BERAS", region_code="31", incremental=True)
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("batch technical indicators should not run")
+        
+        monkeypatch.setattr(fe, "_add_technical_indicators", fail)
+        result = fe.engineer_features(extended, commodity_code="BERAS", region_code="31", incremental=True)
+        
+        assert result.index.max() == sample_price_data['date'].max()
+    
+    def test_revised_history_falls_back_to_batch(self, sample_price_data: pd.DataFrame):
+        """Changed historical prices should rebuild the state from scratch."""
+        fe = FeatureEngineer()
+        fe.engineer_features(sample_price_data.iloc[:-1], commodity_code="BERAS", incremental=True)
+        
+        revised = sample_price_data.copy()
+        revised.loc[200, 'price'] += 500
+        result = fe.engineer_features(revised, commodity_code="BERAS", incremental=True)
+        expected = FeatureEngineer().engineer_features(revised, commodity_code="BERAS")
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
+    def test_short_history_does_not_keep_state(self, sample_price_data: pd.DataFrame):
+        """Series shorter than the longest window always use the batch path."""
+        fe = FeatureEngineer()
+        short = sample_price_data.iloc[:IncrementalFeatureState.min_history() - 1]
+        
+        fe.engineer_features(short, commodity_code="BERAS", incremental=True)
+        
+        assert fe.incremental_states == {}
+    
+    def test_min_history_follows_registry_windows(self, monkeypatch):
+        """A longer registered feature window raises the incremental threshold."""
+        from app.features.registry import feature_registry
+        
+        assert IncrementalFeatureState.min_history() == feature_registry.history_window(feature_registry.names()) + 1
+        
+        monkeypatch.setattr(feature_registry, "history_window", lambda columns: 180)
+        assert IncrementalFeatureState.min_history() == 181
+    
+    def test_mixed_lookbacks_return_requested_rows(self, sample_price_data: pd.DataFrame):
+        """A short lookback call does not shrink the rows of a later long one."""
+        fe = FeatureEngineer()
+        long_lookback = sample_price_data.iloc[-91:]
+        
+        first = fe.engineer_features(long_lookback, commodity_code="BERAS", region_code="31", incremental=True)
+        short = fe.engineer_features(
+            sample_price_data.iloc[-30:], commodity_code="BERAS", region_code="31", incremental=True
+        )
+        again = fe.engineer_features(long_lookback, commodity_code="BERAS", region_code="31", incremental=True)
+        
+        assert (len(first), len(short), len(again)) == (91, 30, 91)
+        pd.testing.assert_frame_equal(again, first)
+        
+        # A lookback reaching past the cached rows is rebuilt in batch
+        longer = fe.engineer_features(
+            sample_price_data.iloc[-120:], commodity_code="BERAS", region_code="31", incremental=True
+        )
+        assert len(longer) == 120
+    
+    def test_states_are_bounded(self, sample_price_data: pd.DataFrame, monkeypatch):
+        """The least recently used series state is evicted past the limit."""
+        from app.config.settings import settings
+        
+        monkeypatch.setattr(settings, "incremental_feature_max_series", 2)
+        fe = FeatureEngineer()
+        
+        for region_code in ["31", "32", "31", "33"]:
+            fe.engineer_features(
+                sample_price_data.assign(region_code=region_code),
+                commodity_code="BERAS",
+                region_code=region_code,
+                incremental=True
+            )
+        
+        assert list(fe.incremental_states) == [("BERAS", "31"), ("BERAS", "33")]
+    
+    def test_series_are_locked_independently(self):
+        """Each commodity-region series gets its own lock."""
+        fe = FeatureEngineer()
+        
+        with fe._series_lock(("BERAS", "31")):
+            assert fe._series_lock(("BERAS", "32")).acquire(blocking=False)
+            assert not fe._series_lock(("BERAS", "31")).acquire(blocking=False)
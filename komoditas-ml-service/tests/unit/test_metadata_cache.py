@@ -0,0 +1,90 @@
+"""Unit tests untuk commodity dan region metadata cache."""
+
+import pytest
+import numpy as np
+
+from app.config.database import db_manager
+from app.config.metadata import MetadataCache
+
+
+@pytest.fixture
+def metadata_tables(monkeypatch):
+    """Stub the dimension queries and count how often they run."""
+    calls = {'commodities': 0, 'regions': 0}
+    names = {'BERAS': 'Beras'}
+    
+    async def get_commodities_info_async():
+        calls['commodities'] += 1
+        return {
+            'code': np.array(list(names), dtype=object),
+            'name': np.array(list(names.values()), dtype=object)
+        }
+    
+    async def get_regions_info_async():
+        calls['regions'] += 1
+        return {
+            'code': np.array(['31'], dtype=object),
+            'name': np.array(['DKI Jakarta'], dtype=object),
+            'latitude': np.array([-6.2])
+        }
+    
+    monkeypatch.setattr(db_manager, 'get_commodities_info_async', get_commodities_info_async)
+    monkeypatch.setattr(db_manager, 'get_regions_info_async', get_regions_info_async)
+    return calls, names
+
+
+class TestMetadataCache:
+    """Test suite untuk MetadataCache."""
+    
+    @pytest.mark.asyncio
+    async def test_lookups_by_code(self, metadata_tables):
+        """Loaded records resolve by code and unknown codes fall back."""
+        cache = MetadataCache(ttl_seconds=60)
+        await cache.load()
+        
+        assert cache.commodity_name('BERAS') == 'Beras'
+        assert cache.region_name('31') == 'DKI Jakarta'
+        assert cache.get_region('31')['latitude'] == -6.2
+        assert cache.commodity_name('JAGUNG') == 'JAGUNG'
+        assert cache.get_region('99') is None
+    
+    @pytest.mark.asyncio
+    async def test_loaded_once_within_ttl(self, metadata_tables):
+        """Repeated access does not query the database again."""
+        calls, _ = metadata_tables
+        cache = MetadataCache(ttl_seconds=60)
+        
+        for _ in range(5):
+            await cache.ensure_fresh()
+        
+        assert calls == {'commodities': 1, 'regions': 1}
+    
+    @pytest.mark.asyncio
+    async def test_stale_entries_refresh_in_background(self, metadata_tables):
+        """Stale tables are served while a refresh runs."""
+        calls, names = metadata_tables
+        cache = MetadataCache(ttl_seconds=0)
+        await cache.load()
+        names['BERAS'] = 'Beras Medium'
+        
+        await cache.ensure_fresh()
+        assert cache.commodity_name('BERAS') == 'Beras'
+        
+        await cache._refresh_task
+        assert cache.commodity_name('BERAS') == 'Beras Medium'
+        assert calls['commodities'] == 2
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_reload(self, metadata_tables):
+        """Invalidated tables are reloaded on next access."""
+        calls, names = metadata_tables
+        cache = MetadataCache(ttl_seconds=60)
+        await cache.load()
+        names['JAGUNG'] = 'Jagung'
+        
+        cache.invalidate()
+        assert cache.commodity_name('BERAS') == 'BERAS'
+        
+        await cache.ensure_fresh()
+        assert cache.commodity_name('JAGUNG') == 'Jagung'
+        assert calls['commodities'] == 2
@@ -0,0 +1,112 @@
+"""Unit tests untuk shared model registry."""
+
+import pytest
+import numpy as np
+
+from app.models.registry import ModelRegistry, estimate_model_size
+
+
+class TestModelRegistry:
+    """Test suite untuk ModelRegistry."""
+    
+    def test_get_records_hits_and_misses(self):
+        """Lookups should be counted as hits or misses."""
+        registry = ModelRegistry(max_bytes=1000, eviction_policy='lru', pinned_models=[])
+        registry.put('prophet_BERAS_national', object(), size_bytes=100)
+        
+        assert registry.get('prophet_BERAS_national') is not None
+        assert registry.get('lstm_BERAS_national') is None
+        
+        stats = registry.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['hit_rate'] == 50.0
+    
+    def test_lru_evicts_least_recently_used(self):
+        """The least recently accessed model is evicted first."""
+        registry = ModelRegistry(max_bytes=300, eviction_policy='lru', pinned_models=[])
+        for key in ['a', 'b', 'c']:
+            registry.put(key, key, size_bytes=100)
+        
+        registry.get('a')
+        registry.put('d', 'd', size_bytes=100)
+        
+        assert registry.keys() == ['c', 'a', 'd']
+        assert registry.bytes_used == 300
+        assert registry.get_stats()['evictions'] == 1
+    
+    def test_lfu_evicts_least_frequently_used(self):
+        """LFU policy keeps frequently used models even if they are older."""
+        registry = ModelRegistry(max_bytes=300, eviction_policy='lfu', pinned_models=[])
+        for key in ['a', 'b', 'c']:
+            registry.put(key, key, size_bytes=100)
+        
+        for _ in range(3):
+            registry.get('a')
+        registry.get('c')
+        registry.put('d', 'd', size_bytes=100)
+        
+        assert 'b' not in registry
+        assert {'a', 'c', 'd'} == set(registry.keys())
+    
+    def test_pinned_models_are_never_evicted(self):
+        """Pinned models survive eviction pressure."""
+        registry = ModelRegistry(max_bytes=200, eviction_policy='lru', pinned_models=['a'])
+        registry.put('a', 'a', size_bytes=100)
+        registry.put('b', 'b', size_bytes=100)
+        registry.put('c', 'c', size_bytes=100)
+        
+        assert 'a' in registry
+        assert 'b' not in registry
+        
+        registry.unpin('a')
+        registry.put('d', 'd', size_bytes=100)
+        assert 'a' not in registry
+    
+    def test_oversized_model_is_not_cached(self):
+        """A model larger than the budget is rejected without evicting others."""
+        registry = ModelRegistry(max_bytes=100, eviction_policy='lru', pinned_models=['a'])
+        registry.put('a', 'a', size_bytes=100)
+        
+        assert registry.put('big', 'big', size_bytes=500) is False
+        assert registry.keys() == ['a']
+        assert registry.get_stats()['rejected'] == 1
+    
+    def test_oversized_model_keeps_unpinned_models_and_existing_entry(self):
+        """A model larger than the unpinned budget evicts nothing and keeps the old entry."""
+        registry = ModelRegistry(max_bytes=300, eviction_policy='lru', pinned_models=['a'])
+        registry.put('a', 'a', size_bytes=100)
+        registry.put('b', 'b', size_bytes=100)
+        registry.put('c', 'old', size_bytes=100)
+        
+        assert registry.put('c', 'new', size_bytes=250) is False
+        assert registry.keys() == ['a', 'b', 'c']
+        assert registry.get('c') == 'old'
+        assert registry.bytes_used == 300
+        assert registry.get_stats()['evictions'] == 0
+    
+    def test_replacing_model_updates_memory_accounting(self):
+        """Re-registering a key replaces its size instead of adding to it."""
+        registry = ModelRegistry(max_bytes=1000, eviction_policy='lru', pinned_models=[])
+        registry.put('a', 'old', size_bytes=400)
+        registry.put('a', 'new', size_bytes=100)
+        
+        assert registry.bytes_used == 100
+        assert registry.get('a') == 'new'
+        
+        registry.invalidate('a')
+        assert registry.bytes_used == 0
+        assert len(registry) == 0
+    
+    def test_invalid_policy_raises(self):
+        """Unknown eviction policies are rejected."""
+        with pytest.raises(ValueError):
+            ModelRegistry(max_bytes=100, eviction_policy='fifo')
+    
+    def test_estimate_model_size(self):
+        """Size estimates should track the model payload."""
+        small = estimate_model_size({'weights': np.zeros(10)})
+        large = estimate_model_size({'weights': np.zeros(10000)})
+        
+        assert large > small
+        assert large >= 10000 * 8
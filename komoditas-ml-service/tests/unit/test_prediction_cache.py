@@ -0,0 +1,396 @@
+"""Unit tests untuk two-tier prediction cache."""
+
+import asyncio
+
+import pytest
+
+from app.inference.cache import PredictionCache
+
+
+class TestPredictionCache:
+    """Test suite untuk in-process PredictionCache."""
+    
+    def test_expired_entries_are_misses(self, monkeypatch):
+        """Entries stop being served once their TTL passes."""
+        now = [1000.0]
+        monkeypatch.setattr('app.inference.cache.time.monotonic', lambda: now[0])
+        cache = PredictionCache(max_entries=10, ttl_seconds=60)
+        cache.put('pred:BERAS:national:7:prophet', {'price': 1})
+        
+        assert cache.get('pred:BERAS:national:7:prophet') == {'price': 1}
+        
+        now[0] += 61
+        assert cache.get('pred:BERAS:national:7:prophet') is None
+        
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['expirations'] == 1
+        assert stats['entries'] == 0
+    
+    def test_size_is_bounded_lru(self):
+        """The least recently used entry is evicted past max_entries."""
+        cache = PredictionCache(max_entries=2, ttl_seconds=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        
+        assert cache.keys() == ['a', 'c']
+        assert cache.get_stats()['evictions'] == 1
+    
+    def test_invalidate_prefix(self):
+        """Prefix invalidation drops only matching keys."""
+        cache = PredictionCache(max_entries=10, ttl_seconds=60)
+        cache.put('pred:BERAS:31:7:prophet', 1)
+        cache.put('pred:BERAS:32:7:prophet', 2)
+        cache.put('pred:JAGUNG:31:7:prophet', 3)
+        
+        assert cache.invalidate('pred:BERAS:') == 2
+        assert cache.keys() == ['pred:JAGUNG:31:7:prophet']
+
+
+class TestTwoTierPrediction:
+    """Test suite untuk L1/L2 lookups in PredictionService."""
+    
+    @pytest.mark.asyncio
+    async def test_l1_hit_skips_redis(self, stub_prediction_service, monkeypatch):
+        """A repeated request is served in-process without a Redis GET."""
+        from app.config.redis import redis_manager
+        
+        redis_gets = []
+        
+        async def get_cached_predictions(cache_key):
+            redis_gets.append(cache_key)
+            return None
+        
+        monkeypatch.setattr(redis_manager, 'get_cached_predictions', get_cached_predictions)
+        service = stub_prediction_service()
+        
+        first = await service.predict_price('BERAS', '31', horizon_days=7)
+        second = await service.predict_price('BERAS', '31', horizon_days=7)
+        
+        assert second is first
+        assert len(redis_gets) == 1
+        
+        stats = service.get_prediction_stats()
+        assert stats['l1_cache_hits'] == 1
+        assert stats['cache_misses'] == 1
+        assert stats['cache_tiers']['l1']['hit_rate'] == 50.0
+        assert stats['cache_tiers']['l2']['hit_rate'] == 0.0
+    
+    @pytest.mark.asyncio
+    async def test_l2_hit_populates_l1(self, stub_prediction_service, monkeypatch):
+        """Redis hits are copied into the in-process tier."""
+        from app.config.redis import redis_manager
+        
+        async def get_cached_predictions(cache_key):
+            return {'cache_key': cache_key}
+        
+        monkeypatch.setattr(redis_manager, 'get_cached_predictions', get_cached_predictions)
+        service = stub_prediction_service()
+        
+        await service.predict_price('BERAS', '31', horizon_days=7)
+        await service.predict_price('BERAS', '31', horizon_days=7)
+        
+        stats = service.get_prediction_stats()
+        assert stats['l2_cache_hits'] == 1
+        assert stats['l1_cache_hits'] == 1
+        assert stats['cache_tiers']['l2']['hit_rate'] == 100.0
+        assert service.data_loads == 0
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_computation(self, stub_prediction_service, monkeypatch):
+        """Identical concurrent misses run the model and Redis lookup once."""
+        from app.config.redis import redis_manager
+        
+        redis_gets = []
+        
+        async def get_cached_predictions(cache_key):
+            redis_gets.append(cache_key)
+            await asyncio.sleep(0.01)
+            return None
+        
+        monkeypatch.setattr(redis_manager, 'get_cached_predictions', get_cached_predictions)
+        service = stub_prediction_service(load_delay_s=0.01)
+        
+        model_loads = []
+        load_model = service._load_model
+        
+        async def counting_load_model(*args, **kwargs):
+            model_loads.append(args)
+            return await load_model(*args, **kwargs)
+        
+        service._load_model = counting_load_model
+        
+        results = await asyncio.gather(*(
+            service.predict_price('BERAS', '31', horizon_days=7) for _ in range(10)
+        ))
+        
+        assert all(result is results[0] for result in results)
+        assert len(redis_gets) == 1
+        assert len(model_loads) == 1
+        assert service.data_loads == 1
+        assert service.get_prediction_stats()['coalesced_requests'] == 9
+    
+    @pytest.mark.asyncio
+    async def test_refresh_does_not_join_cached_lookup(self, stub_prediction_service, monkeypatch):
+        """A refresh racing a cache lookup for the same key still recomputes."""
+        from app.config.redis import redis_manager
+        
+        cached = {'cached': True}
+        
+        async def get_cached_predictions(cache_key):
+            await asyncio.sleep(0.01)
+            return cached
+        
+        monkeypatch.setattr(redis_manager, 'get_cached_predictions', get_cached_predictions)
+        service = stub_prediction_service()
+        
+        def predict(refresh):
+            return service._predict_price(
+                commodity_code='BERAS',
+                region_code='31',
+                horizon_days=7,
+                model_type='prophet',
+                include_uncertainty=False,
+                include_features=False,
+                load_data=lambda: service._get_recent_data('BERAS', '31'),
+                refresh=refresh
+            )
+        
+        lookup, refreshed = await asyncio.gather(predict(False), predict(True))
+        
+        assert lookup is cached
+        assert refreshed is not cached and len(refreshed['predictions']) == 7
+        assert service.get_prediction_stats()['coalesced_requests'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_failed_computation_is_not_cached(self, stub_prediction_service):
+        """Errors reach every waiter and the next call retries."""
+        service = stub_prediction_service()
+        
+        with pytest.raises(Exception):
+            await service.predict_price('MISSING', '31')
+        
+        assert len(service.prediction_cache) == 0
+        assert service._inflight_predictions == {}
+
+
+class TestStaleWhileRevalidate:
+    """Test suite untuk stale-while-revalidate and cache warming."""
+    
+    @staticmethod
+    def _capture_cache_writes(monkeypatch) -> list:
+        """Record prediction cache writes as (key, expire) tuples."""
+        from app.config.redis import redis_manager
+        
+        writes = []
+        
+        async def cache_model_predictions(cache_key, prediction, expire=None, tags=None):
+            writes.append((cache_key, expire))
+            return True
+        
+        async def cache_many_model_predictions(predictions, expire=None, tags=None):
+            writes.extend((cache_key, expire) for cache_key in predictions)
+            return True
+        
+        monkeypatch.setattr(redis_manager, 'cache_model_predictions', cache_model_predictions)
+        monkeypatch.setattr(redis_manager, 'cache_many_model_predictions', cache_many_model_predictions)
+        return writes
+    
+    @pytest.mark.asyncio
+    async def test_batch_resolves_cache_hits_in_one_round_trip(self, stub_prediction_service, monkeypatch):
+        """Batch keys go through L1, then a single MGET; only misses reach the model."""
+        from datetime import datetime
+        from app.config.redis import redis_manager
+        
+        cached = {'prediction_date': datetime.now().isoformat(), 'cached': True}
+        mget_calls = []
+        
+        async def get_many_cached_predictions(cache_keys):
+            mget_calls.append(list(cache_keys))
+            return {key: cached for key in cache_keys if ':7:' in key}
+        
+        async def get_cached_predictions(cache_key):
+            raise AssertionError("batch must not issue per-key GETs")
+        
+        monkeypatch.setattr(redis_manager, 'get_many_cached_predictions', get_many_cached_predictions)
+        monkeypatch.setattr(redis_manager, 'get_cached_predictions', get_cached_predictions)
+        writes = self._capture_cache_writes(monkeypatch)
+        service = stub_prediction_service()
+        service.prediction_cache.put('pred:BERAS:31:14:prophet', {'l1': True})
+        
+        requests = [
+            {'commodity_code': commodity_code, 'region_code': '31', 'horizon_days': horizon_days}
+            for commodity_code in ['BERAS', 'JAGUNG']
+            for horizon_days in [7, 14]
+        ]
+        result = await service.batch_predict(requests)
+        
+        assert result['successful_predictions'] == 4
+        assert mget_calls == [[
+            'pred:BERAS:31:7:prophet', 'pred:JAGUNG:31:7:prophet', 'pred:JAGUNG:31:14:prophet'
+        ]]
+        predictions = [item['prediction'] for item in result['predictions']]
+        assert predictions[0] is cached and predictions[2] is cached
+        assert predictions[1] == {'l1': True}
+        assert predictions[3]['commodity_code'] == 'JAGUNG'
+        assert [key for key, _ in writes] == ['pred:JAGUNG:31:14:prophet']
+        assert service.data_loads == 1
+        
+        stats = service.get_prediction_stats()
+        assert (stats['l1_cache_hits'], stats['l2_cache_hits'], stats['cache_misses']) == (1, 2, 1)
+    
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_served_and_refreshed(self, stub_prediction_service, monkeypatch):
+        """An expired Redis entry is returned at once and recomputed in the background."""
+        from datetime import datetime, timedelta
+        from app.config.redis import redis_manager
+        from app.config.settings import settings
+        
+        stale = {
+            'cache_key': 'stale',
+            'prediction_date': (datetime.now() - timedelta(seconds=settings.prediction_cache_ttl_seconds + 60)).isoformat()
+        }
+        
+        async def get_cached_predictions(cache_key):
+            return stale
+        
+        monkeypatch.setattr(redis_manager, 'get_cached_predictions', get_cached_predictions)
+        writes = self._capture_cache_writes(monkeypatch)
+        service = stub_prediction_service()
+        
+        result = await service.predict_price('BERAS', '31', horizon_days=7)
+        assert result is stale
+        assert len(service._refresh_tasks) == 1
+        
+        await asyncio.gather(*service._refresh_tasks.values())
+        
+        stats = service.get_prediction_stats()
+        assert stats['stale_served'] == 1
+        assert stats['background_refreshes'] == 1
+        assert writes == [(
+            'pred:BERAS:31:7:prophet',
+            settings.prediction_cache_ttl_seconds + settings.prediction_cache_stale_ttl_seconds
+        )]
+        
+        # The refreshed prediction now answers from L1
+        refreshed = await service.predict_price('BERAS', '31', horizon_days=7)
+        assert refreshed is not stale
+        assert refreshed['commodity_code'] == 'BERAS'
+    
+    @pytest.mark.asyncio
+    async def test_fresh_entry_is_not_refreshed(self, stub_prediction_service, monkeypatch):
+        """Entries inside the fresh TTL do not trigger a refresh."""
+        from datetime import datetime
+        from app.config.redis import redis_manager
+        
+        async def get_cached_predictions(cache_key):
+            return {'prediction_date': datetime.now().isoformat()}
+        
+        monkeypatch.setattr(redis_manager, 'get_cached_predictions', get_cached_predictions)
+        service = stub_prediction_service()
+        
+        await service.predict_price('BERAS', '31', horizon_days=7)
+        
+        assert service._refresh_tasks == {}
+        assert service.get_prediction_stats()['stale_served'] == 0
+    
+    def test_warmer_requests_cover_trained_models(self, stub_prediction_service, monkeypatch, tmp_path):
+        """Only commodity/region pairs with a model file are warmed, for every horizon."""
+        from app.config.settings import settings
+        from app.inference.warmer import PredictionCacheWarmer
+        
+        for model_key in ['prophet_BERAS_national', 'prophet_BERAS_31', 'lstm_JAGUNG_32']:
+            (tmp_path / f"{model_key}.pkl").write_bytes(b'')
+        monkeypatch.setattr(settings, 'model_store_path', str(tmp_path))
+        
+        warmer = PredictionCacheWarmer(stub_prediction_service(), horizons=[7, 30], model_types=['prophet'])
+        requests = warmer.build_requests(['BERAS', 'JAGUNG'])
+        
+        assert {(r['commodity_code'], r['region_code'], r['horizon_days']) for r in requests} == {
+            ('BERAS', None, 7), ('BERAS', None, 30), ('BERAS', '31', 7), ('BERAS', '31', 30)
+        }
+    
+    @pytest.mark.asyncio
+    async def test_warm_recomputes_cached_predictions(self, stub_prediction_service, monkeypatch, tmp_path):
+        """Warming bypasses both tiers so entries are renewed before expiry."""
+        from app.config.redis import redis_manager
+        from app.config.settings import settings
+        from app.inference.warmer import PredictionCacheWarmer
+        
+        (tmp_path / "prophet_BERAS_31.pkl").write_bytes(b'')
+        monkeypatch.setattr(settings, 'model_store_path', str(tmp_path))
+        
+        async def get_cached_predictions(cache_key):
+            raise AssertionError("warming must not read the cache")
+        
+        monkeypatch.setattr(redis_manager, 'get_cached_predictions', get_cached_predictions)
+        writes = self._capture_cache_writes(monkeypatch)
+        service = stub_prediction_service()
+        service.prediction_cache.put('pred:BERAS:31:7:prophet', {'old': True})
+        
+        warmer = PredictionCacheWarmer(service, horizons=[7, 14], model_types=['prophet'])
+        summary = await warmer.warm(['BERAS'])
+        
+        assert summary['successful'] == 2
+        assert [key for key, _ in writes] == ['pred:BERAS:31:7:prophet', 'pred:BERAS:31:14:prophet']
+        assert 'old' not in service.prediction_cache.get('pred:BERAS:31:7:prophet')
+        assert service.data_loads == 1
+    
+    @pytest.mark.asyncio
+    async def test_warm_skips_entries_with_ttl_left(self, stub_prediction_service, monkeypatch, tmp_path):
+        """Only missing or soon-stale predictions are recomputed unless forced."""
+        from datetime import datetime, timedelta
+        from app.config.redis import redis_manager
+        from app.config.settings import settings
+        from app.inference.warmer import PredictionCacheWarmer
+        
+        (tmp_path / "prophet_BERAS_31.pkl").write_bytes(b'')
+        monkeypatch.setattr(settings, 'model_store_path', str(tmp_path))
+        
+        generated = {
+            'pred:BERAS:31:7:prophet': datetime.now(),
+            'pred:BERAS:31:14:prophet': datetime.now() - timedelta(seconds=settings.prediction_cache_ttl_seconds - 60)
+        }
+        
+        async def get_many_cached_predictions(cache_keys):
+            return {
+                key: {'prediction_date': generated[key].isoformat()}
+                for key in cache_keys if key in generated
+            }
+        
+        monkeypatch.setattr(redis_manager, 'get_many_cached_predictions', get_many_cached_predictions)
+        writes = self._capture_cache_writes(monkeypatch)
+        
+        warmer = PredictionCacheWarmer(stub_prediction_service(), horizons=[7, 14, 30], model_types=['prophet'])
+        summary = await warmer.warm(['BERAS'])
+        
+        assert summary['skipped'] == 1
+        assert sorted(key for key, _ in writes) == ['pred:BERAS:31:14:prophet', 'pred:BERAS:31:30:prophet']
+        
+        writes.clear()
+        assert (await warmer.warm(['BERAS'], force=True))['requests'] == 3
+        assert len(writes) == 3
+    
+    @pytest.mark.asyncio
+    async def test_warmer_start_is_jittered(self, stub_prediction_service, monkeypatch):
+        """The first periodic run waits a random delay up to the jitter bound."""
+        from app.inference import warmer as warmer_module
+        
+        sleeps = []
+        
+        async def sleep(seconds):
+            sleeps.append(seconds)
+            raise asyncio.CancelledError
+        
+        monkeypatch.setattr(warmer_module.asyncio, 'sleep', sleep)
+        monkeypatch.setattr(warmer_module.random, 'uniform', lambda low, high: high / 2)
+        warmer = warmer_module.PredictionCacheWarmer(stub_prediction_service(), startup_jitter_seconds=30)
+        
+        with pytest.raises(asyncio.CancelledError):
+            await warmer._run()
+        
+        assert sleeps == [15.0]
+        assert warmer.runs == 0
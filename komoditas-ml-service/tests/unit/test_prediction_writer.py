@@ -0,0 +1,141 @@
+"""Unit tests untuk COPY-based prediction writer."""
+
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.config.database import DatabaseManager, db_manager
+
+
+class FakeCopyConnection:
+    """Records COPY and execute calls made on the driver connection."""
+    
+    def __init__(self, has_upsert_index: bool = True):
+        self.copied = []
+        self.executed = []
+        self.has_upsert_index = has_upsert_index
+    
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+    
+    async def execute(self, query: str):
+        self.executed.append(query)
+        if 'ON CONFLICT' in query and not self.has_upsert_index:
+            error = Exception("there is no unique or exclusion constraint matching the ON CONFLICT specification")
+            error.sqlstate = '42P10'
+            raise error
+    
+    async def copy_records_to_table(self, table_name: str, records: list, columns: list):
+        self.copied.append((table_name, list(records), columns))
+
+
+class FakeAsyncEngine:
+    """Async engine double exposing a fake asyncpg connection."""
+    
+    def __init__(self, has_upsert_index: bool = True):
+        self.copy_connection = FakeCopyConnection(has_upsert_index)
+    
+    @asynccontextmanager
+    async def connect(self):
+        engine = self
+        
+        class Connection:
+            async def get_raw_connection(self):
+                return type('RawConnection', (), {'driver_connection': engine.copy_connection})()
+        
+        yield Connection()
+
+
+def _predictions(n_rows: int) -> list:
+    """Prediction dicts as produced by the inference pipeline."""
+    return [
+        {
+            'commodity_id': 'c-1',
+            'region_id': None,
+            'predicted_price': 15000.0 + i,
+            'current_price': 14800.0,
+            'price_change': 1.2,
+            'confidence': 0.9,
+            'prediction_date': f'2024-01-{(i % 28) + 1:02d}T00:00:00',
+            'features': {'ma_7': 14900.0}
+        }
+        for i in range(n_rows)
+    ]
+
+
+class TestSavePredictions:
+    """Test suite untuk DatabaseManager.save_predictions."""
+    
+    @pytest.mark.asyncio
+    async def test_rows_are_copied_in_chunks(self, monkeypatch):
+        """Rows stream through COPY in chunks of ``chunk_size``."""
+        engine = FakeAsyncEngine()
+        monkeypatch.setattr(db_manager, 'async_engine', engine)
+        
+        stats = await db_manager.save_predictions(
+            _predictions(25), model_version='v1', algorithm='prophet', chunk_size=10
+        )
+        
+        copied = engine.copy_connection.copied
+        assert [len(records) for _, records, _ in copied] == [10, 10, 5]
+        assert all(table == 'predictions' for table, _, _ in copied)
+        assert stats['rows'] == 25
+        assert stats['rows_per_second'] > 0
+        assert engine.copy_connection.executed == []
+    
+    @pytest.mark.asyncio
+    async def test_upsert_merges_from_staging_table(self, monkeypatch):
+        """Upserts COPY into a staging table and merge with ON CONFLICT."""
+        engine = FakeAsyncEngine()
+        monkeypatch.setattr(db_manager, 'async_engine', engine)
+        
+        await db_manager.save_predictions(
+            _predictions(3), model_version='v1', algorithm='prophet', upsert=True
+        )
+        
+        create_staging, merge = engine.copy_connection.executed[0], engine.copy_connection.executed[-1]
+        assert 'CREATE TEMP TABLE predictions_staging' in create_staging
+        assert engine.copy_connection.copied[0][0] == 'predictions_staging'
+        assert 'ON CONFLICT (commodity_id, region_id, prediction_date, algorithm) DO UPDATE' in merge
+        assert 'predicted_price = EXCLUDED.predicted_price' in merge
+        assert 'algorithm = EXCLUDED' not in merge
+    
+    @pytest.mark.asyncio
+    async def test_upsert_without_index_fails_clearly(self, monkeypatch):
+        """A missing upsert index names the migration instead of changing the schema."""
+        engine = FakeAsyncEngine(has_upsert_index=False)
+        monkeypatch.setattr(db_manager, 'async_engine', engine)
+        
+        with pytest.raises(RuntimeError, match='001_predictions_upsert_key.sql'):
+            await db_manager.save_predictions(
+                _predictions(3), model_version='v1', algorithm='prophet', upsert=True
+            )
+        
+        executed = engine.copy_connection.executed
+        assert not any('DELETE' in query or 'CREATE UNIQUE INDEX' in query for query in executed)
+    
+    def test_migration_indexes_conflict_columns_nulls_not_distinct(self):
+        """National predictions (NULL region_id) share one key in the migrated index."""
+        migration = (Path(__file__).parents[2] / DatabaseManager.PREDICTION_UPSERT_MIGRATION).read_text()
+        conflict = ', '.join(DatabaseManager.PREDICTION_CONFLICT_COLUMNS)
+        
+        assert f'ON predictions ({conflict})\n    NULLS NOT DISTINCT' in migration
+        assert f'PARTITION BY {conflict}' in migration
+    
+    def test_record_layout(self):
+        """Records follow PREDICTION_COLUMNS with parsed dates and JSON features."""
+        created_at = datetime(2024, 1, 1)
+        record = DatabaseManager._prediction_record(
+            _predictions(1)[0], 'v1', 'lstm', created_at
+        )
+        row = dict(zip(DatabaseManager.PREDICTION_COLUMNS, record))
+        
+        assert row['prediction_date'] == datetime(2024, 1, 1)
+        assert json.loads(row['features']) == {'ma_7': 14900.0}
+        assert row['model_version'] == 'v1'
+        assert row['algorithm'] == 'lstm'
+        assert row['created_at'] == created_at
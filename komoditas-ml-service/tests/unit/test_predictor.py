@@ -0,0 +1,326 @@
+"""Unit tests untuk PredictionService batch engine."""
+
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+
+def _batch_requests(n_requests: int, commodities=('BERAS', 'JAGUNG')) -> list:
+    """Build batch requests cycling through commodities and horizons."""
+    return [
+        {
+            'commodity_code': commodities[i % len(commodities)],
+            'region_code': '31',
+            'horizon_days': [7, 14, 30][i % 3],
+            'model_type': 'prophet'
+        }
+        for i in range(n_requests)
+    ]
+
+
+class TestBatchPredict:
+    """Test suite untuk PredictionService.batch_predict."""
+    
+    @pytest.mark.asyncio
+    async def test_results_follow_request_order(self, stub_prediction_service):
+        """Every request gets a result, in the order it was submitted."""
+        service = stub_prediction_service()
+        requests = _batch_requests(9)
+        
+        result = await service.batch_predict(requests, max_workers=3)
+        
+        assert result['total_requests'] == 9
+        assert result['successful_predictions'] == 9
+        assert [item['request'] for item in result['predictions']] == requests
+        assert [
+            len(item['prediction']['predictions']) for item in result['predictions']
+        ] == [req['horizon_days'] for req in requests]
+    
+    @pytest.mark.asyncio
+    async def test_failed_items_do_not_fail_batch(self, stub_prediction_service):
+        """Errors are reported per item."""
+        service = stub_prediction_service()
+        requests = _batch_requests(2) + [{'commodity_code': 'MISSING', 'horizon_days': 7}]
+        
+        result = await service.batch_predict(requests)
+        
+        assert result['successful_predictions'] == 2
+        assert result['failed_predictions'] == 1
+        assert result['predictions'][-1]['status'] == 'error'
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_data_loads(self, stub_prediction_service):
+        """Requests for the same commodity and region coalesce onto one load."""
+        service = stub_prediction_service(load_delay_s=0.02)
+        
+        result = await service.batch_predict(_batch_requests(30), max_workers=30)
+        
+        assert result['successful_predictions'] == 30
+        assert service.data_loads == 2
+        assert service._inflight_data_loads == {}
+    
+    @pytest.mark.asyncio
+    async def test_semaphore_bounds_concurrency(self, stub_prediction_service):
+        """No more than ``max_workers`` predictions run at the same time."""
+        service = stub_prediction_service()
+        in_flight = 0
+        peak = 0
+        predict_price = service._predict_price
+        
+        async def tracked_predict(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            try:
+                return await predict_price(**kwargs)
+            finally:
+                in_flight -= 1
+        
+        service._predict_price = tracked_predict
+        await service.batch_predict(_batch_requests(20), max_workers=4)
+        
+        assert peak == 4
+    
+    @pytest.mark.asyncio
+    async def test_featurization_runs_off_the_event_loop(self, stub_prediction_service):
+        """Feature engineering runs in a worker thread, not on the loop thread."""
+        service = stub_prediction_service()
+        featurize_threads = set()
+        
+        def engineer_features(price_data, **kwargs):
+            featurize_threads.add(threading.get_ident())
+            return price_data.set_index('date')
+        
+        service.feature_engineer.engineer_features = engineer_features
+        result = await service.batch_predict(_batch_requests(4))
+        
+        assert result['successful_predictions'] == 4
+        assert featurize_threads and threading.get_ident() not in featurize_threads
+
+
+class TestBatchPlanner:
+    """Test suite untuk batch request planning."""
+    
+    def test_groups_by_commodity_region_and_lookback(self, stub_prediction_service):
+        """Requests sharing a feature frame land in the same group."""
+        service = stub_prediction_service()
+        requests = [
+            {'commodity_code': 'BERAS', 'region_code': '31', 'horizon_days': 7},
+            {'commodity_code': 'BERAS', 'region_code': '31', 'horizon_days': 30, 'model_type': 'lstm'},
+            {'commodity_code': 'BERAS', 'region_code': '32', 'horizon_days': 7},
+            {'commodity_code': 'BERAS', 'region_code': '31', 'horizon_days': 7, 'lookback_days': 180},
+        ]
+        
+        groups = service._plan_batch(requests)
+        
+        assert groups == {
+            ('BERAS', '31', 90): [0, 1],
+            ('BERAS', '32', 90): [2],
+            ('BERAS', '31', 180): [3],
+        }
+    
+    @pytest.mark.asyncio
+    async def test_horizons_and_models_share_one_load(self, stub_prediction_service):
+        """Every horizon and model type in a group reuses one feature frame."""
+        service = stub_prediction_service()
+        requests = [
+            {'commodity_code': 'BERAS', 'region_code': '31', 'horizon_days': horizon, 'model_type': model_type}
+            for horizon in [7, 14, 30]
+            for model_type in ['prophet', 'lstm']
+        ]
+        
+        # Sequential execution would reload per item without the planner
+        result = await service.batch_predict(requests, max_workers=1)
+        
+        assert result['successful_predictions'] == 6
+        assert service.data_loads == 1
+    
+    @pytest.mark.asyncio
+    async def test_cached_group_skips_data_load(self, stub_prediction_service, monkeypatch):
+        """Groups fully served from cache never load data."""
+        from app.config.redis import redis_manager
+        
+        service = stub_prediction_service()
+        
+        async def cached(cache_keys):
+            return {cache_key: {'cache_key': cache_key} for cache_key in cache_keys}
+        
+        monkeypatch.setattr(redis_manager, 'get_many_cached_predictions', cached)
+        
+        result = await service.batch_predict(_batch_requests(6))
+        
+        assert result['successful_predictions'] == 6
+        assert service.data_loads == 0
+
+
+class TestRecentData:
+    """Test suite untuk PredictionService._get_recent_data."""
+    
+    @pytest.mark.asyncio
+    async def test_default_lookback_featurizes_incrementally(self, stub_prediction_service, monkeypatch):
+        """The default fetch seeds the incremental state and later calls only add new rows."""
+        from app.features.engineering import FeatureEngineer
+        
+        service = stub_prediction_service()
+        service.feature_engineer = FeatureEngineer()
+        
+        load = service.data_processor.load_and_preprocess_data_async
+        calls = 0
+        
+        async def load_until_yesterday_first(**kwargs):
+            nonlocal calls
+            calls += 1
+            price_data, weather_data = await load(**kwargs)
+            return (price_data.iloc[:-1] if calls == 1 else price_data), weather_data
+        
+        service.data_processor.load_and_preprocess_data_async = load_until_yesterday_first
+        
+        batch_runs = 0
+        add_technical_indicators = service.feature_engineer._add_technical_indicators
+        
+        def counted(*args, **kwargs):
+            nonlocal batch_runs
+            batch_runs += 1
+            return add_technical_indicators(*args, **kwargs)
+        
+        monkeypatch.setattr(service.feature_engineer, '_add_technical_indicators', counted)
+        
+        await service._get_recent_data('BERAS', '31')
+        assert ('BERAS', '31') in service.feature_engineer.incremental_states
+        
+        features_df = await service._get_recent_data('BERAS', '31')
+        
+        assert batch_runs == 1
+        assert features_df.index.max() == pd.Timestamp.now().normalize()
+        assert len(features_df) == 90
+
+
+class TestModelLoading:
+    """Test suite untuk where PredictionService loads models."""
+    
+    @pytest.mark.asyncio
+    async def test_pool_inference_skips_main_process_load(self, stub_prediction_service, monkeypatch, tmp_path):
+        """With a persisted model, only the pool worker loads it."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        from app.config.settings import settings
+        from app.inference import predictor
+        
+        monkeypatch.setattr(settings, 'model_store_path', str(tmp_path))
+        (tmp_path / 'prophet_BERAS_31.pkl').write_bytes(b'')
+        
+        def forecast_in_worker(model_type, commodity_code, region_code, data, horizon_days, include_features):
+            forecast = pd.DataFrame({
+                'ds': pd.date_range('2024-01-01', periods=horizon_days), 'yhat': 15000.0
+            })
+            return forecast, {'model_version': 'worker'}
+        
+        monkeypatch.setattr(predictor, '_forecast_in_worker', forecast_in_worker)
+        
+        service = stub_prediction_service()
+        service.inference_workers = 1
+        service._process_pool = ThreadPoolExecutor(max_workers=1)
+        
+        async def fail(*args, **kwargs):
+            raise AssertionError("model should not load in the main process")
+        
+        service._load_model = fail
+        
+        try:
+            result = await service.predict_price('BERAS', '31', horizon_days=7, model_type='prophet')
+        finally:
+            service.shutdown()
+        
+        assert result['model_version'] == 'worker'
+        assert len(result['predictions']) == 7
+    
+    @pytest.mark.asyncio
+    async def test_in_process_load_runs_off_the_event_loop(self, stub_prediction_service):
+        """The fallback disk load runs in a worker thread."""
+        service = stub_prediction_service()
+        del service._load_model
+        load_threads = set()
+        
+        def load_model(model_type, commodity_code, region_code=None):
+            load_threads.add(threading.get_ident())
+            return object()
+        
+        service.model_trainer.load_model = load_model
+        await service._load_model('prophet', 'BERAS', '31')
+        
+        assert load_threads and threading.get_ident() not in load_threads
+    
+    @pytest.mark.parametrize("fails", [False, True])
+    def test_worker_reads_lstm_inputs_from_shared_memory(self, sample_price_data, monkeypatch, tmp_path, fails):
+        """A pool worker forecasts from an attached FeatureMatrix and releases it."""
+        import numpy as np
+        
+        from app.config.settings import settings
+        from app.features.matrix import FeatureMatrix
+        from app.inference import predictor
+        
+        monkeypatch.setattr(settings, 'model_store_path', str(tmp_path))
+        (tmp_path / 'lstm_BERAS_31.pkl').write_bytes(b'')
+        seen = []
+        
+        class Model:
+            model_metadata = {'training_date': 'shared'}
+            
+            def predict(self, data, horizon_days):
+                seen.append(data['price'].to_numpy().copy())
+                if fails:
+                    raise ValueError("forecast failed")
+                return pd.DataFrame({'ds': pd.date_range('2024-01-01', periods=horizon_days), 'yhat': 1.0})
+        
+        class Trainer:
+            def load_model(self, *args):
+                return Model()
+        
+        monkeypatch.setattr(predictor, '_worker_trainer', Trainer())
+        data = sample_price_data.set_index('date')
+        
+        with FeatureMatrix.from_frame(data).share() as shared:
+            if fails:
+                with pytest.raises(ValueError):
+                    predictor._forecast_in_worker('lstm', 'BERAS', '31', shared.handle, 7)
+            else:
+                forecast, info = predictor._forecast_in_worker('lstm', 'BERAS', '31', shared.handle, 7)
+                assert len(forecast) == 7 and info == {'model_version': 'shared'}
+        
+        np.testing.assert_allclose(seen[0], data['price'].to_numpy(), rtol=1e-6)
+    
+    @pytest.mark.asyncio
+    async def test_lstm_inputs_are_shared_with_the_pool(self, stub_prediction_service, monkeypatch, tmp_path):
+        """LSTM frames reach the pool as a shared-memory handle, unlinked afterwards."""
+        from concurrent.futures import ThreadPoolExecutor
+        from multiprocessing import shared_memory
+        
+        from app.config.settings import settings
+        from app.inference import predictor
+        
+        monkeypatch.setattr(settings, 'model_store_path', str(tmp_path))
+        (tmp_path / 'lstm_BERAS_31.pkl').write_bytes(b'')
+        handles = []
+        
+        def forecast_in_worker(model_type, commodity_code, region_code, data, horizon_days, include_features):
+            handles.append(data)
+            forecast = pd.DataFrame({'ds': pd.date_range('2024-01-01', periods=horizon_days), 'yhat': 1.0})
+            return forecast, {'model_version': 'worker'}
+        
+        monkeypatch.setattr(predictor, '_forecast_in_worker', forecast_in_worker)
+        service = stub_prediction_service()
+        service.inference_workers = 1
+        service._process_pool = ThreadPoolExecutor(max_workers=1)
+        data = await service._get_recent_data('BERAS', '31')
+        
+        try:
+            await service._run_inference('lstm', 'BERAS', '31', data, 7)
+        finally:
+            service.shutdown()
+        
+        assert 'price' in handles[0]['columns'] and handles[0]['shape'][0] == len(data)
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=handles[0]['name'])
@@ -0,0 +1,208 @@
+"""Unit tests untuk local columnar price store."""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from app.config.database import DatabaseManager, db_manager
+from app.preprocessing import price_store as price_store_module
+from app.preprocessing.data_processor import DataProcessor
+from app.preprocessing.price_store import PriceStore, ds
+
+requires_pyarrow = pytest.mark.skipif(price_store_module.pa is None, reason="pyarrow not installed")
+
+
+def _price_rows(n_days: int = 90) -> pd.DataFrame:
+    """Validated price rows for two commodities in two regions."""
+    dates = pd.date_range('2024-01-01', periods=n_days, freq='D')
+    frames = []
+    for commodity_code in ['BERAS', 'JAGUNG']:
+        for region_code in ['31', '32']:
+            frames.append(pd.DataFrame({
+                'date': dates,
+                'price': np.linspace(10000, 12000, n_days),
+                'currency': 'IDR',
+                'price_type': 'KONSUMEN',
+                'source': 'TEST',
+                'commodity_code': commodity_code,
+                'commodity_name': commodity_code.title(),
+                'region_code': region_code,
+                'region_name': f'Region {region_code}',
+            }))
+    
+    df = pd.concat(frames, ignore_index=True)
+    # Random ids, like the UUID primary key of ``prices``
+    df.insert(0, 'id', [f'{i * 7919 % 1000:03d}-{i:05d}' for i in range(len(df))])
+    df.insert(0, 'is_validated', True)
+    df.insert(0, 'updated_at', df['date'] + pd.Timedelta(hours=20))
+    return df
+
+
+class FakePriceSource:
+    """Stand-in for ``stream_price_data`` honouring ``changed_since`` and commodity codes."""
+    
+    def __init__(self, rows: pd.DataFrame):
+        self.rows = rows
+        self.calls = []
+    
+    def __call__(self, commodity_codes=None, price_type=None, chunk_size=None, changed_since=None, **kwargs):
+        self.calls.append((tuple(commodity_codes or ()), changed_since))
+        rows = self.rows
+        if commodity_codes:
+            rows = rows[rows['commodity_code'].isin(commodity_codes)]
+        if changed_since:
+            rows = rows[rows['updated_at'] > changed_since]
+        
+        chunk_size = chunk_size or 100
+        for start in range(0, len(rows), chunk_size):
+            part = rows.iloc[start:start + chunk_size]
+            yield DatabaseManager._price_chunk(list(part.columns), list(part.itertuples(index=False, name=None)))
+
+
+class TestPriceStore:
+    """Test suite untuk PriceStore."""
+    
+    def test_unavailable_store_falls_back_to_database(self, monkeypatch, sample_price_data):
+        """With the store disabled prices come straight from PostgreSQL."""
+        calls = []
+        
+        def get_price_data(**kwargs):
+            calls.append(kwargs)
+            return sample_price_data.copy()
+        
+        monkeypatch.setattr(db_manager, 'get_price_data', get_price_data)
+        
+        price_data, _ = DataProcessor().load_and_preprocess_data(include_weather=False)
+        
+        assert len(calls) == 1
+        assert not price_data.empty
+    
+    def test_price_query_watermark(self):
+        """A sync query filters on updated_at and keeps unvalidated rows."""
+        watermark = datetime(2024, 3, 1)
+        query, params = db_manager._build_price_query(price_type=None, changed_since=watermark)
+        
+        assert 'p.updated_at > :changed_since' in query
+        assert 'is_validated = true' not in query
+        assert params == {'changed_since': watermark}
+        assert 'is_validated = true' in db_manager._build_price_query()[0]
+    
+    @requires_pyarrow
+    def test_sync_writes_partitions_and_watermark(self, tmp_path, monkeypatch):
+        """A first sync backfills everything, partitioned by commodity and month."""
+        rows = _price_rows()
+        monkeypatch.setattr(db_manager, 'stream_price_data', FakePriceSource(rows))
+        store = PriceStore(root=str(tmp_path), enabled=True)
+        
+        assert store.sync(commodity_codes=['BERAS', 'JAGUNG'], chunk_size=50) == len(rows)
+        
+        partitions = {path.relative_to(store.root).parts[:2] for path in store.root.rglob('*.parquet')}
+        assert ('commodity_code=BERAS', 'month=2024-01') in partitions
+        assert ('commodity_code=JAGUNG', 'month=2024-03') in partitions
+        assert store.get_watermark('BERAS') == datetime(2024, 3, 30, 20)
+    
+    @requires_pyarrow
+    def test_sync_only_pulls_delta(self, tmp_path, monkeypatch):
+        """Later syncs query from the watermark minus the overlap window."""
+        rows = _price_rows()
+        history = rows[rows['date'] < '2024-03-01']
+        store = PriceStore(root=str(tmp_path), enabled=True)
+        
+        monkeypatch.setattr(db_manager, 'stream_price_data', FakePriceSource(history))
+        store.sync(commodity_codes=['BERAS'])
+        
+        source = FakePriceSource(rows)
+        monkeypatch.setattr(db_manager, 'stream_price_data', source)
+        store.sync(commodity_codes=['BERAS'])
+        
+        overlap = timedelta(seconds=price_store_module.settings.price_store_sync_overlap_seconds)
+        assert source.calls == [(('BERAS',), datetime(2024, 2, 29, 20) - overlap)]
+        assert len(store.read(price_type=None)) == (rows['commodity_code'] == 'BERAS').sum()
+    
+    @requires_pyarrow
+    def test_sync_picks_up_late_and_changed_rows(self, tmp_path, monkeypatch):
+        """Backfilled rows and validation changes arrive through updated_at."""
+        rows = _price_rows()
+        store = PriceStore(root=str(tmp_path), enabled=True)
+        monkeypatch.setattr(db_manager, 'stream_price_data', FakePriceSource(rows))
+        store.sync(commodity_codes=['BERAS'])
+        
+        # An old date inserted late under a random id, and a row invalidated
+        now = rows['updated_at'].max() + pd.Timedelta(days=1)
+        backfill = rows.iloc[[0]].assign(id='000-late', date=pd.Timestamp('2023-12-31'), updated_at=now)
+        rows.loc[1, ['is_validated', 'updated_at']] = [False, now]
+        monkeypatch.setattr(db_manager, 'stream_price_data', FakePriceSource(pd.concat([rows, backfill])))
+        store.sync(commodity_codes=['BERAS'])
+        
+        df = store.read(commodity_codes=['BERAS'])
+        assert '000-late' in set(df['id'])
+        assert rows.loc[1, 'id'] not in set(df['id'])
+        assert len(df) == (rows['commodity_code'] == 'BERAS').sum()
+        assert 'updated_at' not in df.columns
+    
+    @requires_pyarrow
+    def test_read_applies_filters(self, tmp_path, monkeypatch):
+        """Reads honour commodity, region and date predicates."""
+        rows = _price_rows()
+        monkeypatch.setattr(db_manager, 'stream_price_data', FakePriceSource(rows))
+        store = PriceStore(root=str(tmp_path), enabled=True)
+        store.sync()
+        
+        df = store.read(
+            commodity_codes=['BERAS'],
+            region_codes=['31'],
+            start_date='2024-02-10',
+            end_date='2024-02-20'
+        )
+        
+        assert len(df) == 11
+        assert set(df['commodity_code'].astype(str)) == {'BERAS'}
+        assert set(df['region_code'].astype(str)) == {'31'}
+        assert list(df.columns) == [col for col in rows.columns if col not in PriceStore.SYNC_COLUMNS]
+        assert df['date'].is_monotonic_increasing
+    
+    @requires_pyarrow
+    def test_processor_reads_history_from_store(self, tmp_path, monkeypatch):
+        """load_and_preprocess_data serves history from the store, not a full query."""
+        rows = _price_rows()
+        monkeypatch.setattr(db_manager, 'stream_price_data', FakePriceSource(rows))
+        monkeypatch.setattr(db_manager, 'get_price_data', lambda **kwargs: pytest.fail("full query issued"))
+        monkeypatch.setattr(price_store_module, 'price_store', PriceStore(root=str(tmp_path), enabled=True))
+        
+        from app.preprocessing import data_processor
+        monkeypatch.setattr(data_processor, 'price_store', price_store_module.price_store)
+        
+        price_data, _ = DataProcessor().load_and_preprocess_data(commodity_codes=['BERAS'], include_weather=False)
+        
+        assert set(price_data['commodity_code'].astype(str)) == {'BERAS'}
+        assert db_manager.stream_price_data.calls == [(('BERAS',), PriceStore.EPOCH)]
+        assert len(price_data) == 2 * 90
+    
+    @requires_pyarrow
+    def test_repeated_syncs_do_not_grow_the_store(self, tmp_path, monkeypatch):
+        """Rows re-read from the overlap are not written again."""
+        rows = _price_rows()
+        monkeypatch.setattr(db_manager, 'stream_price_data', FakePriceSource(rows))
+        monkeypatch.setattr(price_store_module.settings, 'price_store_sync_overlap_seconds', 40 * 86400)
+        store = PriceStore(root=str(tmp_path), enabled=True)
+        store.sync(commodity_codes=['BERAS'])
+        
+        def stored_rows():
+            return ds.dataset(str(store.root), format='parquet').count_rows()
+        
+        files = sorted(store.root.rglob('*.parquet'))
+        size = stored_rows()
+        
+        assert store.sync(commodity_codes=['BERAS']) == 0
+        assert store.sync(commodity_codes=['BERAS']) == 0
+        assert sorted(store.root.rglob('*.parquet')) == files
+        assert stored_rows() == size
+        
+        # A corrected price replaces its stored version in place
+        corrected = rows.index[rows['commodity_code'] == 'BERAS'][-1]
+        rows.loc[corrected, ['price', 'updated_at']] = [13000.0, rows['updated_at'].max() + pd.Timedelta(hours=1)]
+        assert store.sync(commodity_codes=['BERAS']) == 1
+        assert stored_rows() == size
+        assert store.read(commodity_codes=['BERAS'])['price'].max() == 13000.0
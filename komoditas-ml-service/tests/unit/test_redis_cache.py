@@ -0,0 +1,287 @@
+"""Unit tests untuk Redis cache invalidation."""
+
+import fnmatch
+
+import pytest
+from redis.exceptions import ResponseError
+
+from app.config.cache_metrics import CacheMetrics
+from app.config.logging import ml_logger
+from app.config.redis import RedisManager
+
+
+class FakePipeline:
+    """Pipeline double queueing commands until ``execute``."""
+    
+    def __init__(self, client: "FakeRedis"):
+        self.client = client
+        self.command_stack = []
+    
+    def __len__(self):
+        return len(self.command_stack)
+    
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.command_stack.append((name, args, kwargs))
+            return self
+        return queue
+    
+    async def execute(self):
+        self.client.round_trips += 1
+        results = [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.command_stack]
+        self.command_stack = []
+        return [await result for result in results]
+
+
+class FakeRedis:
+    """In-memory stand-in for the async Redis client (bytes keys)."""
+    
+    def __init__(self):
+        self.values = {}
+        self.sets = {}
+        self.ttls = {}
+        self.unlink_calls = []
+        self.round_trips = 0
+        self.keys_called = False
+    
+    @staticmethod
+    def _key(key):
+        return key.encode() if isinstance(key, str) else key
+    
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+    
+    async def setex(self, key, expire, data):
+        self.values[self._key(key)] = data
+        self.ttls[self._key(key)] = expire
+        return True
+    
+    async def get(self, key):
+        return self.values.get(self._key(key))
+    
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.values.get(self._key(key)) for key in keys]
+    
+    async def sadd(self, key, *members):
+        members = {self._key(member) for member in members}
+        self.sets.setdefault(self._key(key), set()).update(members)
+        return len(members)
+    
+    async def expire(self, key, seconds):
+        self.ttls[self._key(key)] = seconds
+        return True
+    
+    async def rename(self, src, dst):
+        if self._key(src) not in self.sets:
+            raise ResponseError("no such key")
+        self.sets[self._key(dst)] = self.sets.pop(self._key(src))
+        return True
+    
+    async def unlink(self, *keys):
+        self.unlink_calls.append(len(keys))
+        deleted = 0
+        for key in map(self._key, keys):
+            deleted += int(self.values.pop(key, None) is not None or self.sets.pop(key, None) is not None)
+        return deleted
+    
+    async def info(self):
+        return {"used_memory_human": "1M", "keyspace_hits": 0, "keyspace_misses": 0}
+    
+    async def keys(self, pattern):
+        self.keys_called = True
+        raise AssertionError("KEYS must not be used")
+    
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.values) + list(self.sets):
+            if match is None or fnmatch.fnmatchcase(key.decode(), match):
+                yield key
+    
+    async def sscan_iter(self, name, match=None, count=None):
+        for member in list(self.sets.get(self._key(name), ())):
+            yield member
+
+
+@pytest.fixture
+def manager():
+    """RedisManager wired to an in-memory client."""
+    manager = RedisManager()
+    manager.redis_client = FakeRedis()
+    manager._connected = True
+    return manager
+
+
+class TestClearPattern:
+    """Test suite untuk SCAN-based clear_pattern."""
+    
+    @pytest.mark.asyncio
+    async def test_clears_only_matching_keys(self, manager):
+        """Matching keys are unlinked, others survive, KEYS is never called."""
+        for i in range(25):
+            await manager.set_cache(f"predictions:pred:KOM{i}", {'i': i})
+        await manager.set_cache("training:abc", {'status': 'running'})
+        
+        deleted = await manager.clear_pattern("predictions:*", batch_size=10)
+        
+        assert deleted == 25
+        assert list(manager.redis_client.values) == [b"training:abc"]
+        assert not manager.redis_client.keys_called
+    
+    @pytest.mark.asyncio
+    async def test_unlinks_in_pipelined_batches(self, manager):
+        """Keys are unlinked in fixed-size batches over few round trips."""
+        for i in range(95):
+            await manager.set_cache(f"anomaly:{i}", {'i': i})
+        manager.redis_client.round_trips = 0
+        
+        deleted = await manager.clear_pattern("anomaly:*", batch_size=5)
+        
+        assert deleted == 95
+        assert manager.redis_client.unlink_calls == [5] * 19
+        assert manager.redis_client.round_trips == 2
+    
+    @pytest.mark.asyncio
+    async def test_disconnected_returns_zero(self):
+        """Without a connection nothing is attempted."""
+        assert await RedisManager().clear_pattern("predictions:*") == 0
+
+
+class TestTagInvalidation:
+    """Test suite untuk tag-based invalidation."""
+    
+    @pytest.mark.asyncio
+    async def test_set_cache_registers_tags(self, manager):
+        """Tagged writes add the key to each tag set with the tag TTL."""
+        await manager.cache_model_predictions(
+            "pred:BERAS:31:7:prophet",
+            {'price': 1},
+            tags=[manager.commodity_tag('BERAS'), manager.model_version_tag('prophet', 'BERAS', 'v1')]
+        )
+        
+        client = manager.redis_client
+        assert client.sets[b"tags:commodity:BERAS"] == {b"predictions:pred:BERAS:31:7:prophet"}
+        assert client.sets[b"tags:model_version:prophet:BERAS:v1"] == {b"predictions:pred:BERAS:31:7:prophet"}
+        assert client.ttls[b"predictions:pred:BERAS:31:7:prophet"] == 1800
+        assert client.ttls[b"tags:commodity:BERAS"] >= 3600
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_commodity_leaves_other_commodities(self, manager):
+        """Retraining one commodity drops only its predictions and anomalies."""
+        for commodity_code in ['BERAS', 'JAGUNG']:
+            tags = [manager.commodity_tag(commodity_code)]
+            for horizon in [7, 14]:
+                await manager.cache_model_predictions(f"pred:{commodity_code}:31:{horizon}:prophet", {}, tags=tags)
+            await manager.cache_anomaly_scores(f"{commodity_code}:31:both:0.1", {}, tags=tags)
+        await manager.cache_anomaly_scores("all:all:both:0.1", {}, tags=[manager.commodity_tag(None)])
+        
+        deleted = await manager.invalidate_commodity('BERAS')
+        
+        assert deleted == 4
+        assert set(manager.redis_client.values) == {
+            b"predictions:pred:JAGUNG:31:7:prophet",
+            b"predictions:pred:JAGUNG:31:14:prophet",
+            b"anomaly:JAGUNG:31:both:0.1",
+        }
+        assert b"tags:commodity:BERAS" not in manager.redis_client.sets
+        assert b"tags:commodity:JAGUNG" in manager.redis_client.sets
+    
+    @pytest.mark.asyncio
+    async def test_unknown_tag_is_a_noop(self, manager):
+        """Invalidating a tag with no entries deletes nothing."""
+        assert await manager.invalidate_tags(['commodity:NONE']) == 0
+
+
+class TestMultiKeyOperations:
+    """Test suite untuk MGET/pipelined multi-key operations."""
+    
+    @pytest.mark.asyncio
+    async def test_set_many_and_get_many_round_trip(self, manager):
+        """Entries written together are read back together, misses omitted."""
+        predictions = {f"pred:KOM{i}:31:7:prophet": {'i': i} for i in range(5)}
+        
+        await manager.cache_many_model_predictions(
+            predictions,
+            expire=600,
+            tags={key: [manager.commodity_tag(key.split(':')[1])] for key in predictions}
+        )
+        
+        client = manager.redis_client
+        assert client.round_trips == 1
+        assert client.ttls[b"predictions:pred:KOM0:31:7:prophet"] == 600
+        assert client.sets[b"tags:commodity:KOM3"] == {b"predictions:pred:KOM3:31:7:prophet"}
+        
+        client.round_trips = 0
+        cached = await manager.get_many_cached_predictions(list(predictions) + ["pred:MISSING:31:7:prophet"])
+        
+        assert cached == predictions
+        assert client.round_trips == 1
+    
+    @pytest.mark.asyncio
+    async def test_undecodable_entry_is_a_miss(self, manager):
+        """A corrupt payload drops out of the batch instead of failing it."""
+        await manager.set_cache("predictions:good", {'ok': True})
+        manager.redis_client.values[b"predictions:bad"] = bytes([0xC2]) + b"{not json"
+        
+        assert await manager.get_many(["predictions:good", "predictions:bad"]) == {
+            "predictions:good": {'ok': True}
+        }
+    
+    @pytest.mark.asyncio
+    async def test_disconnected_returns_empty(self):
+        """Without a connection nothing is attempted."""
+        assert await RedisManager().get_many(["predictions:a"]) == {}
+        assert await RedisManager().set_many({"predictions:a": {}}) is False
+
+
+class TestCacheMetrics:
+    """Test suite untuk sampled cache-operation metrics."""
+    
+    @pytest.mark.asyncio
+    async def test_counts_operations_per_prefix(self, manager):
+        """Every operation is counted under its key prefix, hits and misses apart."""
+        manager.metrics = CacheMetrics(sample_rate=0)
+        await manager.set_cache("predictions:a", {'a': 1})
+        await manager.get_cache("predictions:a")
+        await manager.get_cache("predictions:missing")
+        await manager.get_many(["anomaly:x", "predictions:a"])
+        
+        stats = (await manager.get_cache_stats())['operations']
+        
+        assert stats['predictions']['set']['count'] == 1
+        assert (stats['predictions']['get']['hits'], stats['predictions']['get']['misses']) == (1, 1)
+        assert stats['predictions']['mget']['hits'] == 1
+        assert stats['anomaly']['mget']['misses'] == 1
+        assert stats['predictions']['get']['latency']['samples'] == 0
+    
+    @pytest.mark.asyncio
+    async def test_sampled_latencies_fill_histogram(self, manager):
+        """Sampled operations land in exactly one latency bucket each."""
+        manager.metrics = CacheMetrics(sample_rate=1.0)
+        for _ in range(5):
+            await manager.get_cache("predictions:missing")
+        
+        latency = (await manager.get_cache_stats())['operations']['predictions']['get']['latency']
+        
+        assert latency['samples'] == 5
+        assert sum(latency['histogram'].values()) == 5
+        assert latency['max_ms'] >= latency['avg_ms'] > 0
+    
+    @pytest.mark.asyncio
+    async def test_no_log_events_without_debug(self, manager, monkeypatch):
+        """Per-operation log events are skipped unless debug is enabled."""
+        manager.metrics = CacheMetrics(sample_rate=1.0)
+        built = []
+        monkeypatch.setattr(
+            'app.config.logging.MLServiceLogger.debug_enabled', property(lambda self: False)
+        )
+        monkeypatch.setattr(ml_logger.logger, 'debug', lambda *args, **kwargs: built.append(kwargs))
+        
+        await manager.set_cache("predictions:a", {'a': 1})
+        await manager.get_cache("predictions:a")
+        assert built == []
+        
+        monkeypatch.setattr(
+            'app.config.logging.MLServiceLogger.debug_enabled', property(lambda self: True)
+        )
+        await manager.get_cache("predictions:a")
+        assert built[0]['operation'] == 'get' and built[0]['cache_hit'] is True
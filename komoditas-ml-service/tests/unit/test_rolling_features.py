@@ -0,0 +1,124 @@
+"""Unit tests untuk vectorized rolling window kernels."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.features.engineering import FeatureEngineer
+from app.features.rolling import SeriesWindows, rolling_slope
+
+
+def _polyfit_slopes(values: np.ndarray, window: int) -> np.ndarray:
+    """Reference slopes from one polyfit per window."""
+    return pd.Series(values).rolling(window).apply(
+        lambda x: np.polyfit(range(window), x, 1)[0], raw=True
+    ).to_numpy()
+
+
+class TestRollingSlope:
+    """Test suite untuk closed-form rolling_slope."""
+    
+    @pytest.mark.parametrize("window", [2, 7, 30])
+    def test_matches_polyfit(self, window: int):
+        """Slopes equal a least-squares fit per window."""
+        values = 12000 + np.cumsum(np.random.default_rng(0).normal(0, 100, 1000))
+        
+        np.testing.assert_allclose(
+            rolling_slope(values, window), _polyfit_slopes(values, window), rtol=1e-6, atol=1e-6
+        )
+    
+    def test_missing_values_invalidate_their_windows(self):
+        """A NaN blanks every window containing it, like rolling().apply."""
+        values = np.arange(20, dtype=float) * 3
+        values[10] = np.nan
+        
+        slopes = rolling_slope(values, 5)
+        
+        assert np.isnan(slopes[:4]).all()
+        assert np.isnan(slopes[10:15]).all()
+        np.testing.assert_allclose(slopes[4:10], 3.0)
+        np.testing.assert_allclose(slopes[15:], 3.0)
+    
+    def test_windows_do_not_cross_groups(self):
+        """With group labels each series starts a fresh window."""
+        values = np.concatenate([np.arange(10) * 2.0, 100 - np.arange(10) * 5.0])
+        groups = np.repeat(['a', 'b'], 10)
+        
+        slopes = rolling_slope(values, 4, groups=groups)
+        
+        np.testing.assert_allclose(slopes[3:10], 2.0)
+        assert np.isnan(slopes[10:13]).all()
+        np.testing.assert_allclose(slopes[13:], -5.0)
+    
+    def test_short_series_is_all_nan(self):
+        """Fewer values than the window give no slopes."""
+        assert np.isnan(rolling_slope([1.0, 2.0], 7)).all()
+    
+    def test_feature_engineer_adds_trend_slopes(self, sample_price_data: pd.DataFrame):
+        """FeatureEngineer exposes the shared trend slopes."""
+        price = sample_price_data.set_index('date')['price']
+        result = FeatureEngineer()._add_technical_indicators(price.to_frame())
+        
+        np.testing.assert_allclose(
+            result['price_trend_7d'].to_numpy(), _polyfit_slopes(price.to_numpy(), 7), rtol=1e-6, atol=1e-6
+        )
+
+
+class TestSeriesWindows:
+    """Test suite untuk grouped SeriesWindows operations."""
+    
+    @pytest.fixture
+    def grouped_prices(self) -> pd.DataFrame:
+        """Three contiguous series of unequal length sharing a date index."""
+        rng = np.random.default_rng(2)
+        frames = [
+            pd.DataFrame(
+                {'series': name, 'price': 10000 + np.cumsum(rng.normal(0, 50, length))},
+                index=pd.date_range('2024-01-01', periods=length, name='date')
+            )
+            for name, length in [('a', 40), ('b', 25), ('c', 60)]
+        ]
+        return pd.concat(frames)
+    
+    @pytest.mark.parametrize("operation, args", [
+        ('rolling', (7, 'mean')), ('rolling', (7, 'mean', 1)), ('rolling', (14, 'std')),
+        ('rolling', (5, 'median')), ('rolling', (30, 'min', 1)), ('rolling', (30, 'max')),
+        ('ewm_mean', (12,)), ('shift', (3,)), ('diff', (1,)), ('pct_change', (7,)), ('slope', (7,))
+    ])
+    def test_grouped_equals_per_series(self, grouped_prices: pd.DataFrame, operation: str, args: tuple):
+        """A grouped operation equals running it on every series alone."""
+        groups = grouped_prices['series'].factorize()[0]
+        grouped = getattr(SeriesWindows(grouped_prices['price'], groups), operation)(*args)
+        
+        expected = pd.concat([
+            getattr(SeriesWindows(series['price']), operation)(*args)
+            for _, series in grouped_prices.groupby('series', sort=False)
+        ])
+        
+        assert grouped.index.equals(grouped_prices.index)
+        np.testing.assert_allclose(grouped.to_numpy(), expected.to_numpy(), equal_nan=True)
+    
+    def test_repeated_requests_are_memoized(self, grouped_prices: pd.DataFrame):
+        """A statistic asked for twice is computed once and handed out as a copy."""
+        windows = SeriesWindows(grouped_prices['price'], grouped_prices['series'].factorize()[0])
+        
+        first = windows.rolling(7, 'mean')
+        first[:] = 0.0
+        second = windows.rolling(7, 'mean')
+        windows.rolling(14, 'std')
+        
+        assert len(windows._results) == 2
+        assert second.notna().any() and (second.dropna() != 0).all()
+    
+    def test_unknown_statistic_raises(self):
+        """Only the kernel's rolling statistics are accepted."""
+        with pytest.raises(ValueError):
+            SeriesWindows(pd.Series([1.0, 2.0])).rolling(2, 'sum')
+    
+    def test_fill_stays_inside_series(self):
+        """Gaps are filled from the same series only."""
+        prices = pd.Series([1.0, np.nan, np.nan, 5.0, np.nan])
+        
+        filled = SeriesWindows(prices, np.array([0, 0, 1, 1, 1])).fill()
+        
+        np.testing.assert_array_equal(filled.to_numpy(), [1.0, 1.0, 5.0, 5.0, 5.0])